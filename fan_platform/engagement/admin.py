@@ -3,9 +3,14 @@ from django import forms
 from django.shortcuts import render, redirect
 from django.urls import path
 from django.http import HttpResponseRedirect
+from django.db.models import F
 # Import Django admin, forms, and URL utilities
-from .models import Club, UserProfile, ClubStats, Topic, Comment, Prediction, NewsArticle, NewsComment, Fixture
+from .models import Club, UserProfile, ClubStats, Topic, Comment, Prediction, NewsArticle, NewsComment, Fixture, Badge, SCORE_PATTERN
 # Import app models
+from .live_mood import board as mood_board
+from .crowd import board as crowd_board
+from . import progress, settlement
+# Import live match mood aggregates, crowd prediction histograms, challenge progress and prediction settlement
 
 # Custom form for start_simulation action
 class StartSimulationForm(forms.Form):
@@ -27,33 +32,43 @@ class NewsArticleAdmin(admin.ModelAdmin):
 @admin.register(Prediction)
 class PredictionAdmin(admin.ModelAdmin):
     # Admin config for Prediction
-    list_display = ('user_profile', 'fixture_id', 'text', 'created_at', 'submission_count', 'is_correct')
+    list_display = ('user_profile', 'fixture', 'text', 'created_at', 'submission_count', 'is_correct', 'points')
     # Columns in admin list view
     list_filter = ('is_correct', 'created_at')
     # Filters for admin list
     search_fields = ('text', 'user_profile__user__username')
     # Searchable fields
-    fields = ('user_profile', 'fixture_id', 'text', 'club', 'created_at', 'submission_count', 'is_correct', 'verified_at')
+    fields = ('user_profile', 'fixture', 'text', 'club', 'created_at', 'submission_count', 'is_correct', 'verified_at')
     # Fields in admin edit form
 
     def save_model(self, request, obj, form, change):
         # Update correct predictions on save
+        unverified = obj.verified_at is None
+        previous = Prediction.objects.filter(pk=obj.pk).values_list('fixture_id', 'home_goals', 'away_goals').first() if change else None
         super().save_model(request, obj, form, change)
+        if previous and previous[0] != obj.fixture_id:
+            crowd_board.record(previous[0], previous[1:], None)  # Moved to another fixture
+            previous = None
+        crowd_board.record(obj.fixture_id, previous[1:] if previous else None, (obj.home_goals, obj.away_goals))  # Update the crowd histogram
+        counted = unverified and obj.verified_at is not None  # Prediction.save already counted it against the result
+        if 'is_correct' in form.changed_data and obj.is_correct and not counted:
+            UserProfile.objects.filter(pk=obj.user_profile_id).update(correct_predictions=F('correct_predictions') + 1)
+            obj.user_profile.refresh_from_db(fields=['correct_predictions'])
+            progress.record(obj.user_profile_id, obj.club_id, correct_predictions=1, month_correct_predictions=1)
         if 'is_correct' in form.changed_data and obj.is_correct:
-            obj.user_profile.correct_predictions += 1
-            obj.user_profile.check_challenge_completion()
-            obj.user_profile.save()
-            points_awarded = obj.user_profile.check_challenge_completion()
+            points_awarded = obj.user_profile.check_challenge_completion()  # Free if Prediction.save just checked
             if points_awarded > 0:
                 self.message_user(request, f"Awarded {points_awarded} points for completing a challenge!")
 
     def delete_model(self, request, obj):
         # Adjust correct predictions on delete
         if obj.is_correct:
-            obj.user_profile.correct_predictions -= 1
-            obj.user_profile.check_challenge_completion()
-            obj.user_profile.save()
+            UserProfile.objects.filter(pk=obj.user_profile_id).update(correct_predictions=F('correct_predictions') - 1)
+            obj.user_profile.refresh_from_db(fields=['correct_predictions'])
+            progress.record(obj.user_profile_id, obj.club_id, at=obj.verified_at, correct_predictions=-1, month_correct_predictions=-1)
+            # Fewer correct predictions cannot complete a challenge, so there is nothing to check
         super().delete_model(request, obj)
+        crowd_board.record(obj.fixture_id, (obj.home_goals, obj.away_goals), None)  # Update the crowd histogram
 
 @admin.register(Fixture)
 class FixtureAdmin(admin.ModelAdmin):
@@ -97,11 +112,12 @@ class FixtureAdmin(admin.ModelAdmin):
                 print("Form is valid")
                 result = form.cleaned_data['final_result']
                 print(f"Extracted valid result: '{result}'")
-                if '-' in result:
+                if SCORE_PATTERN.match(result):
                     print(f"Valid result detected: {result}")
                     fixture.is_live = True
                     fixture.final_result = result
                     fixture.save()
+                    mood_board.reset(fixture.id)  # Start live mood from kickoff
                     print(f"Fixture saved: is_live={fixture.is_live}, final_result={fixture.final_result}")
                     self.message_user(request, f"Simulation started for {fixture.club.name} vs {fixture.opponent} with final result {result}.")
                     return redirect('/admin/engagement/fixture/')
@@ -133,17 +149,29 @@ class FixtureAdmin(admin.ModelAdmin):
             self.message_user(request, "Cannot set final result while simulation is live. Stop the simulation first.")
             return
         result = request.POST.get('final_result', '')
-        if result and '-' in result:
+        if SCORE_PATTERN.match(result):
             fixture.final_result = result
             fixture.save()
-            predictions = Prediction.objects.filter(fixture_id=fixture.id)
-            for prediction in predictions:
-                prediction.save()  # Triggers is_correct update
-            self.message_user(request, f"Final result set to {result} for {fixture.club.name} vs {fixture.opponent}.")
+            self.settle(request, fixture)
         else:
             self.message_user(request, "Invalid result format. Use x-y (e.g., 2-1).", level='error')
     set_final_result.short_description = "Set final result"
 
+    def settle(self, request, fixture):
+        # Settle the fixture's predictions against its saved final result and report how they scored
+        correct, wrong = settlement.settle(fixture.id, fixture.final_result)  # Marks and scores every prediction in one pass
+        stats = settlement.accuracy(fixture.id)
+        self.message_user(request, f"Final result set to {fixture.final_result} for {fixture.club.name} vs {fixture.opponent}: "
+                                   f"{correct} predictions settled correct, {wrong} no longer correct; "
+                                   f"{stats['exact']} exact, {stats['difference']} right goal difference, "
+                                   f"{stats['outcome']} right outcome of {stats['predictions']}.")
+
+    def save_model(self, request, obj, form, change):
+        # Settle predictions whenever the change form records a final result (live fixtures settle when the simulation ends)
+        super().save_model(request, obj, form, change)
+        if 'final_result' in form.changed_data and obj.final_result and not obj.is_live:
+            self.settle(request, obj)
+
     def change_view(self, request, object_id, form_url='', extra_context=None):
         # Add final result form to change view
         extra_context = extra_context or {}
@@ -153,8 +181,7 @@ class FixtureAdmin(admin.ModelAdmin):
     def response_change(self, request, obj):
         # Handle final result submission
         if '_set_final_result' in request.POST:
-            self.set_final_result(request, [obj])
-            return self.response_change(request, obj)
+            self.set_final_result(request, self.model.objects.filter(pk=obj.pk))
         return super().response_change(request, obj)
 
 # Register other models
@@ -163,4 +190,5 @@ admin.site.register(UserProfile)
 admin.site.register(ClubStats)
 admin.site.register(Topic)
 admin.site.register(Comment)
-admin.site.register(NewsComment)
\ No newline at end of file
+admin.site.register(NewsComment)
+admin.site.register(Badge)
@@ -0,0 +1,125 @@
+import threading
+from collections import defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+# Import threading, defaultdict and Django DB utilities
+from .models import Badge, AwardedBadge, ClubStats, UserProfile
+# Import badge catalogue and badge holders
+
+_lock = threading.Lock()
+_bits = {}
+# Per-process badge name -> bit, loaded from the catalogue on first use
+_names = {}
+# bit -> badge name
+MAX_BIT = 62
+# Highest bit a signed 64-bit badge_mask can hold
+
+
+def load():
+    with _lock:
+        _bits.clear()
+        _names.clear()
+        for name, bit in Badge.objects.values_list('name', 'bit'):
+            _bits[name] = bit
+            _names[bit] = name
+
+
+def bit_of(name):
+    # Catalogue bit for a badge, adding badges the catalogue has not seen yet
+    if name not in _bits:
+        load()
+    while name not in _bits:
+        top = Badge.objects.aggregate(top=Max('bit'))['top']
+        bit = 0 if top is None else top + 1
+        if bit > MAX_BIT:
+            raise ValueError(f'No badge bit left for {name!r}: badge_mask holds {MAX_BIT + 1} badges')
+        try:
+            with transaction.atomic():
+                Badge.objects.create(name=name, bit=bit)
+        except IntegrityError:
+            pass  # Another process added this badge or took this bit first; re-read the catalogue
+        load()
+    return _bits[name]
+
+
+def mask_of(badge_names):
+    mask = 0
+    for name in badge_names:
+        mask |= 1 << bit_of(name)
+    return mask
+
+
+def names(mask):
+    # Badge names in a mask, in catalogue order
+    if not mask:
+        return []
+    if mask >= 1 << (max(_names) + 1 if _names else 0):
+        load()
+    return [name for bit, name in sorted(_names.items()) if mask & (1 << bit)]
+
+
+def count(mask):
+    return bin(mask).count('1')
+
+
+def has(mask, name):
+    return bool(mask & (1 << bit_of(name)))
+
+
+def display(mask):
+    # Badges as shown on pages and in the badges API
+    return ', '.join(names(mask))
+
+
+def award_many(awards):
+    # Add badges to many fans' club stats ({club_stats: names}); returns {club_stats: names that were new}.
+    # Fans gaining the same set of badges share one UPDATE.
+    new = {}
+    by_bits = defaultdict(list)
+    for club_stats, badge_names in awards.items():
+        fresh = [name for name in dict.fromkeys(badge_names) if not has(club_stats.badge_mask, name)]
+        if fresh:
+            new[club_stats] = fresh
+            by_bits[mask_of(fresh)].append(club_stats)
+    for bits, rows in by_bits.items():
+        ClubStats.objects.filter(pk__in=[club_stats.pk for club_stats in rows]).update(badge_mask=F('badge_mask').bitor(bits))
+        for club_stats in rows:
+            club_stats.badge_mask |= bits
+    if new:
+        badge_ids = dict(Badge.objects.filter(name__in={name for names in new.values() for name in names}).values_list('name', 'id'))
+        AwardedBadge.objects.bulk_create([
+            AwardedBadge(user_profile_id=club_stats.user_profile_id, club_id=club_stats.club_id, badge_id=badge_ids[name])
+            for club_stats, names in new.items() for name in names
+        ], batch_size=500, ignore_conflicts=True)  # A concurrent award of the same badge keeps the first row
+    return new
+
+
+def award(club_stats, badge_names):
+    # Add badges to a fan's club stats; returns the names that were new
+    return award_many({club_stats: badge_names}).get(club_stats, [])
+
+
+def revoke(club_stats, name):
+    # Take one badge back, e.g. when re-scoring leaves a fan without positive comments
+    if not has(club_stats.badge_mask, name):
+        return False
+    bit = 1 << bit_of(name)
+    ClubStats.objects.filter(pk=club_stats.pk).update(badge_mask=F('badge_mask').bitand(~bit))
+    AwardedBadge.objects.filter(user_profile_id=club_stats.user_profile_id, club_id=club_stats.club_id, badge__name=name).delete()
+    club_stats.badge_mask &= ~bit
+    return True
+
+
+def clear(club_stats):
+    # Remove every badge a fan holds in one club
+    ClubStats.objects.filter(pk=club_stats.pk).update(badge_mask=0)
+    AwardedBadge.objects.filter(user_profile_id=club_stats.user_profile_id, club_id=club_stats.club_id).delete()
+    club_stats.badge_mask = 0
+
+
+def holders(name, club_id=None):
+    # Fans holding a badge, optionally in one club; an indexed read on AwardedBadge
+    awards = AwardedBadge.objects.filter(badge__name=name)
+    if club_id is not None:
+        awards = awards.filter(club_id=club_id)
+    return UserProfile.objects.filter(id__in=awards.values('user_profile_id'))
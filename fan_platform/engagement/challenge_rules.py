@@ -0,0 +1,188 @@
+import threading
+from collections import defaultdict, namedtuple
+from django.core.signals import request_started
+# Import collections for rule declarations and batch awards, and per-request state
+from .models import PointsEvent
+from . import badges, ledger, leaderboards, progress
+# Import points ledger, badges, leaderboard and progress counters
+
+Rule = namedtuple('Rule', 'name description metric window target points badge')
+# One challenge: reach target on metric within window ('all', 'week' or 'month')
+
+RULES = [
+    Rule('Comment King', 'Post 5 comments this week.', 'comments', 'week', 5, 10, 'Comment King'),
+    Rule('Positive Vibes', 'Post 3 positive comments.', 'positive_comments', 'all', 3, 15, 'Positive Fan'),
+    Rule('Loyal Supporter', 'Comment 10 times on your active club’s content.', 'club_comments', 'all', 10, 15, 'Loyal Supporters'),
+    Rule('Prophet of the Pitch', 'Submit 3 correct predictions this month.', 'correct_predictions', 'month', 3, 20, 'Seer'),
+    Rule('Match Day Commentator', 'Comment on 3 different match-related news articles.', 'news_comments', 'all', 3, 10, 'Commentator'),
+    Rule('Engagement Booster', 'Like or dislike 10 comments from other users.', 'reactions', 'all', 10, 5, 'Engaged Fan'),
+]
+# Every challenge, in page order; each one reads a progress counter, so adding one adds no queries
+
+COUNTERS = {
+    ('comments', 'all'): 'comments',
+    ('comments', 'week'): 'week_comments',
+    ('club_comments', 'all'): 'club_comments',
+    ('positive_comments', 'all'): 'positive_comments',
+    ('news_comments', 'all'): 'news_comments',
+    ('reactions', 'all'): 'reactions',
+    ('correct_predictions', 'all'): 'correct_predictions',
+    ('correct_predictions', 'month'): 'month_correct_predictions',
+}
+# Progress counter behind each (metric, window) a rule may use
+WINDOW_COUNTERS = {'week': 'week_comments', 'month': 'month_correct_predictions'}
+# Period counter whose calendar period a window follows
+
+for rule in RULES:
+    if (rule.metric, rule.window) not in COUNTERS:
+        raise ValueError(f'Challenge {rule.name!r}: no progress counter for {rule.metric} over {rule.window}')
+
+CHECK_CHUNK = 2000
+# Fans evaluated per progress query in batch checks
+
+_context = threading.local()
+# Per-request checks: fans already checked since their progress last changed, and challenge keys known to be in the ledger
+
+
+def begin(**kwargs):
+    # Start a fresh check context; runs when each request starts
+    _context.checked = {}
+    _context.recorded = set()
+
+
+request_started.connect(begin, dispatch_uid='challenge_rules.begin')
+
+
+def context():
+    if not hasattr(_context, 'checked'):
+        begin()
+    return _context
+
+
+def forget(user_profile_id):
+    # Progress changed, so the fan's next check evaluates again
+    context().checked.pop(user_profile_id, None)
+
+
+def period_of(rule):
+    # Period a completion belongs to; each challenge pays once per period
+    if rule.window == 'all':
+        return 'all'
+    return progress.period_start(WINDOW_COUNTERS[rule.window]).isoformat()
+
+
+def results(counts, periods=None):
+    # Every challenge with the fan's progress, as shown on the challenges page
+    periods = periods or {rule.name: period_of(rule) for rule in RULES}
+    return [
+        {
+            'name': rule.name,
+            'description': rule.description,
+            'target': rule.target,
+            'progress': counts[COUNTERS[(rule.metric, rule.window)]],
+            'points': rule.points,
+            'badge': rule.badge,
+            'completed': counts[COUNTERS[(rule.metric, rule.window)]] >= rule.target,
+            'period': periods[rule.name],
+        }
+        for rule in RULES
+    ]
+
+
+def evaluate_many(pairs):
+    # {user_profile_id: results} for many (user_profile_id, active_club_id) pairs from one counters query
+    periods = {rule.name: period_of(rule) for rule in RULES}
+    return {user_profile_id: results(counts, periods) for user_profile_id, counts in progress.snapshots(pairs).items()}
+
+
+def evaluate(user_profile_id, club_id):
+    return evaluate_many([(user_profile_id, club_id)])[user_profile_id]
+
+
+def award_key(user_profile_id, challenge):
+    # Ledger key of a global challenge grant: unique per fan, challenge and period
+    return f"challenge:{user_profile_id}:{challenge['name']}:{challenge['period']}"
+
+
+def award_points_many(results_by_fan, known=None):
+    # Global points for completed challenges ({user_profile_id: results}), once per challenge and period;
+    # returns {user_profile_id: points newly awarded}. Keys in known are taken as recorded without a lookup.
+    known = set() if known is None else known
+    events = [
+        PointsEvent(
+            user_profile_id=user_profile_id, club_id=None, delta=challenge['points'], reason='challenge',
+            source_type='challenge', idempotency_key=award_key(user_profile_id, challenge)
+        )
+        for user_profile_id, completed in results_by_fan.items() for challenge in completed
+        if challenge['completed'] and award_key(user_profile_id, challenge) not in known
+    ]
+    if not events:
+        return {}
+    awarded = defaultdict(int)
+    for event in ledger.award_many(ledger.unrecorded(events)):
+        awarded[event.user_profile_id] += event.delta
+    known.update(event.idempotency_key for event in events)  # Recorded now, by this call or an earlier one
+    return dict(awarded)
+
+
+def award_points(user_profile_id, completed):
+    return award_points_many({user_profile_id: completed}).get(user_profile_id, 0)
+
+
+def check_many(pairs):
+    # Award global points for completed challenges to many (user_profile_id, active_club_id) pairs;
+    # returns {user_profile_id: points newly awarded}. Repeat checks in one request are free until a
+    # fan's progress changes, and grants already seen in the request are not looked up again.
+    state = context()
+    periods = {rule.name: period_of(rule) for rule in RULES}
+    stamps = {user_profile_id: (club_id, tuple(periods.values())) for user_profile_id, club_id in pairs}
+    due = [(user_profile_id, stamp[0]) for user_profile_id, stamp in stamps.items() if state.checked.get(user_profile_id) != stamp]
+    awarded = {}
+    for start in range(0, len(due), CHECK_CHUNK):
+        chunk = due[start:start + CHECK_CHUNK]
+        results_by_fan = {user_profile_id: results(counts, periods) for user_profile_id, counts in progress.snapshots(chunk).items()}
+        awarded.update(award_points_many(results_by_fan, state.recorded))
+        for user_profile_id, club_id in chunk:
+            state.checked[user_profile_id] = stamps[user_profile_id]
+    return awarded
+
+
+def check(user_profile_id, club_id):
+    return check_many([(user_profile_id, club_id)]).get(user_profile_id, 0)
+
+
+def award_badges_many(club_stats_list, results_by_fan, sync=True):
+    # Club badges and points for completed challenges fans have no badge for yet; returns {club_stats: badges earned}.
+    # Batch callers pass sync=False and move the returned fans on the leaderboard themselves.
+    candidates = [
+        (club_stats, challenge)
+        for club_stats in club_stats_list if club_stats.badge_mask  # Challenge badges stack on an earned badge
+        for challenge in results_by_fan.get(club_stats.user_profile_id, [])
+        if challenge['completed'] and not badges.has(club_stats.badge_mask, challenge['badge'])
+    ]
+    if not candidates:
+        return {}
+    generations = ledger.reset_generations({(club_stats.user_profile_id, club_stats.club_id) for club_stats, challenge in candidates})
+    events = {}
+    for club_stats, challenge in candidates:
+        key = (f"challenge-badge:{club_stats.user_profile_id}:{club_stats.club_id}:{challenge['badge']}:"
+               f"{generations[(club_stats.user_profile_id, club_stats.club_id)]}")
+        events[key] = (club_stats, challenge['badge'], PointsEvent(
+            user_profile_id=club_stats.user_profile_id, club_id=club_stats.club_id, delta=challenge['points'],
+            reason='challenge_badge', source_type='challenge', idempotency_key=key
+        ))
+    earned = defaultdict(list)
+    for event in ledger.award_many(ledger.unrecorded([event for club_stats, badge, event in events.values()])):
+        club_stats, badge, event = events[event.idempotency_key]
+        earned[club_stats].append(badge)  # Keys already used mean another run awarded the badge
+    badges.award_many(earned)  # Badges only; points move through the ledger
+    if sync:
+        moved = defaultdict(lambda: (set(), set()))
+        for club_stats in earned:
+            moved[club_stats.user_profile_id][0].add(club_stats.club_id)
+        leaderboards.sync(moved)  # Move fans on the leaderboard
+    return dict(earned)
+
+
+def award_badges(club_stats, completed):
+    return award_badges_many([club_stats], {club_stats.user_profile_id: completed}).get(club_stats, [])
@@ -0,0 +1,155 @@
+import logging
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.db import close_old_connections, transaction
+# Import process pool, threading and Django DB utilities
+from .models import Comment, ClubStats, PointsEvent
+from . import sentiment, rollups, leaderboards, ledger, timeline, badges, progress
+# Import app models, sentiment engine, sentiment rollups, leaderboard, points ledger, points timeline, badges and challenge progress
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'Pending'
+# Sentiment stored on a comment until the classifier has scored it
+
+_executor = None
+_dispatcher = None
+_start_lock = threading.Lock()
+_wakeup = threading.Event()
+# One scoring pool and one dispatcher thread per web process
+
+
+def score_texts(texts):
+    # Score a chunk of texts (runs inside a pool worker, which never touches the database)
+    return sentiment.score_uncached(texts)
+
+
+def get_executor():
+    # Return the shared scoring pool, starting it on first use
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.SENTIMENT_WORKERS, initializer=sentiment.get_analyzer)
+    return _executor
+
+
+def score_in_pool(texts):
+    # Split texts across the pool workers and return compound scores in input order
+    global _executor
+    chunk = max(1, -(-len(texts) // settings.SENTIMENT_WORKERS))
+    chunks = [texts[i:i + chunk] for i in range(0, len(texts), chunk)]
+    try:
+        return [compound for compounds in get_executor().map(score_texts, chunks) for compound in compounds]
+    except BrokenProcessPool:
+        logger.warning("Sentiment worker pool died; scoring batch in-process")
+        _executor = None
+        return score_texts(texts)
+
+
+def award_positive_badges(club_stats, topic_ids):
+    # Add the badges a fan earns by posting positive comments; returns True if any were added
+    earned = ['Positive Fan']
+    comments = Comment.objects.filter(user_profile_id=club_stats.user_profile_id, club_id=club_stats.club_id)
+    comment_count = comments.count()
+    if comment_count >= 10:
+        earned.append('Dedicated Fan')
+    if comment_count >= 20:
+        earned.append('Loyal Supporters')
+    if not badges.has(club_stats.badge_mask, 'Topic Expert') and any(
+        comments.filter(topic_id=topic_id).count() >= 10 for topic_id in set(topic_ids) if topic_id
+    ):
+        earned.append('Topic Expert')
+    return bool(badges.award(club_stats, earned))
+
+
+def apply_comment_rewards(comment_pairs, positive_comments):
+    # Apply points and badges for a classified batch: one ledger event per positive comment, one badge write per fan and club
+    positive_comments = list(positive_comments)
+    awarded = ledger.award_many([
+        PointsEvent(
+            user_profile_id=comment.user_profile_id, club_id=comment.club_id, delta=10, reason='positive_comment',
+            source_type='comment', source_id=comment.id, idempotency_key=f'comment:{comment.id}:positive'
+        )
+        for comment in positive_comments
+    ])  # Points per positive comment, applied once even if the comment is classified twice
+    awarded_ids = {event.source_id for event in awarded}
+    positive_topics = defaultdict(list)
+    for comment in positive_comments:
+        if comment.id in awarded_ids:
+            positive_topics[(comment.user_profile_id, comment.club_id)].append(comment.topic_id)
+    changed = defaultdict(lambda: (set(), set()))
+    for user_profile_id, club_id in set(comment_pairs) | set(positive_topics):
+        club_stats, created = ClubStats.objects.get_or_create(user_profile_id=user_profile_id, club_id=club_id)
+        topic_ids = positive_topics.get((user_profile_id, club_id))
+        if created or topic_ids:
+            changed[user_profile_id][0].add(club_id)
+        if topic_ids:
+            award_positive_badges(club_stats, topic_ids)  # Badges only; points move through the ledger
+            progress.record(user_profile_id, club_id, positive_comments=len(topic_ids))  # Positive-comment challenge progress
+        changed[user_profile_id][1].update(topic_ids or [])
+    leaderboards.sync(changed)  # Move the affected fans on the materialized leaderboard
+    for user_profile_id in {user_profile_id for user_profile_id, club_id in positive_topics}:
+        transaction.on_commit(lambda user_profile_id=user_profile_id: timeline.invalidate(user_profile_id))  # Redraw their points chart
+
+
+def classify_pending(batch_size=None):
+    # Classify one batch of pending comments and apply rewards; returns how many were scored
+    batch_size = batch_size or settings.SENTIMENT_BATCH_SIZE
+    pending = list(
+        Comment.objects.filter(sentiment=PENDING).order_by('id')
+        .values_list('id', 'text', 'user_profile_id', 'club_id', 'topic_id', 'created_at')[:batch_size]
+    )
+    if not pending:
+        return 0
+    labels = [label for label, compound in sentiment.classify_batch([row[1] for row in pending], scorer=score_in_pool)]  # Only cache misses reach the pool
+    with transaction.atomic():
+        claimed = set(
+            Comment.objects.select_for_update().filter(id__in=[row[0] for row in pending], sentiment=PENDING).values_list('id', flat=True)
+        )  # Rows another process already classified drop out here (on SQLite a concurrent claim fails and the batch is retried)
+        rows = [(row, label) for row, label in zip(pending, labels) if row[0] in claimed]
+        by_label = defaultdict(list)
+        for row, label in rows:
+            by_label[label].append(row[0])
+        for label, ids in by_label.items():
+            Comment.objects.filter(id__in=ids).update(sentiment=label)
+        rollups.apply(Counter(rollups.key_for('comment', row[3], row[4], row[5], label) for row, label in rows))
+        apply_comment_rewards(
+            [(row[2], row[3]) for row, label in rows],
+            Comment.objects.filter(id__in=by_label['Positive']).only('user_profile_id', 'club_id', 'topic_id')
+        )
+    return len(rows)
+
+
+def drain():
+    # Classify pending comments until none are left
+    total = 0
+    while True:
+        scored = classify_pending()
+        if not scored:
+            return total
+        total += scored
+
+
+def _dispatch_forever():
+    # Background loop: wait for new comments (or the poll interval), then drain the queue
+    while True:
+        _wakeup.wait(settings.SENTIMENT_POLL_SECONDS)
+        _wakeup.clear()
+        try:
+            drain()
+        except Exception:
+            logger.exception("Comment classification batch failed")
+        finally:
+            close_old_connections()
+
+
+def notify():
+    # Wake the dispatcher after a comment has been queued
+    global _dispatcher
+    with _start_lock:
+        if _dispatcher is None or not _dispatcher.is_alive():
+            _dispatcher = threading.Thread(target=_dispatch_forever, name='comment-classifier', daemon=True)
+            _dispatcher.start()
+    _wakeup.set()
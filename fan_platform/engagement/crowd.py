@@ -0,0 +1,105 @@
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+# Import threading, time and Django DB utilities
+from .models import Prediction, PredictionTally
+from .rollups import increment
+# Import prediction tallies and counter upsert
+
+OUTCOMES = ['home_win', 'draw', 'away_win']
+# Outcome buckets, in the order kept in memory
+
+
+def outcome_of(home_goals, away_goals):
+    # Position in OUTCOMES for a score
+    return 0 if home_goals > away_goals else 1 if home_goals == away_goals else 2
+
+
+class CrowdBoard:
+    # Per-process histogram of predicted scores per fixture. Predictions made
+    # here are applied immediately; other processes' predictions arrive by
+    # re-reading the persistent tallies at most every refresh_seconds.
+
+    def __init__(self, refresh_seconds, top_scores):
+        self.refresh_seconds = refresh_seconds
+        self.top_scores = top_scores
+        self.lock = threading.Lock()
+        self.fixtures = {}
+        # fixture_id -> {'loaded_at', 'scores': {(home, away): count}, 'outcomes': [home_win, draw, away_win]}
+
+    def load(self, fixture_id):
+        # Read a fixture's tallies (one indexed read of at most one row per distinct score)
+        scores = {
+            (home, away): count
+            for home, away, count in PredictionTally.objects.filter(fixture_id=fixture_id, predictions__gt=0)
+            .values_list('home_goals', 'away_goals', 'predictions')
+        }
+        outcomes = [0, 0, 0]
+        for (home, away), count in scores.items():
+            outcomes[outcome_of(home, away)] += count
+        return {'loaded_at': time.monotonic(), 'scores': scores, 'outcomes': outcomes}
+
+    def record(self, fixture_id, old, new):
+        # Move one prediction from score old to score new; either may be (None, None) for no score
+        old = old if old and old[0] is not None else None
+        new = new if new and new[0] is not None else None
+        if old == new:
+            return
+        changes = [(score, delta) for score, delta in ((old, -1), (new, 1)) if score]
+        with transaction.atomic():
+            for (home, away), delta in changes:
+                increment(PredictionTally, {'fixture_id': fixture_id, 'home_goals': home, 'away_goals': away}, {'predictions': delta})
+        with self.lock:
+            entry = self.fixtures.get(fixture_id)
+            if entry:
+                for score, delta in changes:
+                    entry['scores'][score] = entry['scores'].get(score, 0) + delta
+                    entry['outcomes'][outcome_of(*score)] += delta
+
+    def snapshot(self, fixture_id):
+        # Outcome shares and most-predicted scores for a fixture; O(1) in the number of predictions
+        with self.lock:
+            entry = self.fixtures.get(fixture_id)
+        if not entry or time.monotonic() - entry['loaded_at'] > self.refresh_seconds:
+            entry = self.load(fixture_id)
+            with self.lock:
+                self.fixtures[fixture_id] = entry
+        with self.lock:
+            scores = sorted(((count, score) for score, count in entry['scores'].items() if count > 0), reverse=True)[:self.top_scores]
+            outcomes = list(entry['outcomes'])
+        total = sum(outcomes)
+        return {
+            'total': total,
+            'outcomes': {name: self.share(count, total) for name, count in zip(OUTCOMES, outcomes)},
+            'scores': [{'score': f'{home}-{away}', **self.share(count, total)} for count, (home, away) in scores],
+        }
+
+    def share(self, count, total):
+        return {'count': count, 'share': round(count / total, 3) if total else 0.0}
+
+    def rebuild(self, fixture_ids=None):
+        # Recount tallies from the predictions themselves, for all fixtures or just fixture_ids; returns rows written
+        predictions = Prediction.objects.filter(home_goals__isnull=False)
+        tallies = PredictionTally.objects.all()
+        if fixture_ids is not None:
+            predictions = predictions.filter(fixture_id__in=fixture_ids)
+            tallies = tallies.filter(fixture_id__in=fixture_ids)
+        rows = [
+            PredictionTally(fixture_id=row['fixture_id'], home_goals=row['home_goals'], away_goals=row['away_goals'], predictions=row['n'])
+            for row in predictions.values('fixture_id', 'home_goals', 'away_goals').annotate(n=Count('id')).order_by()
+        ]
+        with transaction.atomic():
+            tallies.delete()
+            PredictionTally.objects.bulk_create(rows, batch_size=1000)
+        with self.lock:
+            if fixture_ids is None:
+                self.fixtures.clear()
+            for fixture_id in fixture_ids or []:
+                self.fixtures.pop(fixture_id, None)
+        return len(rows)
+
+
+board = CrowdBoard(settings.PREDICTION_CROWD_REFRESH_SECONDS, settings.PREDICTION_CROWD_TOP_SCORES)
+# Shared per-process crowd prediction histograms
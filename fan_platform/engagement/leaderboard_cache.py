@@ -0,0 +1,71 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+# Import hashing, JSON and threading
+from .ranked_index import index as ranked_index
+# Import ranked index, whose per-scope versions validate cached sections
+
+
+class LeaderboardCache:
+    # Per-process cache of leaderboard sections. A section is reused while its
+    # scope version is unchanged and its TTL has not run out; least recently
+    # used sections are evicted past max_entries. ETags hash the section body,
+    # so every process hands out the same tag for the same standings.
+
+    def __init__(self, ttls, max_entries):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        # key -> (scope version, expires_at, rows, etag)
+        self.hits = 0
+        self.misses = 0
+
+    def section(self, key, scope, scope_id, build):
+        # (rows, etag) for one section, calling build() only when the cached copy is stale
+        version = ranked_index.version(scope, scope_id)  # Read before building, so a racing change forces a rebuild
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == version and entry[1] > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[2], entry[3]
+            self.misses += 1
+        rows = build()
+        etag = hashlib.sha256(json.dumps(rows, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+        with self.lock:
+            self.entries[key] = (version, now + self.ttls.get(scope.split('_')[0], 30), rows, etag)  # Windowed boards share their base scope's TTL
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return rows, etag
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def etag_for(section_etags):
+    # Strong ETag for a response assembled from several sections
+    return '"' + hashlib.sha256('-'.join(section_etags).encode('ascii')).hexdigest()[:24] + '"'
+
+
+def matches(request, etag):
+    # True when If-None-Match already names this representation
+    header = request.headers.get('If-None-Match', '')
+    return any(tag.strip().removeprefix('W/') in (etag, '*') for tag in header.split(',') if tag.strip())
+
+
+cache = LeaderboardCache(settings.LEADERBOARD_CACHE_TTL, settings.LEADERBOARD_CACHE_MAX_ENTRIES)
+# Shared per-process leaderboard cache
@@ -0,0 +1,186 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+# Import Django DB utilities
+from .models import ClubStats, Comment, LeaderboardEntry, PointsBucket, Topic, UserProfile
+from .ranked_index import index as ranked_index
+from .badges import names as badge_names
+# Import points sources, the materialized leaderboard, the in-process ranked index and badge decoding
+
+GLOBAL, CLUB, TOPIC = 'global', 'club', 'topic'
+# Leaderboard scopes; global rows use scope_id 0
+TOP_SIZE = 10
+# Rows served per leaderboard section
+POINTS_PER_POSITIVE_COMMENT = 10
+# Topic points per positive comment in the topic
+WINDOWS = ('week', 'month', 'season')
+# Time windows with their own global and club boards
+WINDOW_DAYS = {'week': 7, 'month': 30}
+# Rolling window lengths; the season runs from LEADERBOARD_SEASON_START
+
+
+def window_start(window, today=None):
+    # First day counted in a window
+    today = today or timezone.localdate()
+    if window == 'season':
+        month, day = settings.LEADERBOARD_SEASON_START
+        start = today.replace(month=month, day=day)
+        return start if start <= today else start.replace(year=start.year - 1)
+    return today - timedelta(days=WINDOW_DAYS[window] - 1)
+
+
+def scope_name(scope, window=None):
+    # Scope stored for a global or club board over a window ('all' or None for all-time)
+    return scope if window in (None, 'all') else f'{scope}_{window}'
+
+
+def ahead_of(points, user_profile_id):
+    # Entries ranked above a fan with these points (ties go to the older profile)
+    return Q(points__gt=points) | Q(points=points, user_profile_id__lt=user_profile_id)
+
+
+def behind(points, user_profile_id):
+    # Entries ranked below a fan with these points
+    return Q(points__lt=points) | Q(points=points, user_profile_id__gt=user_profile_id)
+
+
+def set_points(scope, scope_id, user_profile_id, points, badges):
+    # Move a fan to a new points total in one scope, shifting only the ranks of the fans they pass
+    entries = LeaderboardEntry.objects.filter(scope=scope, scope_id=scope_id)
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                entry = entries.select_for_update().filter(user_profile_id=user_profile_id).first()
+                if entry is None:
+                    shifted = entries.filter(behind(points, user_profile_id)).update(rank=F('rank') + 1)
+                    entries.create(
+                        scope=scope, scope_id=scope_id, user_profile_id=user_profile_id, points=points, badges=badges,
+                        rank=entries.count() - shifted + 1, changed_at=timezone.now()
+                    )
+                    transaction.on_commit(lambda: ranked_index.update(scope, scope_id, user_profile_id, points, badges))
+                    return
+                if points > entry.points:
+                    entry.rank -= entries.filter(ahead_of(entry.points, user_profile_id), behind(points, user_profile_id)).update(rank=F('rank') + 1)
+                elif points < entry.points:
+                    entry.rank += entries.filter(behind(entry.points, user_profile_id), ahead_of(points, user_profile_id)).update(rank=F('rank') - 1)
+                elif badges == entry.badges:
+                    return
+                entry.points = points
+                entry.badges = badges
+                entry.changed_at = timezone.now()
+                entry.save(update_fields=['points', 'rank', 'badges', 'changed_at'])
+                transaction.on_commit(lambda: ranked_index.update(scope, scope_id, user_profile_id, points, badges))
+                return
+        except IntegrityError:
+            if attempt:
+                raise
+            # Another request created the entry first; move it instead
+
+
+def sync_club_stats(user_profile_id, club_ids):
+    # Refresh a fan's club entries and global entry from ClubStats
+    stats = list(ClubStats.objects.filter(user_profile_id=user_profile_id).order_by('pk').values_list('club_id', 'points', 'badge_mask'))
+    for club_id, points, badges in stats:
+        if club_id in club_ids:
+            set_points(CLUB, club_id, user_profile_id, points or 0, badge_names(badges))
+    global_badges = badge_names(stats[0][2]) if stats else []  # Global badges come from the fan's first club
+    set_points(GLOBAL, 0, user_profile_id, sum(points or 0 for club_id, points, badges in stats), global_badges)
+    club_badges = {club_id: badge_names(badges) for club_id, points, badges in stats}
+    for window in WINDOWS:  # Windowed totals are re-summed from the fan's daily buckets
+        totals = dict(
+            PointsBucket.objects.filter(user_profile_id=user_profile_id, day__gte=window_start(window))
+            .values('club_id').annotate(total=Sum('points')).values_list('club_id', 'total').order_by()
+        )
+        for club_id in club_ids:
+            set_points(scope_name(CLUB, window), club_id, user_profile_id, totals.get(club_id, 0), club_badges.get(club_id, []))
+        set_points(scope_name(GLOBAL, window), 0, user_profile_id, sum(totals.values()), global_badges)
+
+
+def sync_topics(user_profile_id, topic_ids):
+    # Refresh a fan's topic entries from their positive comments
+    topic_ids = {topic_id for topic_id in topic_ids if topic_id}
+    if not topic_ids:
+        return
+    positives = dict(
+        Comment.objects.filter(user_profile_id=user_profile_id, topic_id__in=topic_ids, sentiment='Positive')
+        .values('topic_id').annotate(n=Count('id')).values_list('topic_id', 'n')
+    )
+    badges = dict(ClubStats.objects.filter(user_profile_id=user_profile_id).values_list('club_id', 'badge_mask'))
+    for topic_id, club_id in Topic.objects.filter(id__in=topic_ids).values_list('id', 'club_id'):
+        set_points(TOPIC, topic_id, user_profile_id, POINTS_PER_POSITIVE_COMMENT * positives.get(topic_id, 0),
+                   badge_names(badges.get(club_id)))
+
+
+def sync(changes):
+    # Apply {user_profile_id: (club_ids, topic_ids)} collected by a write path
+    for user_profile_id, (club_ids, topic_ids) in changes.items():
+        sync_club_stats(user_profile_id, set(club_ids))
+        sync_topics(user_profile_id, topic_ids)
+
+
+def top(scope, scope_id, limit=TOP_SIZE):
+    # Highest-ranked fans in a scope: one indexed range read
+    return list(
+        LeaderboardEntry.objects.filter(scope=scope, scope_id=scope_id, rank__lte=limit).order_by('rank')
+        .values('rank', 'points', 'badges', username=F('user_profile__user__username'))
+    )
+
+
+def rebuild(windows_only=False):
+    # Recompute entries from ClubStats, comments and daily points buckets; returns rows written per scope.
+    # windows_only re-sums just the week/month/season boards, which is how windows roll forward each day.
+    scopes = defaultdict(list)  # (scope, scope_id) -> [(points, user_profile_id, badges)]
+    first_badges = {}
+    club_badges = {}
+    for user_profile_id, club_id, points, badges in ClubStats.objects.order_by('pk').values_list('user_profile_id', 'club_id', 'points', 'badge_mask').iterator():
+        if not windows_only:
+            scopes[(CLUB, club_id)].append((points or 0, user_profile_id, badge_names(badges)))
+        first_badges.setdefault(user_profile_id, badge_names(badges))
+        club_badges[(user_profile_id, club_id)] = badge_names(badges)
+    if not windows_only:
+        totals = defaultdict(int)
+        for (scope, club_id), rows in list(scopes.items()):
+            for points, user_profile_id, badges in rows:
+                totals[user_profile_id] += points
+        for user_profile_id in UserProfile.objects.values_list('id', flat=True).iterator():
+            scopes[(GLOBAL, 0)].append((totals[user_profile_id], user_profile_id, first_badges.get(user_profile_id, [])))
+        topic_clubs = dict(Topic.objects.values_list('id', 'club_id'))
+        for user_profile_id, topic_id, n in Comment.objects.filter(sentiment='Positive', topic__isnull=False) \
+                .values('user_profile_id', 'topic_id').annotate(n=Count('id')).values_list('user_profile_id', 'topic_id', 'n').order_by().iterator():
+            scopes[(TOPIC, topic_id)].append((POINTS_PER_POSITIVE_COMMENT * n, user_profile_id, club_badges.get((user_profile_id, topic_clubs.get(topic_id)), [])))
+
+    window_scopes = [scope_name(scope, window) for window in WINDOWS for scope in (GLOBAL, CLUB)]
+    for window in WINDOWS:
+        windowed = defaultdict(int)  # (club_id, user_profile_id) -> points, one grouped read per window
+        for user_profile_id, club_id, total in PointsBucket.objects.filter(day__gte=window_start(window)) \
+                .values('user_profile_id', 'club_id').annotate(total=Sum('points')).values_list('user_profile_id', 'club_id', 'total').order_by().iterator():
+            windowed[(club_id, user_profile_id)] = total
+        for scope_id, user_profile_id in LeaderboardEntry.objects.filter(scope=scope_name(CLUB, window)).values_list('scope_id', 'user_profile_id').iterator():
+            windowed.setdefault((scope_id, user_profile_id), 0)  # Fans whose points left the window drop to 0 rather than vanish
+        totals = defaultdict(int)
+        for (club_id, user_profile_id), total in windowed.items():
+            scopes[(scope_name(CLUB, window), club_id)].append((total, user_profile_id, club_badges.get((user_profile_id, club_id), [])))
+            totals[user_profile_id] += total
+        for user_profile_id in LeaderboardEntry.objects.filter(scope=scope_name(GLOBAL, window)).values_list('user_profile_id', flat=True).iterator():
+            totals.setdefault(user_profile_id, 0)
+        for user_profile_id, total in totals.items():
+            scopes[(scope_name(GLOBAL, window), 0)].append((total, user_profile_id, first_badges.get(user_profile_id, [])))
+
+    written = defaultdict(int)
+    with transaction.atomic():
+        (LeaderboardEntry.objects.filter(scope__in=window_scopes) if windows_only else LeaderboardEntry.objects.all()).delete()
+        batch = []
+        for (scope, scope_id), rows in scopes.items():
+            rows.sort(key=lambda row: (-row[0], row[1]))
+            for rank, (points, user_profile_id, badges) in enumerate(rows, start=1):
+                batch.append(LeaderboardEntry(scope=scope, scope_id=scope_id, user_profile_id=user_profile_id, points=points, rank=rank, badges=badges))
+            written[scope] += len(rows)
+            if len(batch) >= 5000:
+                LeaderboardEntry.objects.bulk_create(batch, batch_size=1000)
+                batch = []
+        LeaderboardEntry.objects.bulk_create(batch, batch_size=1000)
+        transaction.on_commit(ranked_index.clear)
+    return dict(written)
@@ -0,0 +1,103 @@
+from collections import defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+# Import Django DB utilities
+from .models import ClubStats, PointsBucket, PointsEvent, UserProfile
+from .rollups import increment_many
+# Import ledger, balance models and counter upsert
+
+KEY_CHUNK = 500
+# Events inserted per statement
+
+
+def award_many(events):
+    # Record unsaved PointsEvents and apply them to balances; events whose
+    # idempotency key was already used are skipped. Returns the events applied.
+    by_key = {event.idempotency_key: event for event in events}
+    if not by_key:
+        return []
+    fresh = list(by_key.values())
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                PointsEvent.objects.bulk_create(fresh, batch_size=KEY_CHUNK)  # Write first, so SQLite takes the write lock up front
+        except IntegrityError:
+            # Some keys were used before (or by a concurrent writer); insert one at a time
+            applied = []
+            for event in fresh:
+                event.pk = None
+                try:
+                    with transaction.atomic():
+                        event.save()
+                    applied.append(event)
+                except IntegrityError:
+                    pass
+            fresh = applied
+        apply_balances(fresh)
+    return fresh
+
+
+def award(user_profile_id, delta, reason, key, club_id=None, source=None):
+    # Record one ledger event; returns True if it was applied, False if the key was already used
+    source_type, source_id = source or ('', None)
+    return bool(award_many([PointsEvent(
+        user_profile_id=user_profile_id, club_id=club_id, delta=delta, reason=reason,
+        idempotency_key=key, source_type=source_type, source_id=source_id
+    )]))
+
+
+def apply_balances(events):
+    # Fold events into ClubStats/UserProfile and the daily points buckets with atomic increments, one UPDATE per distinct delta
+    deltas = defaultdict(int)
+    daily = defaultdict(int)
+    for event in events:
+        deltas[(event.user_profile_id, event.club_id)] += event.delta
+        if event.club_id is None or event.reason == 'opening':
+            continue  # Windowed boards count club points earned since the ledger started
+        if event.reason == 'reset':
+            PointsBucket.objects.filter(user_profile_id=event.user_profile_id, club_id=event.club_id).delete()
+            daily = defaultdict(int, {key: delta for key, delta in daily.items() if key[:2] != (event.user_profile_id, event.club_id)})
+            continue  # A reset empties the fan's windows too
+        daily[(event.user_profile_id, event.club_id, timezone.localdate(event.created_at))] += event.delta
+    by_club = defaultdict(dict)
+    for (user_profile_id, club_id), delta in deltas.items():
+        by_club[club_id][user_profile_id] = delta
+    profiles_by_delta = defaultdict(list)
+    for user_profile_id, delta in by_club.pop(None, {}).items():
+        if delta:
+            profiles_by_delta[delta].append(user_profile_id)
+    for delta, user_profile_ids in profiles_by_delta.items():
+        UserProfile.objects.filter(pk__in=user_profile_ids).update(points=F('points') + delta)
+    for club_id, club_deltas in by_club.items():
+        increment_many(ClubStats, {'club_id': club_id}, 'user_profile_id', club_deltas, 'points')
+    by_day = defaultdict(dict)
+    for (user_profile_id, club_id, day), delta in daily.items():
+        by_day[(club_id, day)][user_profile_id] = delta
+    for (club_id, day), day_deltas in by_day.items():
+        increment_many(PointsBucket, {'club_id': club_id, 'day': day}, 'user_profile_id', day_deltas, 'points')
+
+
+def unrecorded(events):
+    # Events whose idempotency key is not in the ledger yet, so batch re-runs insert nothing
+    keys = [event.idempotency_key for event in events]
+    used = set()
+    for start in range(0, len(keys), KEY_CHUNK):
+        used.update(PointsEvent.objects.filter(idempotency_key__in=keys[start:start + KEY_CHUNK]).values_list('idempotency_key', flat=True))
+    return [event for event in events if event.idempotency_key not in used]
+
+
+def reset_generation(user_profile_id, club_id):
+    # Id of the fan's last stats reset for a club (0 if never), so once-only awards can be earned again after a reset
+    return PointsEvent.objects.filter(
+        user_profile_id=user_profile_id, club_id=club_id, reason='reset'
+    ).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def reset_generations(pairs):
+    # reset_generation for many (user_profile_id, club_id) pairs in one grouped query
+    pairs = set(pairs)
+    last = PointsEvent.objects.filter(user_profile_id__in={user_profile_id for user_profile_id, club_id in pairs}, reason='reset') \
+        .values_list('user_profile_id', 'club_id').annotate(last=Max('id')).order_by()
+    generations = {(user_profile_id, club_id): last_id for user_profile_id, club_id, last_id in last}
+    return {pair: generations.get(pair, 0) for pair in pairs}
@@ -0,0 +1,113 @@
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+# Import threading, time and Django DB utilities
+from .models import FixtureMood, FixtureMoodBucket
+from .rollups import SENTIMENT_FIELDS, increment
+# Import mood rollup models and counter upsert
+
+WINDOWS = {'last_1_min': 60, 'last_5_min': 300}
+# Rolling windows served by the mood endpoint, in seconds
+
+
+class MoodBoard:
+    # Per-process live mood per fixture: recent buckets plus since-kickoff totals.
+    # Comments ingested here are applied immediately; other processes' comments
+    # arrive by re-reading the persistent rollup at most every refresh_seconds.
+
+    def __init__(self, bucket_seconds, refresh_seconds):
+        self.bucket_seconds = bucket_seconds
+        self.refresh_seconds = refresh_seconds
+        self.lock = threading.Lock()
+        self.fixtures = {}
+        # fixture_id -> {'loaded_at', 'total': [pos, neu, neg], 'buckets': {index: [pos, neu, neg]}}
+
+    def bucket_index(self, at):
+        return int(at.timestamp()) // self.bucket_seconds
+
+    def bucket_start(self, index):
+        return datetime.fromtimestamp(index * self.bucket_seconds, tz=dt_timezone.utc)
+
+    def oldest_index(self, now_index):
+        # First bucket still inside the widest window
+        return now_index - max(WINDOWS.values()) // self.bucket_seconds + 1
+
+    def load(self, fixture_id, now_index):
+        # Read totals and recent buckets from the persistent rollup (two indexed reads)
+        total = FixtureMood.objects.filter(fixture_id=fixture_id).values_list('positive', 'neutral', 'negative').first()
+        buckets = FixtureMoodBucket.objects.filter(
+            fixture_id=fixture_id, bucket_start__gte=self.bucket_start(self.oldest_index(now_index))
+        ).values_list('bucket_start', 'positive', 'neutral', 'negative')
+        return {
+            'loaded_at': time.monotonic(),
+            'total': list(total) if total else [0, 0, 0],
+            'buckets': {self.bucket_index(start): [pos, neu, neg] for start, pos, neu, neg in buckets},
+        }
+
+    def record(self, fixture_id, label, at=None):
+        # Fold one scored match comment into the rollups
+        field = SENTIMENT_FIELDS.get(label)
+        if not field:
+            return
+        at = at or timezone.now()
+        index = self.bucket_index(at)
+        with transaction.atomic():
+            increment(FixtureMood, {'fixture_id': fixture_id}, {field: 1})
+            increment(FixtureMoodBucket, {'fixture_id': fixture_id, 'bucket_start': self.bucket_start(index)}, {field: 1})
+        position = list(SENTIMENT_FIELDS).index(label)
+        with self.lock:
+            entry = self.fixtures.get(fixture_id)
+            if entry:
+                entry['total'][position] += 1
+                entry['buckets'].setdefault(index, [0, 0, 0])[position] += 1
+
+    def snapshot(self, fixture_id):
+        # Current mood for a fixture; O(1) in the number of comments
+        now_index = self.bucket_index(timezone.now())
+        with self.lock:
+            entry = self.fixtures.get(fixture_id)
+        if not entry or time.monotonic() - entry['loaded_at'] > self.refresh_seconds:
+            entry = self.load(fixture_id, now_index)
+            with self.lock:
+                self.fixtures[fixture_id] = entry
+        with self.lock:
+            oldest = self.oldest_index(now_index)
+            for index in [index for index in entry['buckets'] if index < oldest]:
+                del entry['buckets'][index]
+            buckets = dict(entry['buckets'])
+            total = list(entry['total'])
+        data = {'since_kickoff': self.counts(total)}
+        for name, seconds in WINDOWS.items():
+            first = now_index - seconds // self.bucket_seconds + 1
+            window = [0, 0, 0]
+            for index, counts in buckets.items():
+                if index >= first:
+                    window = [a + b for a, b in zip(window, counts)]
+            data[name] = self.counts(window)
+        return data
+
+    def counts(self, values):
+        # Label counts plus a -1..1 mood score for the meter
+        positive, neutral, negative = values
+        total = positive + neutral + negative
+        return {
+            'positive': positive,
+            'neutral': neutral,
+            'negative': negative,
+            'total': total,
+            'mood': round((positive - negative) / total, 3) if total else 0.0,
+        }
+
+    def reset(self, fixture_id):
+        # Clear a fixture's mood when a simulation starts or ends
+        FixtureMood.objects.filter(fixture_id=fixture_id).delete()
+        FixtureMoodBucket.objects.filter(fixture_id=fixture_id).delete()
+        with self.lock:
+            self.fixtures.pop(fixture_id, None)
+
+
+board = MoodBoard(settings.LIVE_MOOD_BUCKET_SECONDS, settings.LIVE_MOOD_REFRESH_SECONDS)
+# Shared per-process mood board
@@ -0,0 +1,47 @@
+from collections import defaultdict  # Import defaultdict for per-fan counts
+from datetime import datetime, time  # Import datetime for period boundaries
+from django.core.management.base import BaseCommand  # Import BaseCommand
+from django.db import transaction  # Import transactions for the rebuild
+from django.db.models import Count, Q, Sum  # Import aggregates
+from django.db.models.functions import Coalesce  # Import Coalesce for settlement times
+from django.utils import timezone  # Import timezone for local periods
+from engagement.models import ChallengeProgress, Comment, NewsComment, Prediction  # Import counters and their sources
+from engagement.progress import PERIODS, period_start  # Import period helpers
+
+class Command(BaseCommand):  # Define command class
+    help = 'Rebuilds the challenge progress counters from comments, news comments and predictions'  # Set help message
+
+    def handle(self, *args, **options):  # Define command logic
+        starts = {field: period_start(field) for field in PERIODS}  # Current week and month
+        since = {field: timezone.make_aware(datetime.combine(start, time.min)) for field, start in starts.items()}
+        counts = defaultdict(lambda: defaultdict(int))  # (user_profile_id, club_id) -> counter -> value
+
+        def add(user_profile_id, club_id, **values):  # Count on the club row and the fan's totals row
+            for key in {(user_profile_id, club_id), (user_profile_id, None)}:
+                for field, value in values.items():
+                    counts[key][field] += value or 0
+
+        for row in Comment.objects.values('user_profile_id', 'club_id').annotate(
+            n=Count('id'), positive=Count('id', filter=Q(sentiment='Positive')),
+            week=Count('id', filter=Q(created_at__gte=since['week_comments'])),
+        ).order_by():
+            add(row['user_profile_id'], row['club_id'], comments=row['n'], positive_comments=row['positive'], week_comments=row['week'])
+        for row in NewsComment.objects.values('user_profile_id', 'news_article__club_id').annotate(
+            n=Count('id'), likes=Sum('likes'), dislikes=Sum('dislikes'),
+        ).order_by():
+            add(row['user_profile_id'], row['news_article__club_id'], news_comments=row['n'], reactions=(row['likes'] or 0) + (row['dislikes'] or 0))
+        for row in Prediction.objects.filter(is_correct=True).annotate(settled_at=Coalesce('verified_at', 'created_at')) \
+                .values('user_profile_id', 'club_id').annotate(
+                    n=Count('id'), month=Count('id', filter=Q(settled_at__gte=since['month_correct_predictions'])),
+                ).order_by():
+            add(row['user_profile_id'], row['club_id'], correct_predictions=row['n'], month_correct_predictions=row['month'])
+
+        rows = [
+            ChallengeProgress(user_profile_id=user_profile_id, club_id=club_id, **values,
+                              **{start_field: starts[field] for field, start_field in PERIODS.items()})
+            for (user_profile_id, club_id), values in counts.items()
+        ]
+        with transaction.atomic():
+            ChallengeProgress.objects.all().delete()
+            ChallengeProgress.objects.bulk_create(rows, batch_size=1000)
+        self.stdout.write(self.style.SUCCESS(f'{len(rows)} challenge progress rows written'))  # Print success
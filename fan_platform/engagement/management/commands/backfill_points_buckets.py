@@ -0,0 +1,30 @@
+from collections import defaultdict  # Import defaultdict for daily sums
+from django.core.management.base import BaseCommand  # Import BaseCommand
+from django.db import transaction  # Import transactions for the rebuild
+from django.utils import timezone  # Import timezone for local days
+from engagement import leaderboards  # Import leaderboard engine
+from engagement.models import PointsBucket, PointsEvent  # Import ledger and buckets
+
+class Command(BaseCommand):  # Define command class
+    help = 'Rebuilds the daily points buckets from the PointsEvent ledger, then the windowed leaderboards'  # Set help message
+
+    def handle(self, *args, **options):  # Define command logic
+        daily = defaultdict(int)  # (user_profile_id, club_id, day) -> points
+        events = PointsEvent.objects.filter(club__isnull=False).exclude(reason='opening').order_by('id') \
+            .values_list('user_profile_id', 'club_id', 'reason', 'delta', 'created_at')
+        for user_profile_id, club_id, reason, delta, created_at in events.iterator(chunk_size=5000):  # Replay in ledger order
+            if reason == 'reset':
+                daily = defaultdict(int, {key: value for key, value in daily.items() if key[:2] != (user_profile_id, club_id)})
+                continue
+            daily[(user_profile_id, club_id, timezone.localdate(created_at))] += delta
+        buckets = [
+            PointsBucket(user_profile_id=user_profile_id, club_id=club_id, day=day, points=points)
+            for (user_profile_id, club_id, day), points in daily.items() if points
+        ]
+        with transaction.atomic():
+            PointsBucket.objects.all().delete()
+            PointsBucket.objects.bulk_create(buckets, batch_size=1000)
+        self.stdout.write(f'{len(buckets)} daily buckets written')  # Print progress
+        for scope, rows in sorted(leaderboards.rebuild(windows_only=True).items()):
+            self.stdout.write(f'{scope}: {rows} entries')  # Print progress
+        self.stdout.write(self.style.SUCCESS('Points buckets rebuilt'))  # Print success
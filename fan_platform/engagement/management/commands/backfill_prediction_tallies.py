@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand  # Import BaseCommand
+from engagement.crowd import board as crowd_board  # Import crowd prediction histograms
+
+class Command(BaseCommand):  # Define command class
+    help = 'Rebuilds the per-fixture predicted score tallies behind the crowd prediction histogram'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--fixture', type=int, action='append', help='Only rebuild this fixture (repeatable)')
+
+    def handle(self, *args, **options):  # Define command logic
+        rows = crowd_board.rebuild(options['fixture'])
+        self.stdout.write(self.style.SUCCESS(f'{rows} prediction tallies written'))  # Print success
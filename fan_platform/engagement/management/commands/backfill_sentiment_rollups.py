@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand  # Import BaseCommand
+from django.db import transaction  # Import transactions for the rebuild
+from engagement import rollups  # Import rollup helpers
+from engagement.models import Comment, NewsComment, MatchComment, SentimentRollup  # Import comment and rollup models
+
+SOURCES = {
+    'comment': Comment,
+    'newscomment': NewsComment,
+    'matchcomment': MatchComment,
+}  # Comment tables counted in the rollups
+
+class Command(BaseCommand):  # Define command class
+    help = 'Rebuilds the per-club, per-topic, per-day sentiment rollups from the comment tables'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--models', nargs='+', choices=list(SOURCES), default=list(SOURCES), help='Comment tables to rebuild')
+
+    def handle(self, *args, **options):  # Define command logic
+        for name in options['models']:
+            counts = rollups.grouped_counts(name, SOURCES[name].objects.all())  # One grouped query per table
+            rows = {}
+            for (club_id, topic_key, source, day, label), n in counts.items():
+                row = rows.setdefault((club_id, topic_key, day), SentimentRollup(club_id=club_id, topic_key=topic_key, source=source, day=day))
+                setattr(row, rollups.SENTIMENT_FIELDS[label], n)
+            with transaction.atomic():  # Swap the table's rollups in one step
+                SentimentRollup.objects.filter(source=name).delete()
+                SentimentRollup.objects.bulk_create(rows.values(), batch_size=500)
+            self.stdout.write(f'{name}: {len(rows)} rollup rows from {sum(counts.values())} comments')  # Print progress
+        self.stdout.write(self.style.SUCCESS('Sentiment rollups rebuilt'))  # Print success
@@ -0,0 +1,53 @@
+import random  # Import random for sampled lookups
+import time  # Import time for timings
+from django.contrib.auth.models import User  # Import User for scratch fans
+from django.core.management.base import BaseCommand, CommandError  # Import BaseCommand
+from django.db import connection, transaction  # Import connection for query plans and transactions to roll back
+from engagement.models import Club, Fixture, Prediction, UserProfile  # Import models
+
+class Command(BaseCommand):  # Define command class
+    help = 'Times the prediction lookups used by the prediction pages and settlement; everything it writes is rolled back'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--fans', type=int, default=20000, help='Scratch fans, each predicting every fixture')
+        parser.add_argument('--fixtures', type=int, default=10, help='Scratch fixtures')
+        parser.add_argument('--lookups', type=int, default=2000, help='Per-fan lookups to time')
+
+    def handle(self, *args, **options):  # Define command logic
+        club = Club.objects.first()
+        if club is None:
+            raise CommandError('Create a club first')
+        rng = random.Random(0)
+        with transaction.atomic():
+            fixtures = [Fixture.objects.create(club=club, opponent=f'Benchmark FC {i}') for i in range(options['fixtures'])]
+            User.objects.bulk_create([User(username=f'lookup-bench-{i}', password='!') for i in range(options['fans'])], batch_size=2000)
+            users = User.objects.filter(username__startswith='lookup-bench-').values_list('pk', flat=True)
+            UserProfile.objects.bulk_create([UserProfile(user_id=pk, active_club=club) for pk in users], batch_size=2000)
+            fans = list(UserProfile.objects.filter(user__username__startswith='lookup-bench-').values_list('pk', flat=True))
+            for fixture in fixtures:
+                Prediction.objects.bulk_create([
+                    Prediction(user_profile_id=pk, fixture_id=fixture.id, club=club, text=f'{rng.randint(0, 4)}-{rng.randint(0, 4)}')
+                    for pk in fans
+                ], batch_size=2000)
+            self.stdout.write(f'{len(fans) * len(fixtures)} predictions for {len(fixtures)} fixtures')  # Print table size
+
+            started = time.monotonic()
+            for fixture in fixtures:
+                Prediction.objects.filter(fixture_id=fixture.id, text='1-0').count()  # Settlement-style read of one fixture
+            self.report('fixture scan', len(fixtures), started, Prediction.objects.filter(fixture_id=fixtures[0].id, text='1-0'))
+            pairs = [(rng.choice(fans), rng.choice(fixtures).id) for _ in range(options['lookups'])]
+            started = time.monotonic()
+            for user_profile_id, fixture_id in pairs:
+                Prediction.objects.filter(user_profile_id=user_profile_id, fixture_id=fixture_id).first()  # challenges_predict / live_match lookup
+            self.report('fan lookup', len(pairs), started, Prediction.objects.filter(user_profile_id=pairs[0][0], fixture_id=pairs[0][1]))
+            transaction.set_rollback(True)  # Leave the database as it was
+        self.stdout.write(self.style.SUCCESS('Benchmark finished; scratch rows rolled back'))  # Print success
+
+    def report(self, label, count, started, queryset):  # Print timing and the plan SQLite picked
+        elapsed = time.monotonic() - started
+        self.stdout.write(f'{label}: {count} queries in {elapsed:.2f}s ({elapsed / count * 1000:.2f} ms each)')
+        if connection.vendor == 'sqlite':
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                self.stdout.write('  plan: ' + '; '.join(row[-1] for row in cursor.fetchall()))
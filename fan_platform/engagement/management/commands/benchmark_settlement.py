@@ -0,0 +1,66 @@
+import random  # Import random for predicted scores
+import time  # Import time for timings
+from django.contrib.auth.models import User  # Import User for scratch fans
+from django.core.management.base import BaseCommand, CommandError  # Import BaseCommand
+from django.db import transaction  # Import transactions to roll the benchmark back
+from engagement import settlement  # Import settlement engine
+from engagement.models import Club, Fixture, Prediction, UserProfile  # Import models
+
+class Command(BaseCommand):  # Define command class
+    help = 'Times settling one fixture with many predictions; everything it writes is rolled back'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--predictions', type=int, default=100000, help='Predictions (one per scratch fan) for the fixture')
+        parser.add_argument('--correct', type=float, default=0.1, help='Share of predictions that match the result')
+        parser.add_argument('--compare', type=int, default=0, help='Also time the old per-prediction save() on this many predictions')
+
+    def handle(self, *args, **options):  # Define command logic
+        club = Club.objects.first()
+        if club is None:
+            raise CommandError('Create a club first')
+        count = options['predictions']
+        rng = random.Random(0)
+        with transaction.atomic():
+            started = time.monotonic()
+            fixture = Fixture.objects.create(club=club, opponent='Benchmark FC', final_result='2-1')
+            User.objects.bulk_create([User(username=f'settle-bench-{i}', password='!') for i in range(count)], batch_size=2000)
+            users = User.objects.filter(username__startswith='settle-bench-').values_list('pk', flat=True)
+            UserProfile.objects.bulk_create([UserProfile(user_id=pk, active_club=club) for pk in users], batch_size=2000)
+            fans = UserProfile.objects.filter(user__username__startswith='settle-bench-').values_list('pk', flat=True)
+            scores = [(2, 1) if rng.random() < options['correct'] else (rng.randint(0, 4), rng.randint(0, 4)) for pk in fans]
+            Prediction.objects.bulk_create([
+                Prediction(user_profile_id=pk, fixture_id=fixture.id, club=club, text=f'{home}-{away}', home_goals=home, away_goals=away)
+                for pk, (home, away) in zip(fans, scores)
+            ], batch_size=2000)
+            self.stdout.write(f'{count} predictions created in {time.monotonic() - started:.1f}s')  # Print setup time
+
+            if options['compare']:
+                sample = list(Prediction.objects.filter(fixture_id=fixture.id)[:options['compare']])
+                started = time.monotonic()
+                with transaction.atomic():
+                    for prediction in sample:
+                        prediction.save()  # The old settlement: one save() per prediction
+                    transaction.set_rollback(True)
+                elapsed = time.monotonic() - started
+                self.stdout.write(f'save() loop: {len(sample)} predictions in {elapsed:.2f}s, '
+                                  f'~{elapsed * count / max(len(sample), 1):.0f}s projected for {count}')  # Print old timing
+
+            started = time.monotonic()
+            correct, wrong = settlement.settle(fixture.id, '2-1')
+            settled = time.monotonic() - started
+            winners = Prediction.objects.filter(fixture_id=fixture.id, is_correct=True).values_list('user_profile_id', flat=True)
+            started = time.monotonic()
+            settlement.check_challenges(set(winners))  # Runs on commit in real settlements
+            checked = time.monotonic() - started
+            started = time.monotonic()
+            stats = settlement.accuracy(fixture.id)
+            counted = time.monotonic() - started
+            started = time.monotonic()
+            again = settlement.settle(fixture.id, '2-1')
+            repeat = time.monotonic() - started
+            transaction.set_rollback(True)  # Leave the database as it was
+        self.stdout.write(self.style.SUCCESS(
+            f'Settled {count} predictions ({correct} correct) in {settled:.2f}s, challenges checked in {checked:.2f}s, '
+            f'accuracy ({stats["exact"]} exact, {stats["difference"]} goal difference, {stats["outcome"]} outcome, '
+            f'{stats["points"]} points) in {counted:.2f}s, re-settling changed {sum(again)} in {repeat:.2f}s'
+        ))  # Print success
@@ -0,0 +1,18 @@
+from pathlib import Path  # Import Path for file handling
+from django.conf import settings  # Import settings for lexicon path
+from django.core.management.base import BaseCommand, CommandError  # Import BaseCommand
+import nltk.data  # Import NLTK data loader (local lookup only)
+from engagement.sentiment import NLTK_LEXICON_RESOURCE  # Import lexicon resource name
+
+class Command(BaseCommand):  # Define command class
+    help = 'Copies the locally installed VADER lexicon into SENTIMENT_LEXICON_PATH so workers never download it'  # Set help message
+
+    def handle(self, *args, **options):  # Define command logic
+        try:
+            lexicon_text = nltk.data.load(NLTK_LEXICON_RESOURCE, format='text')  # Read installed lexicon
+        except LookupError:  # Lexicon not installed
+            raise CommandError("VADER lexicon is not installed. Run 'python -m nltk.downloader vader_lexicon' first.")
+        target = Path(settings.SENTIMENT_LEXICON_PATH)  # Resolve bundle path
+        target.parent.mkdir(parents=True, exist_ok=True)  # Create data directory
+        target.write_text(lexicon_text, encoding='utf-8')  # Write bundled lexicon
+        self.stdout.write(self.style.SUCCESS(f'Bundled {len(lexicon_text.splitlines())} lexicon entries into {target}'))  # Print success
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand  # Import BaseCommand
+from engagement import classification  # Import background classifier
+
+class Command(BaseCommand):  # Define command class
+    help = 'Classifies all pending comments and applies their points and badges'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--batch-size', type=int, default=None, help='Pending comments scored per batch')  # Batch size option
+
+    def handle(self, *args, **options):  # Define command logic
+        total = 0  # Track classified comments
+        while True:  # Drain queue batch by batch
+            scored = classification.classify_pending(options['batch_size'])  # Classify one batch
+            if not scored:  # Queue empty
+                break
+            total += scored  # Count batch
+            self.stdout.write(f'Classified {total} comments...')  # Print progress
+        self.stdout.write(self.style.SUCCESS(f'Classified {total} pending comments'))  # Print success
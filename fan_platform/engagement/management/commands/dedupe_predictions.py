@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand  # Import BaseCommand
+from django.db import transaction  # Import transactions for each batch
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Window  # Import aggregates, subqueries and window expressions
+from django.db.models.functions import Coalesce, RowNumber  # Import Coalesce for fans left without predictions and RowNumber to rank duplicates
+from engagement.crowd import board as crowd_board  # Import crowd prediction histograms
+from engagement.models import Prediction, UserProfile  # Import models
+from engagement.rollups import IN_CHUNK  # Import batch size for IN (...) lists
+
+class Command(BaseCommand):  # Define command class
+    help = 'Keeps the latest prediction per fan and fixture, deletes the rest and recounts fans\' prediction counters'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--club', type=int, help='Only predictions for this club\'s fixtures (and the fans who made them)')
+        parser.add_argument('--dry-run', action='store_true', help='Report duplicates and counters that differ without fixing them')
+        parser.add_argument('--batch', type=int, default=IN_CHUNK, help='Fans handled per query and transaction')
+
+    def handle(self, *args, **options):  # Define command logic
+        predictions = Prediction.objects.all()
+        fans = UserProfile.objects.all()
+        if options['club'] is not None:
+            predictions = predictions.filter(fixture__club_id=options['club'])  # All of a pair's rows share the fixture's club
+            fans = fans.filter(Exists(predictions.filter(user_profile_id=OuterRef('pk'))))
+        fans = fans.order_by('pk').values_list('pk', flat=True)
+        ranked = predictions.annotate(rank=Window(RowNumber(), partition_by=[F('user_profile_id'), F('fixture_id')], order_by=F('id').desc()))
+        # Latest (highest id) prediction per fan and fixture ranks 1; memory and time per batch are bounded by --batch fans
+
+        kept = Prediction.objects.filter(user_profile_id=OuterRef('pk')).values('user_profile_id').annotate(n=Count('id')).order_by()
+        submitted = ~Q(text='')  # Empty placeholder rows are not predictions yet
+
+        deleted = fixed = 0
+        fixtures = set()  # Fixtures whose crowd tallies need a recount
+        last = 0
+        while True:
+            batch = list(fans.filter(pk__gt=last)[:options['batch']])  # Keyset pagination, no OFFSET scans
+            if not batch:
+                break
+            last = batch[-1]
+            losers = list(ranked.filter(user_profile_id__in=batch, rank__gt=1).values_list('id', 'fixture_id'))
+            loser_ids = [pk for pk, fixture_id in losers]
+            counts = {
+                row['user_profile_id']: (row['made'], row['correct'])
+                for row in Prediction.objects.filter(user_profile_id__in=batch).exclude(id__in=loser_ids)
+                .values('user_profile_id').annotate(made=Count('id', filter=submitted), correct=Count('id', filter=Q(is_correct=True))).order_by()
+            }  # Counters as they will be once the losers are gone
+            fixes = [
+                pk for pk, made, correct in UserProfile.objects.filter(pk__in=batch).values_list('pk', 'predictions', 'correct_predictions')
+                if (made, correct) != counts.get(pk, (0, 0))
+            ]
+            deleted += len(losers)
+            fixed += len(fixes)
+            fixtures.update(fixture_id for pk, fixture_id in losers)
+            if options['dry_run']:
+                continue
+            with transaction.atomic():
+                Prediction.objects.filter(id__in=loser_ids).delete()
+                UserProfile.objects.filter(pk__in=fixes).update(
+                    predictions=Coalesce(Subquery(kept.filter(submitted).values('n')), 0),
+                    correct_predictions=Coalesce(Subquery(kept.filter(is_correct=True).values('n')), 0),
+                )  # One UPDATE recounts the batch from the surviving rows
+
+        self.stdout.write(f'{deleted} duplicate predictions across {len(fixtures)} fixtures and {fixed} fans with wrong prediction counters')  # Print summary
+        if options['dry_run']:
+            return
+        fixtures = sorted(fixtures)
+        for start in range(0, len(fixtures), IN_CHUNK):
+            crowd_board.rebuild(fixtures[start:start + IN_CHUNK])  # Deleted duplicates no longer count in the crowd histogram
+        self.stdout.write(self.style.SUCCESS('Duplicate predictions removed and counters recounted'))  # Print success
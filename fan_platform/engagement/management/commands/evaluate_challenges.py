@@ -0,0 +1,99 @@
+import json  # Import json for checkpoint files
+import time  # Import time for throughput reporting
+from collections import defaultdict  # Import defaultdict for leaderboard changes
+from concurrent.futures import ProcessPoolExecutor, as_completed  # Import process pool for parallel chunks
+from pathlib import Path  # Import Path for checkpoint files
+import django  # Import django to set up worker processes
+from django.core.management.base import BaseCommand  # Import BaseCommand
+from django.db import connections, transaction  # Import connections and transactions for per-chunk writes
+from engagement import challenge_rules, leaderboards  # Import challenge engine and leaderboard
+from engagement.models import ClubStats, UserProfile  # Import fans and their club stats
+
+
+def init_worker():  # Give each worker process its own database connections
+    django.setup()
+    connections.close_all()
+
+
+def evaluate_chunk(bounds):  # Evaluate and award challenges for fans with first < pk <= last
+    first, last = bounds
+    fans = list(UserProfile.objects.filter(pk__gt=first, pk__lte=last).order_by('pk').values_list('pk', 'active_club_id'))
+    results = challenge_rules.evaluate_many(fans)  # One progress query for the whole chunk
+    club_stats = list(ClubStats.objects.filter(
+        user_profile_id__in=[pk for pk, club_id in fans if club_id], club_id__in={club_id for pk, club_id in fans if club_id}
+    ).only('pk', 'user_profile_id', 'club_id', 'badge_mask'))
+    active = dict(fans)
+    club_stats = [row for row in club_stats if active.get(row.user_profile_id) == row.club_id]  # Badges are earned in the active club
+    with transaction.atomic():
+        points = challenge_rules.award_points_many(results)
+        earned = challenge_rules.award_badges_many(club_stats, results, sync=False)
+    moved = [(row.user_profile_id, row.club_id) for row in earned]  # Fans whose club points changed
+    return last, len(fans), sum(points.values()), sum(len(names) for names in earned.values()), moved
+
+
+class Command(BaseCommand):  # Define command class
+    help = 'Evaluates every challenge for every fan in primary-key chunks and awards the points and badges earned'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Fans evaluated per chunk')
+        parser.add_argument('--workers', type=int, default=1, help='Processes evaluating chunks (1 evaluates in this process)')
+        parser.add_argument('--checkpoint', default='evaluate_challenges.checkpoint.json', help='File recording the last fan primary key done')
+        parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint file')
+
+    def handle(self, *args, **options):  # Define command logic
+        self.checkpoint_path = Path(options['checkpoint'])
+        start = self.load_checkpoint() if options['resume'] else 0
+        chunks = self.chunk_bounds(start, options['chunk_size'])
+        self.started = time.monotonic()
+        self.fans = self.points = self.badges = 0
+        self.moved = defaultdict(lambda: (set(), set()))  # Fans to move on the leaderboard once the pass is done
+        if options['workers'] > 1:
+            connections.close_all()  # Workers must not share this process's connections
+            done = {}
+            watermark = start
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker) as executor:
+                futures = [executor.submit(evaluate_chunk, bounds) for bounds in chunks]
+                for future in as_completed(futures):
+                    last, fans, points, badges, moved = future.result()
+                    done[last] = True
+                    while chunks and done.pop(chunks[0][1], False):  # Checkpoint only past chunks finished in order
+                        watermark = chunks.pop(0)[1]
+                    self.report(watermark, fans, points, badges, moved)
+        else:
+            for bounds in chunks:
+                self.report(*evaluate_chunk(bounds))
+        if len(self.moved) > options['chunk_size']:  # Cheaper to re-rank every board once than to move each fan
+            leaderboards.rebuild()
+        else:
+            leaderboards.sync(self.moved)
+        if self.checkpoint_path.exists():  # Finished cleanly
+            self.checkpoint_path.unlink()
+        self.stdout.write(self.style.SUCCESS(
+            f'Evaluated {self.fans} fans: {self.points} points and {self.badges} badges awarded'
+        ))  # Print success
+
+    def chunk_bounds(self, start, chunk_size):  # (first, last] primary-key ranges of up to chunk_size fans each
+        bounds = []
+        first = start
+        while True:
+            pks = UserProfile.objects.filter(pk__gt=first).order_by('pk').values_list('pk', flat=True)
+            last = list(pks[chunk_size - 1:chunk_size]) or list(pks.reverse()[:1])  # The chunk's last fan, or the final fan
+            if not last:
+                return bounds
+            bounds.append((first, last[0]))
+            first = last[0]
+
+    def load_checkpoint(self):  # Last fan primary key evaluated by an interrupted run
+        if not self.checkpoint_path.exists():
+            return 0
+        return json.loads(self.checkpoint_path.read_text()).get('last_pk', 0)
+
+    def report(self, last_pk, fans, points, badges, moved):  # Record and print progress after a committed chunk
+        for user_profile_id, club_id in moved:
+            self.moved[user_profile_id][0].add(club_id)
+        self.fans += fans
+        self.points += points
+        self.badges += badges
+        self.checkpoint_path.write_text(json.dumps({'last_pk': last_pk}))
+        rate = self.fans / max(time.monotonic() - self.started, 1e-6)
+        self.stdout.write(f'{self.fans} fans evaluated ({rate:.0f}/s), {self.points} points and {self.badges} badges awarded (last pk {last_pk})')  # Print progress
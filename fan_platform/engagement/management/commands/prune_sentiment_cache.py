@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand  # Import BaseCommand
+from engagement import sentiment  # Import sentiment provider
+from engagement.sentiment_cache import prune_stale  # Import cache pruning
+
+class Command(BaseCommand):  # Define command class
+    help = 'Deletes cached sentiment results computed with an old lexicon or old thresholds'  # Set help message
+
+    def handle(self, *args, **options):  # Define command logic
+        version = sentiment.cache_version()  # Current lexicon/threshold version
+        deleted = prune_stale(version)  # Drop other versions
+        self.stdout.write(self.style.SUCCESS(f'Removed {deleted} stale cache entries (current version {version})'))  # Print success
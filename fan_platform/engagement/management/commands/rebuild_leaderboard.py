@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand  # Import BaseCommand
+from engagement import leaderboards  # Import leaderboard engine
+
+class Command(BaseCommand):  # Define command class
+    help = 'Recomputes the materialized leaderboards from ClubStats, comments and daily points buckets'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--windows', action='store_true', help='Only re-sum the week/month/season boards (run daily to roll the windows forward)')
+
+    def handle(self, *args, **options):  # Define command logic
+        for scope, rows in sorted(leaderboards.rebuild(windows_only=options['windows']).items()):
+            self.stdout.write(f'{scope}: {rows} entries')  # Print progress
+        self.stdout.write(self.style.SUCCESS('Leaderboard rebuilt'))  # Print success
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand  # Import BaseCommand
+from django.db import transaction  # Import transactions for the rewrite
+from django.db.models import Sum  # Import Sum for ledger totals
+from engagement import leaderboards  # Import leaderboard rebuild
+from engagement.models import ClubStats, PointsEvent, UserProfile  # Import ledger and balance models
+
+class Command(BaseCommand):  # Define command class
+    help = 'Rebuilds ClubStats and UserProfile points from the PointsEvent ledger'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--dry-run', action='store_true', help='Report balances that differ from the ledger without fixing them')
+
+    def handle(self, *args, **options):  # Define command logic
+        totals = {
+            (user_profile_id, club_id): total
+            for user_profile_id, club_id, total in PointsEvent.objects.values('user_profile_id', 'club_id')
+            .annotate(total=Sum('delta')).values_list('user_profile_id', 'club_id', 'total').order_by()
+        }  # One grouped pass over the ledger
+
+        club_fixes = [
+            ClubStats(pk=pk, points=totals.get((user_profile_id, club_id), 0))
+            for pk, user_profile_id, club_id, points in ClubStats.objects.values_list('pk', 'user_profile_id', 'club_id', 'points').iterator()
+            if (points or 0) != totals.get((user_profile_id, club_id), 0)
+        ]
+        missing = {pair for pair in totals if pair[1] is not None} - set(ClubStats.objects.values_list('user_profile_id', 'club_id'))
+        profile_fixes = [
+            UserProfile(pk=pk, points=totals.get((pk, None), 0))
+            for pk, points in UserProfile.objects.values_list('pk', 'points').iterator()
+            if (points or 0) != totals.get((pk, None), 0)
+        ]
+        self.stdout.write(f'{len(club_fixes)} club balances, {len(missing)} missing ClubStats rows and {len(profile_fixes)} global balances differ from the ledger')  # Print summary
+        if options['dry_run']:
+            return
+
+        with transaction.atomic():
+            ClubStats.objects.bulk_update(club_fixes, ['points'], batch_size=500)
+            ClubStats.objects.bulk_create([
+                ClubStats(user_profile_id=user_profile_id, club_id=club_id, points=totals[(user_profile_id, club_id)])
+                for user_profile_id, club_id in missing
+            ], batch_size=500)
+            UserProfile.objects.bulk_update(profile_fixes, ['points'], batch_size=500)
+        if club_fixes or missing:
+            leaderboards.rebuild()  # Club points feed the leaderboards
+        self.stdout.write(self.style.SUCCESS('Balances replayed from the ledger'))  # Print success
@@ -0,0 +1,148 @@
+import json  # Import json for checkpoint files
+from collections import Counter, defaultdict  # Import counters for change tracking
+from concurrent.futures import ProcessPoolExecutor  # Import process pool for scoring
+from datetime import datetime  # Import datetime for --since parsing
+from pathlib import Path  # Import Path for checkpoint files
+from django.core.management.base import BaseCommand, CommandError  # Import BaseCommand
+from django.db import transaction  # Import transactions for per-chunk writes
+from django.db.models import Count  # Import Count for earlier re-scores
+from django.utils import timezone  # Import timezone for --since
+from engagement import sentiment, rollups, leaderboards, timeline, badges, progress  # Import sentiment engine, rollups, leaderboard, points timeline, badges and challenge progress
+from engagement.classification import PENDING, award_positive_badges, score_texts  # Import classifier helpers
+from engagement import ledger  # Import points ledger
+from engagement.models import Comment, NewsComment, MatchComment, ClubStats, PointsEvent  # Import comment models
+
+SOURCES = {
+    'comment': Comment,
+    'newscomment': NewsComment,
+    'matchcomment': MatchComment,
+}  # Comment tables that store a sentiment
+
+class Command(BaseCommand):  # Define command class
+    help = 'Re-scores stored comment sentiments in primary-key chunks and fixes the ClubStats points and badges that depend on them'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--models', nargs='+', choices=list(SOURCES), default=list(SOURCES), help='Comment tables to re-score')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows read, scored and written per chunk')
+        parser.add_argument('--workers', type=int, default=2, help='Scoring processes')
+        parser.add_argument('--since', help='Only re-score comments created on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--dry-run', action='store_true', help='Report changes without writing them')
+        parser.add_argument('--checkpoint', default='rescore_sentiment.checkpoint.json', help='File recording the last primary key done per table')
+        parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint file')
+
+    def handle(self, *args, **options):  # Define command logic
+        since = None
+        if options['since']:  # Parse --since
+            try:
+                since = timezone.make_aware(datetime.strptime(options['since'], '%Y-%m-%d'))
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format.')
+        self.version = sentiment.cache_version()  # Lexicon/threshold version being applied
+        self.checkpoint_path = Path(options['checkpoint'])
+        self.checkpoint = self.load_checkpoint(options) if options['resume'] else {}
+        self.dry_run = options['dry_run']
+
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=sentiment.get_analyzer) as executor:
+            self.executor = executor
+            self.workers = options['workers']
+            for name in options['models']:  # Re-score each table
+                self.rescore_table(name, SOURCES[name], since, options['chunk_size'])
+
+        if not self.dry_run and self.checkpoint_path.exists():  # Finished cleanly
+            self.checkpoint_path.unlink()
+        self.stdout.write(self.style.SUCCESS('Dry run complete' if self.dry_run else 'Re-scoring complete'))  # Print success
+
+    def load_checkpoint(self, options):  # Read checkpoint for this lexicon/threshold version
+        if not self.checkpoint_path.exists():
+            return {}
+        data = json.loads(self.checkpoint_path.read_text())
+        if data.get('version') != self.version or data.get('since') != options['since']:  # Checkpoint from another run
+            self.stdout.write(self.style.WARNING('Checkpoint was written for a different lexicon, thresholds or --since; starting over'))
+            return {}
+        return data.get('last_pk', {})
+
+    def save_checkpoint(self, since):  # Record progress after a committed chunk
+        self.checkpoint_path.write_text(json.dumps({
+            'version': self.version,
+            'since': since.strftime('%Y-%m-%d') if since else None,
+            'last_pk': self.checkpoint
+        }))
+
+    def score(self, texts):  # Score cache misses across the pool
+        chunk = max(1, -(-len(texts) // self.workers))
+        chunks = [texts[i:i + chunk] for i in range(0, len(texts), chunk)]
+        return [compound for compounds in self.executor.map(score_texts, chunks) for compound in compounds]
+
+    def rescore_table(self, name, model, since, chunk_size):  # Stream one table in primary-key order
+        queryset = model.objects.exclude(sentiment=PENDING)  # Queued comments belong to the classifier
+        if since:
+            queryset = queryset.filter(created_at__gte=since)
+        club_field = rollups.SOURCE_CLUB_FIELDS[name]
+        fields = ['pk', 'text', 'sentiment', 'created_at', club_field] + (['user_profile_id', 'topic_id'] if model is Comment else [])
+        last_pk = self.checkpoint.get(name, 0)
+        scanned = 0
+        transitions = Counter()
+        while True:
+            rows = list(queryset.filter(pk__gt=last_pk).order_by('pk').values(*fields)[:chunk_size])  # Bounded chunk
+            if not rows:
+                break
+            labels = [label for label, compound in sentiment.classify_batch([row['text'] for row in rows], scorer=self.score)]
+            changed = [(row, label) for row, label in zip(rows, labels) if row['sentiment'] != label]
+            transitions.update((row['sentiment'], label) for row, label in changed)
+            if changed and not self.dry_run:
+                with transaction.atomic():
+                    model.objects.bulk_update([model(pk=row['pk'], sentiment=label) for row, label in changed], ['sentiment'], batch_size=500)
+                    rollup_deltas = Counter()
+                    for row, label in changed:  # Move each comment between rollup columns
+                        rollup_deltas[rollups.key_for(name, row[club_field], row.get('topic_id'), row['created_at'], row['sentiment'])] -= 1
+                        rollup_deltas[rollups.key_for(name, row[club_field], row.get('topic_id'), row['created_at'], label)] += 1
+                    rollups.apply(rollup_deltas)
+                    if model is Comment:
+                        self.fix_club_stats(changed)
+            scanned += len(rows)
+            last_pk = rows[-1]['pk']
+            if not self.dry_run:
+                self.checkpoint[name] = last_pk
+                self.save_checkpoint(since)
+            self.stdout.write(f'{name}: scanned {scanned}, changed {sum(transitions.values())} (last pk {last_pk})')  # Print progress
+        for (old, new), count in sorted(transitions.items()):  # Print summary
+            self.stdout.write(f'{name}: {old} -> {new}: {count}')
+
+    def fix_club_stats(self, changed):  # Apply point and badge changes from re-scored comments
+        events = []
+        gained_topics = defaultdict(list)
+        moved = defaultdict(lambda: (set(), set()))  # Fans whose leaderboard entries change
+        progress_deltas = defaultdict(Counter)  # (user_profile_id, club_id) -> positive-comment challenge progress
+        rescored = Counter(dict(
+            PointsEvent.objects.filter(user_profile_id__in={row['user_profile_id'] for row, label in changed},  # Uses the per-fan index
+                                       reason='rescore', source_type='comment', source_id__in=[row['pk'] for row, label in changed])
+            .values_list('source_id').annotate(n=Count('id')).order_by()
+        ))  # Earlier re-scores per comment, so a label change that recurs (e.g. after a lexicon revert) gets a fresh key
+        for row, label in changed:
+            if label == 'Positive':
+                delta = 10
+                gained_topics[(row['user_profile_id'], row['club_id'])].append(row['topic_id'])
+            elif row['sentiment'] == 'Positive':
+                delta = -10
+            else:
+                continue
+            events.append(PointsEvent(
+                user_profile_id=row['user_profile_id'], club_id=row['club_id'], delta=delta, reason='rescore',
+                source_type='comment', source_id=row['pk'],
+                idempotency_key=f"comment:{row['pk']}:rescore:{rescored[row['pk']] + 1}:{row['sentiment']}:{label}"
+            ))
+            moved[row['user_profile_id']][0].add(row['club_id'])
+            moved[row['user_profile_id']][1].add(row['topic_id'])
+            progress_deltas[(row['user_profile_id'], row['club_id'])]['positive_comments'] += 1 if delta > 0 else -1
+        ledger.award_many(events)  # Ledger events with atomic balance changes
+        progress.record_many(progress_deltas)  # Positive-comment challenge progress for the whole chunk
+        for user_profile_id, club_id in {(event.user_profile_id, event.club_id) for event in events}:
+            club_stats, created = ClubStats.objects.get_or_create(user_profile_id=user_profile_id, club_id=club_id)
+            changed_badges = award_positive_badges(club_stats, gained_topics[(user_profile_id, club_id)]) if gained_topics.get((user_profile_id, club_id)) else False
+            if badges.has(club_stats.badge_mask, 'Positive Fan') and not Comment.objects.filter(user_profile_id=user_profile_id, club_id=club_id, sentiment='Positive').exists():
+                changed_badges = badges.revoke(club_stats, 'Positive Fan')  # No positive comments left
+            if changed_badges:
+                moved[user_profile_id][0].add(club_id)
+        leaderboards.sync(moved)
+        for user_profile_id in moved:
+            transaction.on_commit(lambda user_profile_id=user_profile_id: timeline.invalidate(user_profile_id))  # Redraw their points chart
@@ -0,0 +1,82 @@
+import random  # Import random to interleave submissions
+import threading  # Import threading for concurrent submitters
+import time  # Import time for throughput
+from collections import Counter  # Import Counter for outcomes
+from django.conf import settings  # Import settings for the submission limit
+from django.contrib.auth.models import User  # Import User for scratch fans
+from django.core.management.base import BaseCommand, CommandError  # Import BaseCommand
+from django.db import connection  # Import connection to close per-thread connections
+from django.db.models import Max, Sum  # Import aggregates for the checks
+from engagement import submissions  # Import prediction submission path
+from engagement.crowd import board as crowd_board  # Import crowd prediction histograms
+from engagement.models import Club, Fixture, Prediction, PredictionTally, UserProfile  # Import models
+
+class Command(BaseCommand):  # Define command class
+    help = 'Submits predictions from many threads at once, checks no prediction passed the submission limit and reports throughput'  # Set help message
+
+    def add_arguments(self, parser):  # Define command options
+        parser.add_argument('--fans', type=int, default=1000, help='Scratch fans')
+        parser.add_argument('--fixtures', type=int, default=3, help='Scratch fixtures')
+        parser.add_argument('--attempts', type=int, default=4, help='Submissions tried per fan and fixture, spread across threads')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent submitters')
+
+    def handle(self, *args, **options):  # Define command logic
+        club = Club.objects.first()
+        if club is None:
+            raise CommandError('Create a club first')
+        limit = settings.PREDICTION_SUBMISSION_LIMIT
+        self.stdout.write(f"journal_mode={connection.cursor().execute('PRAGMA journal_mode').fetchone()[0]}")  # Print SQLite journal mode
+        fixtures = [Fixture.objects.create(club=club, opponent=f'Stress FC {i}') for i in range(options['fixtures'])]
+        User.objects.bulk_create([User(username=f'stress-bench-{i}', password='!') for i in range(options['fans'])], batch_size=2000)
+        users = User.objects.filter(username__startswith='stress-bench-').values_list('pk', flat=True)
+        UserProfile.objects.bulk_create([UserProfile(user_id=pk, active_club=club) for pk in users], batch_size=2000)
+        fans = list(UserProfile.objects.filter(user__username__startswith='stress-bench-').only('pk', 'active_club_id'))
+        try:
+            work = [(fan, fixture.id) for fan in fans for fixture in fixtures for _ in range(options['attempts'])]
+            random.Random(0).shuffle(work)  # Attempts on the same prediction land on different threads at once
+            queues = [work[i::options['threads']] for i in range(options['threads'])]
+            outcomes = Counter()
+            wins = Counter()
+            lock = threading.Lock()
+
+            def run(queue):  # One submitter with its own database connection
+                mine = Counter()
+                won = Counter()
+                try:
+                    for fan, fixture_id in queue:
+                        outcome = submissions.submit(fan, fixture_id, f'{random.randint(0, 4)}-{random.randint(0, 4)}')['outcome']
+                        mine[outcome] += 1
+                        if outcome in ('submitted', 'updated'):
+                            won[(fan.pk, fixture_id)] += 1
+                finally:
+                    connection.close()
+                with lock:
+                    outcomes.update(mine)
+                    wins.update(won)
+
+            threads = [threading.Thread(target=run, args=(queue,)) for queue in queues]
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+
+            predictions = Prediction.objects.filter(fixture__in=fixtures)
+            highest = predictions.aggregate(highest=Max('submission_count'))['highest']
+            over = sum(1 for count in wins.values() if count > limit)
+            mismatched = sum(1 for user_profile_id, fixture_id, count in predictions.values_list('user_profile_id', 'fixture_id', 'submission_count')
+                             if wins[(user_profile_id, fixture_id)] != count)
+            tallied = PredictionTally.objects.filter(fixture__in=fixtures).aggregate(n=Sum('predictions'))['n'] or 0
+            self.stdout.write(f'{len(work)} submissions from {len(threads)} threads in {elapsed:.2f}s ({len(work) / elapsed:.0f}/s): {dict(outcomes)}')  # Print throughput
+            self.stdout.write(f'highest submission_count {highest} (limit {limit}), {over} predictions accepted more than the limit, '
+                              f'{mismatched} counts differ from accepted submissions, crowd tallies {tallied} for {predictions.count()} predictions')  # Print checks
+            failed = over or mismatched or (highest or 0) > limit or tallied != predictions.count()
+        finally:
+            Fixture.objects.filter(pk__in=[fixture.pk for fixture in fixtures]).delete()
+            User.objects.filter(username__startswith='stress-bench-').delete()
+            for fixture in fixtures:
+                crowd_board.fixtures.pop(fixture.id, None)
+        if failed:
+            raise CommandError('Submission limit or crowd tallies violated')
+        self.stdout.write(self.style.SUCCESS('No prediction went over the submission limit'))  # Print success
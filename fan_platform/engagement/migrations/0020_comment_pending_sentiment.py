@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0019_poll_vote'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='sentiment',
+            field=models.CharField(choices=[('Positive', 'Positive'), ('Neutral', 'Neutral'), ('Negative', 'Negative'), ('Pending', 'Pending')], max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('sentiment', 'Pending')), fields=['id'], name='comment_pending_idx'),
+        ),
+    ]
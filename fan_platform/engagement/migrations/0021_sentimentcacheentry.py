@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0020_comment_pending_sentiment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentimentCacheEntry',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('version', models.CharField(db_index=True, max_length=16)),
+                ('sentiment', models.CharField(max_length=10)),
+                ('compound', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0021_sentimentcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FixtureMood',
+            fields=[
+                ('fixture', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='mood', serialize=False, to='engagement.fixture')),
+                ('positive', models.IntegerField(default=0)),
+                ('neutral', models.IntegerField(default=0)),
+                ('negative', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FixtureMoodBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('positive', models.IntegerField(default=0)),
+                ('neutral', models.IntegerField(default=0)),
+                ('negative', models.IntegerField(default=0)),
+                ('fixture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mood_buckets', to='engagement.fixture')),
+            ],
+            options={
+                'unique_together': {('fixture', 'bucket_start')},
+            },
+        ),
+    ]
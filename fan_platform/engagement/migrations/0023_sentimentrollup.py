@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+SOURCES = {
+    'comment': ('Comment', 'club_id'),
+    'newscomment': ('NewsComment', 'news_article__club_id'),
+    'matchcomment': ('MatchComment', 'fixture__club_id'),
+}
+# Comment table and club field per rollup source, as in rollups.SOURCE_CLUB_FIELDS
+
+
+def backfill_rollups(apps, schema_editor):
+    # Count existing comments, as backfill_sentiment_rollups does, so later deletes never take a rollup below zero
+    SentimentRollup = apps.get_model('engagement', 'SentimentRollup')
+    for source, (model_name, club_field) in SOURCES.items():
+        fields = [club_field, 'sentiment'] + (['topic_id'] if source == 'comment' else [])
+        rows = {}
+        for row in apps.get_model('engagement', model_name).objects.filter(sentiment__in=['Positive', 'Neutral', 'Negative']) \
+                .annotate(day=TruncDate('created_at')).values(*fields, 'day').annotate(n=Count('id')).order_by().iterator():
+            key = (row[club_field], row.get('topic_id') or 0, row['day'])
+            rollup = rows.setdefault(key, SentimentRollup(club_id=key[0], topic_key=key[1], source=source, day=key[2]))
+            setattr(rollup, row['sentiment'].lower(), getattr(rollup, row['sentiment'].lower()) + row['n'])
+        SentimentRollup.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0022_fixturemood'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentimentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('source', models.CharField(choices=[('comment', 'Comment'), ('newscomment', 'News comment'), ('matchcomment', 'Match comment')], max_length=20)),
+                ('topic_key', models.IntegerField(default=0)),
+                ('positive', models.IntegerField(default=0)),
+                ('neutral', models.IntegerField(default=0)),
+                ('negative', models.IntegerField(default=0)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_rollups', to='engagement.club')),
+            ],
+            options={
+                'unique_together': {('club', 'day', 'source', 'topic_key')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from collections import defaultdict
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def badge_list(badges):
+    # Stored badge text ('A, B' or 'None') as a list
+    return badges.split(', ') if badges and badges != 'None' else []
+
+
+def seed_leaderboards(apps, schema_editor):
+    # Fill the boards from the existing balances so they are not empty until rebuild_leaderboard runs
+    UserProfile = apps.get_model('engagement', 'UserProfile')
+    ClubStats = apps.get_model('engagement', 'ClubStats')
+    Comment = apps.get_model('engagement', 'Comment')
+    Topic = apps.get_model('engagement', 'Topic')
+    LeaderboardEntry = apps.get_model('engagement', 'LeaderboardEntry')
+    scopes = defaultdict(list)  # (scope, scope_id) -> [(points, user_profile_id, badges)]
+    for user_profile_id, points, badges in UserProfile.objects.values_list('id', 'points', 'badges').iterator():
+        scopes[('global', 0)].append((points or 0, user_profile_id, badge_list(badges)))
+    club_badges = {}
+    for user_profile_id, club_id, points, badges in ClubStats.objects.values_list('user_profile_id', 'club_id', 'points', 'badges').iterator():
+        scopes[('club', club_id)].append((points or 0, user_profile_id, badge_list(badges)))
+        club_badges[(user_profile_id, club_id)] = badge_list(badges)
+    topic_clubs = dict(Topic.objects.values_list('id', 'club_id'))
+    for user_profile_id, topic_id, n in Comment.objects.filter(sentiment='Positive', topic__isnull=False) \
+            .values('user_profile_id', 'topic_id').annotate(n=Count('id')).values_list('user_profile_id', 'topic_id', 'n').order_by().iterator():
+        scopes[('topic', topic_id)].append((10 * n, user_profile_id, club_badges.get((user_profile_id, topic_clubs.get(topic_id)), [])))
+    batch = []
+    for (scope, scope_id), rows in scopes.items():
+        rows.sort(key=lambda row: (-row[0], row[1]))  # Ties go to the older profile, as in leaderboards.rebuild
+        for rank, (points, user_profile_id, badges) in enumerate(rows, start=1):
+            batch.append(LeaderboardEntry(scope=scope, scope_id=scope_id, user_profile_id=user_profile_id, points=points, rank=rank, badges=badges))
+        if len(batch) >= 5000:
+            LeaderboardEntry.objects.bulk_create(batch, batch_size=1000)
+            batch = []
+    LeaderboardEntry.objects.bulk_create(batch, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0023_sentimentrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('club', 'Club'), ('topic', 'Topic')], max_length=10)),
+                ('scope_id', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('rank', models.IntegerField()),
+                ('badges', models.JSONField(default=list)),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='engagement.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scope', 'scope_id', 'rank'], name='leaderboard_rank_idx'), models.Index(fields=['scope', 'scope_id', 'points'], name='leaderboard_points_idx')],
+                'unique_together': {('scope', 'scope_id', 'user_profile')},
+            },
+        ),
+        migrations.RunPython(seed_leaderboards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0025_leaderboardentry_changed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('opening', 'Opening balance'), ('positive_comment', 'Positive comment'), ('rescore', 'Comment re-scored'), ('challenge', 'Challenge completed'), ('challenge_badge', 'Challenge badge earned'), ('reset', 'Stats reset')], max_length=30)),
+                ('source_type', models.CharField(blank=True, max_length=30)),
+                ('source_id', models.BigIntegerField(blank=True, null=True)),
+                ('idempotency_key', models.CharField(max_length=150, unique=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('club', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='engagement.club')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_events', to='engagement.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_profile', 'club', 'created_at'], name='points_event_fan_idx')],
+            },
+        ),
+    ]
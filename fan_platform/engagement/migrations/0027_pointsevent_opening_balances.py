@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def record_opening_balances(apps, schema_editor):
+    # Seed the ledger with every existing balance so replaying it reproduces today's points
+    ClubStats = apps.get_model('engagement', 'ClubStats')
+    UserProfile = apps.get_model('engagement', 'UserProfile')
+    PointsEvent = apps.get_model('engagement', 'PointsEvent')
+    events = [
+        PointsEvent(user_profile_id=user_profile_id, club_id=club_id, delta=points, reason='opening',
+                    source_type='clubstats', source_id=pk, idempotency_key=f'opening:clubstats:{pk}')
+        for pk, user_profile_id, club_id, points in ClubStats.objects.exclude(points=0).values_list('pk', 'user_profile_id', 'club_id', 'points').iterator()
+    ] + [
+        PointsEvent(user_profile_id=pk, club_id=None, delta=points, reason='opening',
+                    source_type='userprofile', source_id=pk, idempotency_key=f'opening:userprofile:{pk}')
+        for pk, points in UserProfile.objects.exclude(points=0).values_list('pk', 'points').iterator()
+    ]
+    PointsEvent.objects.bulk_create(events, batch_size=500)
+
+
+def remove_opening_balances(apps, schema_editor):
+    apps.get_model('engagement', 'PointsEvent').objects.filter(reason='opening').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0026_pointsevent'),
+    ]
+
+    operations = [
+        migrations.RunPython(record_opening_balances, remove_opening_balances),
+    ]
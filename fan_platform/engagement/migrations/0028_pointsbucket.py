@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0027_pointsevent_opening_balances'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leaderboardentry',
+            name='scope',
+            field=models.CharField(choices=[('global', 'Global'), ('club', 'Club'), ('topic', 'Topic'), ('global_week', 'Global, last 7 days'), ('club_week', 'Club, last 7 days'), ('global_month', 'Global, last 30 days'), ('club_month', 'Club, last 30 days'), ('global_season', 'Global, this season'), ('club_season', 'Club, this season')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='PointsBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('points', models.IntegerField(default=0)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='engagement.club')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_buckets', to='engagement.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'club'], name='points_bucket_day_idx')],
+                'unique_together': {('user_profile', 'club', 'day')},
+            },
+        ),
+    ]
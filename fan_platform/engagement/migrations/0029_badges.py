@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0028_pointsbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Badge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('bit', models.PositiveSmallIntegerField(unique=True)),
+                ('description', models.CharField(blank=True, max_length=200)),
+            ],
+            options={
+                'ordering': ['bit'],
+            },
+        ),
+        migrations.AddField(
+            model_name='clubstats',
+            name='badge_mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='badge_mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='AwardedBadge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('awarded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('club', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='engagement.club')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='awarded_badges', to='engagement.userprofile')),
+                ('badge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='awards', to='engagement.badge')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['badge', 'club'], name='awarded_badge_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user_profile', 'club', 'badge'), name='awarded_badge_unique'), models.UniqueConstraint(condition=models.Q(('club__isnull', True)), fields=('user_profile', 'badge'), name='awarded_badge_profile_unique')],
+            },
+        ),
+    ]
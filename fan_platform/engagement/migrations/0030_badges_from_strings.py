@@ -0,0 +1,73 @@
+from django.db import migrations
+
+CATALOGUE = [
+    ('Positive Fan', 'Post a positive comment.'),
+    ('Dedicated Fan', 'Post 10 comments on a club.'),
+    ('Loyal Supporters', 'Post 20 comments on a club.'),
+    ('Topic Expert', 'Post 10 comments on one topic.'),
+    ('Comment King', 'Post 5 comments.'),
+    ('Seer', 'Submit 3 correct predictions.'),
+    ('Commentator', 'Comment on 3 match-related news articles.'),
+    ('Engaged Fan', 'Like or dislike 10 comments from other users.'),
+]
+# Badges the app awards, in bit order
+
+
+def split(badges):
+    return [name for name in (badges or '').split(', ') if name and name != 'None']
+
+
+def badges_from_strings(apps, schema_editor):
+    # Seed the catalogue and move comma-separated badge strings into masks and award rows
+    Badge = apps.get_model('engagement', 'Badge')
+    AwardedBadge = apps.get_model('engagement', 'AwardedBadge')
+    ClubStats = apps.get_model('engagement', 'ClubStats')
+    UserProfile = apps.get_model('engagement', 'UserProfile')
+    bits = {}
+    for bit, (name, description) in enumerate(CATALOGUE):
+        Badge.objects.create(name=name, bit=bit, description=description)
+        bits[name] = bit
+    badge_ids = dict(Badge.objects.values_list('name', 'id'))
+
+    def mask_for(names):
+        mask = 0
+        for name in names:
+            mask |= 1 << bits[name]
+        return mask
+
+    awards = []
+    rows = [
+        (ClubStats, pk, user_profile_id, club_id, badges)
+        for pk, user_profile_id, club_id, badges in ClubStats.objects.exclude(badges__in=['', 'None']).values_list('pk', 'user_profile_id', 'club_id', 'badges').iterator()
+    ] + [
+        (UserProfile, pk, pk, None, badges)
+        for pk, badges in UserProfile.objects.exclude(badges__in=['', 'None']).values_list('pk', 'badges').iterator()
+    ]
+    for model, pk, user_profile_id, club_id, badges in rows:
+        names = [name for name in dict.fromkeys(split(badges)) if name in bits]  # Drop legacy junk such as 'NonePositiveFan'
+        model.objects.filter(pk=pk).update(badge_mask=mask_for(names))
+        awards.extend(AwardedBadge(user_profile_id=user_profile_id, club_id=club_id, badge_id=badge_ids[name]) for name in names)
+    AwardedBadge.objects.bulk_create(awards, batch_size=500)
+
+
+def badges_to_strings(apps, schema_editor):
+    # Rebuild the badge strings from the masks
+    Badge = apps.get_model('engagement', 'Badge')
+    names = dict(Badge.objects.values_list('bit', 'name'))
+    for model in (apps.get_model('engagement', 'ClubStats'), apps.get_model('engagement', 'UserProfile')):
+        for pk, mask in model.objects.exclude(badge_mask=0).values_list('pk', 'badge_mask').iterator():
+            badges = [name for bit, name in sorted(names.items()) if mask & (1 << bit)]
+            model.objects.filter(pk=pk).update(badges=', '.join(badges))
+    apps.get_model('engagement', 'AwardedBadge').objects.all().delete()
+    Badge.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0029_badges'),
+    ]
+
+    operations = [
+        migrations.RunPython(badges_from_strings, badges_to_strings),
+    ]
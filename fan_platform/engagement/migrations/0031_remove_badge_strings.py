@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0030_badges_from_strings'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='clubstats',
+            name='badges',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='badges',
+        ),
+    ]
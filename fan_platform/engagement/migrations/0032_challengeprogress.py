@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:33
+
+import django.db.models.deletion
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def backfill_progress(apps, schema_editor):
+    # Count existing comments, news comments and correct predictions, as backfill_challenge_progress does,
+    # so challenges do not start from zero for existing fans
+    ChallengeProgress = apps.get_model('engagement', 'ChallengeProgress')
+    Comment = apps.get_model('engagement', 'Comment')
+    NewsComment = apps.get_model('engagement', 'NewsComment')
+    Prediction = apps.get_model('engagement', 'Prediction')
+    today = timezone.localdate()
+    week_start, month_start = today - timedelta(days=today.weekday()), today.replace(day=1)
+    week_since, month_since = (timezone.make_aware(datetime.combine(day, time.min)) for day in (week_start, month_start))
+    counts = defaultdict(lambda: defaultdict(int))  # (user_profile_id, club_id) -> counter -> value
+
+    def add(user_profile_id, club_id, **values):  # Count on the club row and the fan's totals row
+        for key in {(user_profile_id, club_id), (user_profile_id, None)}:
+            for field, value in values.items():
+                counts[key][field] += value or 0
+
+    for row in Comment.objects.values('user_profile_id', 'club_id').annotate(
+        n=Count('id'), positive=Count('id', filter=Q(sentiment='Positive')), week=Count('id', filter=Q(created_at__gte=week_since)),
+    ).order_by():
+        add(row['user_profile_id'], row['club_id'], comments=row['n'], positive_comments=row['positive'], week_comments=row['week'])
+    for row in NewsComment.objects.values('user_profile_id', 'news_article__club_id').annotate(
+        n=Count('id'), likes=Sum('likes'), dislikes=Sum('dislikes'),
+    ).order_by():
+        add(row['user_profile_id'], row['news_article__club_id'], news_comments=row['n'], reactions=(row['likes'] or 0) + (row['dislikes'] or 0))
+    for row in Prediction.objects.filter(is_correct=True).annotate(settled_at=Coalesce('verified_at', 'created_at')) \
+            .values('user_profile_id', 'club_id').annotate(n=Count('id'), month=Count('id', filter=Q(settled_at__gte=month_since))).order_by():
+        add(row['user_profile_id'], row['club_id'], correct_predictions=row['n'], month_correct_predictions=row['month'])
+
+    ChallengeProgress.objects.bulk_create([
+        ChallengeProgress(user_profile_id=user_profile_id, club_id=club_id, week_start=week_start, month_start=month_start, **values)
+        for (user_profile_id, club_id), values in counts.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0031_remove_badge_strings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChallengeProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comments', models.IntegerField(default=0)),
+                ('positive_comments', models.IntegerField(default=0)),
+                ('news_comments', models.IntegerField(default=0)),
+                ('reactions', models.IntegerField(default=0)),
+                ('correct_predictions', models.IntegerField(default=0)),
+                ('week_start', models.DateField(blank=True, null=True)),
+                ('week_comments', models.IntegerField(default=0)),
+                ('month_start', models.DateField(blank=True, null=True)),
+                ('month_correct_predictions', models.IntegerField(default=0)),
+                ('club', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='engagement.club')),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='challenge_progress', to='engagement.userprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user_profile', 'club'), name='challenge_progress_unique'), models.UniqueConstraint(condition=models.Q(('club__isnull', True)), fields=('user_profile',), name='challenge_progress_total_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
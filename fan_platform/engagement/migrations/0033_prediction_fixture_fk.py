@@ -0,0 +1,59 @@
+from collections import defaultdict
+from datetime import datetime, time
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def dedupe_predictions(apps, schema_editor):
+    # Keep the latest prediction per fan and fixture and drop predictions for fixtures that no longer exist
+    Prediction = apps.get_model('engagement', 'Prediction')
+    Fixture = apps.get_model('engagement', 'Fixture')
+    UserProfile = apps.get_model('engagement', 'UserProfile')
+    latest = Prediction.objects.filter(fixture_id__in=Fixture.objects.values('id')) \
+        .values('user_profile_id', 'fixture_id').annotate(latest_id=Max('id')).values('latest_id')
+    doomed = Prediction.objects.exclude(id__in=latest)
+    recount = set(doomed.filter(is_correct=True).values_list('user_profile_id', flat=True))
+    doomed.delete()
+    correct = Prediction.objects.filter(user_profile_id=OuterRef('pk'), is_correct=True).values('user_profile_id').annotate(n=Count('id')).values('n')
+    UserProfile.objects.filter(pk__in=recount).update(correct_predictions=Coalesce(Subquery(correct), 0))
+    # Fans who lost a correct duplicate get their count back in step
+    ChallengeProgress = apps.get_model('engagement', 'ChallengeProgress')
+    month_since = timezone.make_aware(datetime.combine(timezone.localdate().replace(day=1), time.min))
+    counts = defaultdict(lambda: [0, 0])  # (user_profile_id, club_id) -> [correct, this month]
+    for row in Prediction.objects.filter(user_profile_id__in=recount, is_correct=True).annotate(settled_at=Coalesce('verified_at', 'created_at')) \
+            .values('user_profile_id', 'club_id').annotate(n=Count('id'), month=Count('id', filter=Q(settled_at__gte=month_since))).order_by():
+        for key in {(row['user_profile_id'], row['club_id']), (row['user_profile_id'], None)}:
+            counts[key][0] += row['n']
+            counts[key][1] += row['month']
+    for progress in ChallengeProgress.objects.filter(user_profile_id__in=recount):
+        progress.correct_predictions, progress.month_correct_predictions = counts[(progress.user_profile_id, progress.club_id)]
+        progress.save(update_fields=['correct_predictions', 'month_correct_predictions'])
+    # And so do their challenge progress counters
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0032_challengeprogress'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_predictions, migrations.RunPython.noop),
+        migrations.RenameField(
+            model_name='prediction',
+            old_name='fixture_id',
+            new_name='fixture',
+        ),
+        migrations.AlterField(
+            model_name='prediction',
+            name='fixture',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='predictions', to='engagement.fixture'),
+        ),
+        migrations.AddConstraint(
+            model_name='prediction',
+            constraint=models.UniqueConstraint(fields=('user_profile', 'fixture'), name='prediction_fan_fixture_unique'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:56
+
+from django.db import migrations, models
+from django.db.models import IntegerField, Value
+from django.db.models.functions import Cast, StrIndex, Substr, Trim
+
+SCORE_REGEX = r'^ *[0-9]{1,2} *- *[0-9]{1,2} *$'
+# Scores the app accepts (models.SCORE_PATTERN)
+
+
+def goals(field):
+    # SQL expressions for the home and away goals of an x-y score column
+    dash = StrIndex(field, Value('-'))
+    return (Cast(Trim(Substr(field, 1, dash - 1)), IntegerField()),
+            Cast(Trim(Substr(field, dash + 1)), IntegerField()))
+
+
+def backfill_goals(apps, schema_editor):
+    # Parse existing scores into the goal columns, one UPDATE per table; malformed scores stay empty
+    for model, field in (('Prediction', 'text'), ('Fixture', 'final_result')):
+        home, away = goals(field)
+        apps.get_model('engagement', model).objects.filter(**{f'{field}__regex': SCORE_REGEX}).update(home_goals=home, away_goals=away)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0033_prediction_fixture_fk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fixture',
+            name='away_goals',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='fixture',
+            name='home_goals',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='prediction',
+            name='away_goals',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='prediction',
+            name='home_goals',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='prediction',
+            name='points',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_goals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('engagement', '0034_prediction_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PredictionTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('home_goals', models.PositiveSmallIntegerField()),
+                ('away_goals', models.PositiveSmallIntegerField()),
+                ('predictions', models.IntegerField(default=0)),
+                ('fixture', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prediction_tallies', to='engagement.fixture')),
+            ],
+            options={
+                'unique_together': {('fixture', 'home_goals', 'away_goals')},
+            },
+        ),
+        migrations.RunSQL(
+            'INSERT INTO engagement_predictiontally (fixture_id, home_goals, away_goals, predictions) '
+            'SELECT fixture_id, home_goals, away_goals, COUNT(*) FROM engagement_prediction '
+            'WHERE home_goals IS NOT NULL AND away_goals IS NOT NULL GROUP BY fixture_id, home_goals, away_goals',
+            migrations.RunSQL.noop,
+        ),
+        # Count the predictions made before tallies existed, so editing one never decrements an uncounted score
+    ]
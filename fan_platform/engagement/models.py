@@ -1,7 +1,21 @@
+import re
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+SCORE_PATTERN = re.compile(r'^\s*(\d{1,2})\s*-\s*(\d{1,2})\s*$')
+# A score as fans and admins type it: home-away goals, e.g. "2-1"
+
+def parse_score(text):
+    # (home goals, away goals) for a score string, (None, None) when blank; raises ValidationError otherwise
+    if not text:
+        return None, None
+    match = SCORE_PATTERN.match(text)
+    if not match:
+        raise ValidationError(f'Invalid score {text!r}. Use x-y (e.g., 2-1).')
+    return int(match.group(1)), int(match.group(2))
+
 class Club(models.Model):
     name = models.CharField(max_length=100)
     # Club name
@@ -21,92 +35,20 @@ class UserProfile(models.Model):
     # User's active club
     points = models.IntegerField(default=0)
     # User's global points
-    badges = models.TextField(default='None')
-    # User's badges
+    badge_mask = models.BigIntegerField(default=0)
+    # Profile-wide badges, one Badge.bit per badge
     predictions = models.IntegerField(default=0)
     # Total predictions made
     correct_predictions = models.IntegerField(default=0)
     # Correct predictions count
 
     def check_challenge_completion(self):
-        # Check and award challenge points
-        from django.db.models import Count, Q
-        one_month_ago = timezone.now() - timezone.timedelta(days=30)
-        one_week_ago = timezone.now() - timezone.timedelta(days=7)
-
-        # Prophet of the Pitch
-        recent_correct = Prediction.objects.filter(
-            user_profile=self,
-            is_correct=True,
-            created_at__gte=one_month_ago
-        ).count()
-        if recent_correct >= 3 and self.correct_predictions >= 3:
-            reward_points = 20
-            if self.points < self.points + reward_points:
-                self.points += reward_points
-                self.save()
-                return reward_points
-
-        # Comment King
-        total_comments = Comment.objects.filter(
-            user_profile=self,
-            created_at__gte=one_week_ago
-        ).count()
-        if total_comments >= 5:
-            reward_points = 10
-            if self.points < self.points + reward_points:
-                self.points += reward_points
-                self.save()
-                return reward_points
-
-        # Positive Vibes
-        positive_comments = Comment.objects.filter(
-            user_profile=self,
-            sentiment='Positive'
-        ).count()
-        if positive_comments >= 3:
-            reward_points = 15
-            if self.points < self.points + reward_points:
-                self.points += reward_points
-                self.save()
-                return reward_points
-
-        # Loyal Supporter
-        club_comments = Comment.objects.filter(
-            user_profile=self,
-            club=self.active_club
-        ).count()
-        if club_comments >= 10:
-            reward_points = 15
-            if self.points < self.points + reward_points:
-                self.points += reward_points
-                self.save()
-                return reward_points
-
-        # Match Day Commentator
-        news_comments = NewsComment.objects.filter(
-            user_profile=self
-        ).count()
-        if news_comments >= 3:
-            reward_points = 10
-            if self.points < self.points + reward_points:
-                self.points += reward_points
-                self.save()
-                return reward_points
-
-        # Engagement Booster
-        likes_dislikes = NewsComment.objects.filter(
-            user_profile=self
-        ).aggregate(total=Count('likes') + Count('dislikes'))['total']
-        if likes_dislikes >= 10:
-            reward_points = 5
-            if self.points < self.points + reward_points:
-                self.points += reward_points
-                self.save()
-                return reward_points
-
-        return 0
-    # Return 0 if no points awarded
+        # Award global points for every completed challenge; returns the points newly awarded
+        from .challenge_rules import check
+        awarded = check(self.id, self.active_club_id)
+        if awarded:
+            self.refresh_from_db(fields=['points'])
+        return awarded
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
@@ -119,8 +61,8 @@ class ClubStats(models.Model):
     # Link to Club
     points = models.IntegerField(default=0)
     # Club-specific points
-    badges = models.TextField(default='None')
-    # Club-specific badges
+    badge_mask = models.BigIntegerField(default=0)
+    # Club-specific badges, one Badge.bit per badge
 
     class Meta:
         unique_together = ('user_profile', 'club')
@@ -141,8 +83,8 @@ class Comment(models.Model):
     # Link to UserProfile
     text = models.TextField()
     # Comment text
-    sentiment = models.CharField(max_length=10, choices=[('Positive', 'Positive'), ('Neutral', 'Neutral'), ('Negative', 'Negative')])
-    # Comment sentiment
+    sentiment = models.CharField(max_length=10, choices=[('Positive', 'Positive'), ('Neutral', 'Neutral'), ('Negative', 'Negative'), ('Pending', 'Pending')])
+    # Comment sentiment ('Pending' until the background classifier scores it)
     club = models.ForeignKey(Club, on_delete=models.CASCADE)
     # Link to Club
     topic = models.ForeignKey(Topic, on_delete=models.SET_NULL, null=True, blank=True)
@@ -150,6 +92,10 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     # Comment creation time
 
+    class Meta:
+        indexes = [models.Index(fields=['id'], condition=models.Q(sentiment='Pending'), name='comment_pending_idx')]
+    # Partial index so the classifier finds queued comments without a table scan
+
 class NewsArticle(models.Model):
     club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='news_articles')
     # Link to Club
@@ -203,6 +149,21 @@ class Fixture(models.Model):
     # Live match status
     final_result = models.CharField(max_length=10, blank=True)
     # Final score (e.g., "2-1")
+    home_goals = models.PositiveSmallIntegerField(null=True, blank=True)
+    # Final home goals, parsed from final_result
+    away_goals = models.PositiveSmallIntegerField(null=True, blank=True)
+    # Final away goals, parsed from final_result
+
+    def clean(self):
+        # Reject final results that are not x-y scores
+        parse_score(self.final_result)
+
+    def save(self, *args, **kwargs):
+        # Keep the goal columns in step with final_result
+        self.home_goals, self.away_goals = parse_score(self.final_result)
+        if self.home_goals is not None:
+            self.final_result = f'{self.home_goals}-{self.away_goals}'
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.club.name} vs {self.opponent} on {self.date}"
@@ -211,10 +172,16 @@ class Fixture(models.Model):
 class Prediction(models.Model):
     user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
     # Link to UserProfile
-    fixture_id = models.IntegerField()
-    # Fixture ID
+    fixture = models.ForeignKey(Fixture, on_delete=models.CASCADE, related_name='predictions')
+    # Predicted fixture
     text = models.CharField(max_length=10)
     # Predicted score (e.g., "2-1")
+    home_goals = models.PositiveSmallIntegerField(null=True, blank=True)
+    # Predicted home goals, parsed from text
+    away_goals = models.PositiveSmallIntegerField(null=True, blank=True)
+    # Predicted away goals, parsed from text
+    points = models.IntegerField(default=0)
+    # Points scored once the fixture is settled (see PREDICTION_SCORING)
     club = models.ForeignKey(Club, on_delete=models.CASCADE)
     # Predicted club
     is_correct = models.BooleanField(default=False)
@@ -226,26 +193,34 @@ class Prediction(models.Model):
     verified_at = models.DateTimeField(null=True, blank=True)
     # Verification time
 
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['user_profile', 'fixture'], name='prediction_fan_fixture_unique')]
+    # One prediction per fan and fixture; also the index for per-fan lookups
+
+    def clean(self):
+        # Reject predicted scores that are not x-y
+        parse_score(self.text)
+
     def check_correctness(self):
-        # Check if prediction matches fixture result
-        from .models import Fixture
-        try:
-            fixture = Fixture.objects.get(id=self.fixture_id)
-            if fixture.final_result:
-                return self.text == fixture.final_result
-        except Fixture.DoesNotExist:
-            pass
-        return False
+        # Check if prediction matches fixture result (no query when the fixture is already loaded)
+        if self.fixture.home_goals is None or self.home_goals is None:
+            return False
+        return (self.home_goals, self.away_goals) == (self.fixture.home_goals, self.fixture.away_goals)
 
     def save(self, *args, **kwargs):
         # Update correctness and points on save
+        self.home_goals, self.away_goals = parse_score(self.text)
+        if self.home_goals is not None:
+            self.text = f'{self.home_goals}-{self.away_goals}'
         if self.check_correctness():
             self.is_correct = True
             if not self.verified_at:
                 self.verified_at = timezone.now()
-                self.user_profile.correct_predictions += 1
+                UserProfile.objects.filter(pk=self.user_profile_id).update(correct_predictions=models.F('correct_predictions') + 1)
+                self.user_profile.refresh_from_db(fields=['correct_predictions'])
+                from .progress import record
+                record(self.user_profile_id, self.club_id, correct_predictions=1, month_correct_predictions=1)
                 self.user_profile.check_challenge_completion()
-                self.user_profile.save()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -304,4 +279,227 @@ class Vote(models.Model):
 
     class Meta:
         unique_together = ('user_profile', 'poll')
-    # One vote per user per poll
\ No newline at end of file
+    # One vote per user per poll
+
+class SentimentCacheEntry(models.Model):
+    key = models.CharField(max_length=64, primary_key=True)
+    # Hash of cache version and normalized comment text
+    version = models.CharField(max_length=16, db_index=True)
+    # Lexicon/threshold version the result was computed with
+    sentiment = models.CharField(max_length=10)
+    # Cached sentiment label
+    compound = models.FloatField()
+    # Cached VADER compound score
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Time the result was cached
+
+class FixtureMood(models.Model):
+    fixture = models.OneToOneField(Fixture, on_delete=models.CASCADE, primary_key=True, related_name='mood')
+    # Link to Fixture
+    positive = models.IntegerField(default=0)
+    # Positive match comments since kickoff
+    neutral = models.IntegerField(default=0)
+    # Neutral match comments since kickoff
+    negative = models.IntegerField(default=0)
+    # Negative match comments since kickoff
+
+class FixtureMoodBucket(models.Model):
+    fixture = models.ForeignKey(Fixture, on_delete=models.CASCADE, related_name='mood_buckets')
+    # Link to Fixture
+    bucket_start = models.DateTimeField()
+    # Start of the time bucket (LIVE_MOOD_BUCKET_SECONDS wide)
+    positive = models.IntegerField(default=0)
+    # Positive match comments in the bucket
+    neutral = models.IntegerField(default=0)
+    # Neutral match comments in the bucket
+    negative = models.IntegerField(default=0)
+    # Negative match comments in the bucket
+
+    class Meta:
+        unique_together = ('fixture', 'bucket_start')
+    # One bucket per fixture and time slot; also serves the recent-window range read
+
+class PredictionTally(models.Model):
+    fixture = models.ForeignKey(Fixture, on_delete=models.CASCADE, related_name='prediction_tallies')
+    # Link to Fixture
+    home_goals = models.PositiveSmallIntegerField()
+    # Predicted home goals
+    away_goals = models.PositiveSmallIntegerField()
+    # Predicted away goals
+    predictions = models.IntegerField(default=0)
+    # Fans currently predicting this score
+
+    class Meta:
+        unique_together = ('fixture', 'home_goals', 'away_goals')
+    # One row per fixture and predicted score; a fixture's histogram is one indexed range read
+
+class SentimentRollup(models.Model):
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='sentiment_rollups')
+    # Link to Club
+    day = models.DateField()
+    # Day the comments were written
+    source = models.CharField(max_length=20, choices=[('comment', 'Comment'), ('newscomment', 'News comment'), ('matchcomment', 'Match comment')])
+    # Comment table the counts come from
+    topic_key = models.IntegerField(default=0)
+    # Topic id, 0 when the comment has no topic (kept non-null so the unique key holds on SQLite)
+    positive = models.IntegerField(default=0)
+    # Positive comments
+    neutral = models.IntegerField(default=0)
+    # Neutral comments
+    negative = models.IntegerField(default=0)
+    # Negative comments
+
+    class Meta:
+        unique_together = ('club', 'day', 'source', 'topic_key')
+    # One row per club, day, source and topic; leading club/day serves dashboard range reads
+
+class LeaderboardEntry(models.Model):
+    scope = models.CharField(max_length=20, choices=[
+        ('global', 'Global'), ('club', 'Club'), ('topic', 'Topic'),
+        ('global_week', 'Global, last 7 days'), ('club_week', 'Club, last 7 days'),
+        ('global_month', 'Global, last 30 days'), ('club_month', 'Club, last 30 days'),
+        ('global_season', 'Global, this season'), ('club_season', 'Club, this season'),
+    ])
+    # Leaderboard the entry belongs to
+    scope_id = models.IntegerField(default=0)
+    # Club or topic id, 0 for the global leaderboard
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    # Link to UserProfile
+    points = models.IntegerField(default=0)
+    # Points in this scope
+    rank = models.IntegerField()
+    # 1-based position, ties broken by the older profile
+    badges = models.JSONField(default=list)
+    # Decoded badges shown next to the fan
+    changed_at = models.DateTimeField(default=timezone.now)
+    # Last points or badge change, read by other processes' ranked indexes
+
+    class Meta:
+        unique_together = ('scope', 'scope_id', 'user_profile')
+        indexes = [
+            models.Index(fields=['scope', 'scope_id', 'rank'], name='leaderboard_rank_idx'),
+            models.Index(fields=['scope', 'scope_id', 'points'], name='leaderboard_points_idx'),
+            models.Index(fields=['scope', 'scope_id', 'changed_at'], name='leaderboard_changed_idx'),
+        ]
+    # Top-N reads walk the rank index; rank shifts use the points index; index refreshes use changed_at
+
+class PointsEvent(models.Model):
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='points_events')
+    # Fan whose balance changes
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, null=True, blank=True)
+    # Club balance (ClubStats.points) changed, or null for the global UserProfile.points
+    delta = models.IntegerField()
+    # Points added (negative to take points away)
+    reason = models.CharField(max_length=30, choices=[
+        ('opening', 'Opening balance'),
+        ('positive_comment', 'Positive comment'),
+        ('rescore', 'Comment re-scored'),
+        ('challenge', 'Challenge completed'),
+        ('challenge_badge', 'Challenge badge earned'),
+        ('reset', 'Stats reset'),
+    ])
+    # Why the points changed
+    source_type = models.CharField(max_length=30, blank=True)
+    # Kind of object that caused the change (e.g. 'comment')
+    source_id = models.BigIntegerField(null=True, blank=True)
+    # Id of that object
+    idempotency_key = models.CharField(max_length=150, unique=True)
+    # Applying the same key twice is a no-op
+    created_at = models.DateTimeField(default=timezone.now)
+    # When the change was recorded
+
+    class Meta:
+        indexes = [models.Index(fields=['user_profile', 'club', 'created_at'], name='points_event_fan_idx')]
+    # Per-fan history and replay reads
+
+    def __str__(self):
+        return f"{self.user_profile_id} {self.delta:+d} ({self.reason})"
+    # String representation of event
+
+class PointsBucket(models.Model):
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='points_buckets')
+    # Link to UserProfile
+    club = models.ForeignKey(Club, on_delete=models.CASCADE)
+    # Link to Club
+    day = models.DateField()
+    # Day the points were earned
+    points = models.IntegerField(default=0)
+    # Net club points earned that day
+
+    class Meta:
+        unique_together = ('user_profile', 'club', 'day')
+        indexes = [models.Index(fields=['day', 'club'], name='points_bucket_day_idx')]
+    # One row per fan, club and day; windowed sums read a day range
+
+class Badge(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    # Badge name shown to fans
+    bit = models.PositiveSmallIntegerField(unique=True)
+    # Position of the badge in badge_mask (0-62)
+    description = models.CharField(max_length=200, blank=True)
+    # How the badge is earned
+
+    class Meta:
+        ordering = ['bit']
+    # Catalogue order is award order on badge lists
+
+    def __str__(self):
+        return self.name
+    # String representation of badge
+
+class AwardedBadge(models.Model):
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='awarded_badges')
+    # Link to UserProfile
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, null=True, blank=True)
+    # Club the badge was earned in (null for profile-wide badges)
+    badge = models.ForeignKey(Badge, on_delete=models.CASCADE, related_name='awards')
+    # Link to Badge
+    awarded_at = models.DateTimeField(default=timezone.now)
+    # When the badge was earned
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_profile', 'club', 'badge'], name='awarded_badge_unique'),
+            models.UniqueConstraint(fields=['user_profile', 'badge'], condition=models.Q(club__isnull=True), name='awarded_badge_profile_unique'),
+        ]
+        indexes = [models.Index(fields=['badge', 'club'], name='awarded_badge_lookup_idx')]
+    # One award per fan, club and badge; "who holds this badge" is an indexed read
+
+    def __str__(self):
+        return f"{self.user_profile_id}: {self.badge_id}"
+    # String representation of award
+
+class ChallengeProgress(models.Model):
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='challenge_progress')
+    # Link to UserProfile
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, null=True, blank=True)
+    # Club the counts belong to (null for the fan's totals across clubs)
+    comments = models.IntegerField(default=0)
+    # Comments posted
+    positive_comments = models.IntegerField(default=0)
+    # Comments classified positive
+    news_comments = models.IntegerField(default=0)
+    # News comments posted
+    reactions = models.IntegerField(default=0)
+    # Likes and dislikes received on news comments
+    correct_predictions = models.IntegerField(default=0)
+    # Predictions settled as correct
+    week_start = models.DateField(null=True, blank=True)
+    # First day of the week week_comments counts
+    week_comments = models.IntegerField(default=0)
+    # Comments posted this week
+    month_start = models.DateField(null=True, blank=True)
+    # First day of the month month_correct_predictions counts
+    month_correct_predictions = models.IntegerField(default=0)
+    # Predictions settled as correct this month
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_profile', 'club'], name='challenge_progress_unique'),
+            models.UniqueConstraint(fields=['user_profile'], condition=models.Q(club__isnull=True), name='challenge_progress_total_unique'),
+        ]
+    # One row per fan and club plus one totals row per fan
+
+    def __str__(self):
+        return f"{self.user_profile_id} progress ({self.club_id or 'all clubs'})"
+    # String representation of progress
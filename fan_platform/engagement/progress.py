@@ -0,0 +1,147 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+# Import Django DB utilities
+from .models import ChallengeProgress
+from .rollups import IN_CHUNK
+# Import progress counters and the batch size for IN (...) lists
+
+PERIODS = {'week_comments': 'week_start', 'month_correct_predictions': 'month_start'}
+# Counters that restart every calendar period, and the column holding the period they count
+
+
+def period_start(field, day=None):
+    # First day of the current week (Monday) or month
+    day = day or timezone.localdate()
+    return day - timedelta(days=day.weekday()) if PERIODS[field] == 'week_start' else day.replace(day=1)
+
+
+def updates_for(deltas, starts):
+    # UPDATE expressions adding deltas, restarting period counters whose period has rolled over
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    for field, start in starts.items():
+        updates[field] = Case(When(**{PERIODS[field]: start}, then=F(field) + deltas[field]), default=Value(max(deltas[field], 0)))
+        updates[PERIODS[field]] = Value(start)
+    return updates
+
+
+def new_row(user_profile_id, club_id, deltas, starts):
+    return ChallengeProgress(user_profile_id=user_profile_id, club_id=club_id,
+                             **{field: max(delta, 0) if field in starts else delta for field, delta in deltas.items()},
+                             **{PERIODS[field]: start for field, start in starts.items()})
+
+
+def bump(lookup, deltas, starts):
+    # Add deltas to one progress row, restarting period counters whose period has rolled over
+    updates = updates_for(deltas, starts)
+    if ChallengeProgress.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            new_row(lookup['user_profile_id'], lookup['club_id'], deltas, starts).save(force_insert=True)
+    except IntegrityError:
+        ChallengeProgress.objects.filter(**lookup).update(**updates)
+        # Another writer created the row first
+
+
+def record(user_profile_id, club_id, at=None, **deltas):
+    # Count a fan's activity on their totals row and their row for club_id.
+    # at is when the counted object was created or settled; period counters
+    # ignore events from an earlier period.
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    starts = {}
+    for field in [field for field in deltas if field in PERIODS]:
+        start = period_start(field)
+        if at and period_start(field, timezone.localdate(at)) != start:
+            del deltas[field]
+        else:
+            starts[field] = start
+    if not deltas:
+        return
+    for club in {None, club_id}:
+        bump({'user_profile_id': user_profile_id, 'club_id': club}, deltas, starts)
+    from .challenge_rules import forget
+    forget(user_profile_id)  # The fan's next challenge check evaluates again
+
+
+def record_many(deltas_by_pair):
+    # Count current-period activity for many fans at once ({(user_profile_id, club_id): {field: delta}}).
+    # Rows getting the same deltas share one UPDATE per club; missing rows are inserted together.
+    rows = defaultdict(Counter)
+    for (user_profile_id, club_id), deltas in deltas_by_pair.items():
+        for club in {None, club_id}:
+            rows[(user_profile_id, club)].update(deltas)
+    groups = defaultdict(list)
+    for (user_profile_id, club), deltas in rows.items():
+        deltas = tuple(sorted((field, delta) for field, delta in deltas.items() if delta))
+        if deltas:
+            groups[(club, deltas)].append(user_profile_id)
+    for (club, deltas), user_profile_ids in groups.items():
+        deltas = dict(deltas)
+        starts = {field: period_start(field) for field in deltas if field in PERIODS}
+        updates = updates_for(deltas, starts)
+        for start in range(0, len(user_profile_ids), IN_CHUNK):
+            chunk = user_profile_ids[start:start + IN_CHUNK]
+            existing = set(ChallengeProgress.objects.filter(user_profile_id__in=chunk, club_id=club).values_list('user_profile_id', flat=True))
+            if existing:
+                ChallengeProgress.objects.filter(user_profile_id__in=existing, club_id=club).update(**updates)
+            missing = [user_profile_id for user_profile_id in chunk if user_profile_id not in existing]
+            if not missing:
+                continue
+            try:
+                with transaction.atomic():
+                    ChallengeProgress.objects.bulk_create([new_row(user_profile_id, club, deltas, starts) for user_profile_id in missing])
+            except IntegrityError:
+                for user_profile_id in missing:  # Another writer created some of the rows first
+                    bump({'user_profile_id': user_profile_id, 'club_id': club}, deltas, starts)
+    from .challenge_rules import forget
+    for user_profile_id, club_id in deltas_by_pair:
+        forget(user_profile_id)
+
+
+def current(row, field, start=None):
+    # A period counter's value, or 0 once its period is over
+    if row is None:
+        return 0
+    return getattr(row, field) if getattr(row, PERIODS[field]) == (start or period_start(field)) else 0
+
+
+def counts(total, club, starts=None):
+    # Challenge inputs from a fan's totals row and active-club row (either may be missing)
+    starts = starts or {field: period_start(field) for field in PERIODS}
+    return {
+        'comments': total.comments if total else 0,
+        'club_comments': club.comments if club else 0,
+        'positive_comments': total.positive_comments if total else 0,
+        'news_comments': total.news_comments if total else 0,
+        'reactions': total.reactions if total else 0,
+        'correct_predictions': total.correct_predictions if total else 0,
+        'week_comments': current(total, 'week_comments', starts['week_comments']),
+        'month_correct_predictions': current(total, 'month_correct_predictions', starts['month_correct_predictions']),
+    }
+
+
+def snapshots(pairs):
+    # {user_profile_id: counts} for many (user_profile_id, active_club_id) pairs in one query
+    pairs = dict(pairs)
+    starts = {field: period_start(field) for field in PERIODS}
+    rows = {}
+    club_ids = {club_id for club_id in pairs.values() if club_id}
+    for row in ChallengeProgress.objects.filter(user_profile_id__in=list(pairs)).filter(Q(club__isnull=True) | Q(club_id__in=club_ids)):
+        rows[(row.user_profile_id, row.club_id)] = row
+    return {
+        user_profile_id: counts(rows.get((user_profile_id, None)), rows.get((user_profile_id, club_id)) if club_id else None, starts)
+        for user_profile_id, club_id in pairs.items()
+    }
+
+
+def snapshot(user_profile_id, club_id=None):
+    # Everything the challenges read for one fan
+    return snapshots([(user_profile_id, club_id)])[user_profile_id]
+
+
+def clear_comments(user_profile_id):
+    # Zero comment counters after a fan's comments are deleted
+    ChallengeProgress.objects.filter(user_profile_id=user_profile_id).update(comments=0, positive_comments=0, week_comments=0)
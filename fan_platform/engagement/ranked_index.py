@@ -0,0 +1,145 @@
+import itertools
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+# Import bisect, threading and Django utilities
+from .models import LeaderboardEntry
+# Import materialized leaderboard
+
+SYNC_OVERLAP = timedelta(seconds=5)
+# Re-read changes this far before the last sync to tolerate clock skew between processes
+_versions = itertools.count(1)
+# Process-wide version source, so a reloaded scope never reuses an old version
+
+
+class ScopeRanking:
+    # One leaderboard scope as a sorted list of (-points, user_profile_id) keys.
+    # version changes whenever a fan's points or badges change.
+
+    def __init__(self, rows):
+        self.points = {}
+        self.badges = {}
+        for user_profile_id, points, badges in rows:
+            self.points[user_profile_id] = points
+            self.badges[user_profile_id] = badges
+        self.keys = sorted((-points, user_profile_id) for user_profile_id, points in self.points.items())
+        self.version = next(_versions)
+
+    def set(self, user_profile_id, points, badges):
+        old = self.points.get(user_profile_id)
+        if old == points and self.badges.get(user_profile_id) == badges:
+            return
+        if old != points:
+            if old is not None:
+                del self.keys[bisect_left(self.keys, (-old, user_profile_id))]
+            insort(self.keys, (-points, user_profile_id))
+            self.points[user_profile_id] = points
+        self.badges[user_profile_id] = badges
+        self.version = next(_versions)
+
+    def rank_of(self, user_profile_id):
+        # 1-based rank, or None if the fan has no entry in this scope
+        points = self.points.get(user_profile_id)
+        if points is None:
+            return None
+        return bisect_left(self.keys, (-points, user_profile_id)) + 1
+
+    def slice(self, start, stop):
+        # [(rank, user_profile_id, points)] for positions start..stop-1
+        start = max(0, start)
+        return [(start + i + 1, user_profile_id, -negated) for i, (negated, user_profile_id) in enumerate(self.keys[start:stop])]
+
+
+class RankedIndex:
+    # Per-process ranked view of every leaderboard scope. Points changes made by
+    # this process are applied as soon as they commit; changes from other
+    # processes are pulled from LeaderboardEntry.changed_at every refresh_seconds.
+
+    def __init__(self, refresh_seconds):
+        self.refresh_seconds = refresh_seconds
+        self.lock = threading.Lock()
+        self.scopes = {}
+        # (scope, scope_id) -> {'ranking', 'checked_at', 'synced_to'}
+
+    def load(self, scope, scope_id):
+        synced_to = timezone.now()
+        rows = LeaderboardEntry.objects.filter(scope=scope, scope_id=scope_id).values_list('user_profile_id', 'points', 'badges')
+        return {'ranking': ScopeRanking(rows.iterator()), 'checked_at': time.monotonic(), 'synced_to': synced_to}
+
+    def preload(self):
+        # Build every scope in one pass, e.g. before a preforking server starts workers
+        started = timezone.now()
+        grouped = {}
+        for scope, scope_id, user_profile_id, points, badges in LeaderboardEntry.objects.values_list('scope', 'scope_id', 'user_profile_id', 'points', 'badges').iterator():
+            grouped.setdefault((scope, scope_id), []).append((user_profile_id, points, badges))
+        with self.lock:
+            self.scopes = {
+                key: {'ranking': ScopeRanking(rows), 'checked_at': time.monotonic(), 'synced_to': started}
+                for key, rows in grouped.items()
+            }
+
+    def get(self, scope, scope_id):
+        # Ranking for a scope, loading it or pulling other processes' changes when due
+        key = (scope, scope_id)
+        with self.lock:
+            entry = self.scopes.get(key)
+        if entry is None:
+            entry = self.load(scope, scope_id)
+            with self.lock:
+                entry = self.scopes.setdefault(key, entry)
+        elif time.monotonic() - entry['checked_at'] > self.refresh_seconds:
+            synced_to = timezone.now()
+            changes = list(LeaderboardEntry.objects.filter(
+                scope=scope, scope_id=scope_id, changed_at__gte=entry['synced_to'] - SYNC_OVERLAP
+            ).values_list('user_profile_id', 'points', 'badges'))
+            with self.lock:
+                for user_profile_id, points, badges in changes:
+                    entry['ranking'].set(user_profile_id, points, badges)
+                entry['checked_at'] = time.monotonic()
+                entry['synced_to'] = synced_to
+        return entry['ranking']
+
+    def update(self, scope, scope_id, user_profile_id, points, badges):
+        # Apply a committed points or badge change; scopes not loaded yet pick it up when they load
+        with self.lock:
+            entry = self.scopes.get((scope, scope_id))
+            if entry:
+                entry['ranking'].set(user_profile_id, points, badges)
+
+    def version(self, scope, scope_id):
+        # Changes whenever the scope's standings change; used to validate cached leaderboards
+        return self.get(scope, scope_id).version
+
+    def rank_of(self, scope, scope_id, user_profile_id):
+        ranking = self.get(scope, scope_id)
+        with self.lock:
+            return ranking.rank_of(user_profile_id)
+
+    def top(self, scope, scope_id, n):
+        ranking = self.get(scope, scope_id)
+        with self.lock:
+            return ranking.slice(0, n)
+
+    def around(self, scope, scope_id, user_profile_id, k):
+        # Fans within k places of user_profile_id, including them
+        ranking = self.get(scope, scope_id)
+        with self.lock:
+            rank = ranking.rank_of(user_profile_id)
+            return ranking.slice(rank - 1 - k, rank + k) if rank else []
+
+    def size(self, scope, scope_id):
+        ranking = self.get(scope, scope_id)
+        with self.lock:
+            return len(ranking.keys)
+
+    def clear(self):
+        # Forget every scope, e.g. after the leaderboard table is rebuilt
+        with self.lock:
+            self.scopes = {}
+
+
+index = RankedIndex(settings.LEADERBOARD_INDEX_REFRESH_SECONDS)
+# Shared per-process ranked index
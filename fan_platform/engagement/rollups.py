@@ -0,0 +1,97 @@
+from collections import Counter, defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+# Import counters and Django DB utilities
+from .models import SentimentRollup
+# Import rollup model
+
+SENTIMENT_FIELDS = {'Positive': 'positive', 'Neutral': 'neutral', 'Negative': 'negative'}
+# Rollup column per sentiment label
+IN_CHUNK = 500
+# Keys per IN (...) list in batched increments
+SOURCE_CLUB_FIELDS = {
+    'comment': 'club_id',
+    'newscomment': 'news_article__club_id',
+    'matchcomment': 'fixture__club_id',
+}
+# Where each comment table keeps its club
+
+
+def increment(model, lookup, deltas):
+    # Add deltas to counter columns of one row, creating the row on first use
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**updates)
+        # Another writer created the row first
+
+
+def increment_many(model, shared, key_field, deltas, field):
+    # Add {key: delta} to field on the rows matching shared plus key_field=key, creating missing rows.
+    # Keys with the same delta share one UPDATE; missing rows are inserted together.
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    keys = list(deltas)
+    for start in range(0, len(keys), IN_CHUNK):
+        chunk = keys[start:start + IN_CHUNK]
+        existing = set(model.objects.filter(**shared, **{f'{key_field}__in': chunk}).values_list(key_field, flat=True))
+        by_delta = defaultdict(list)
+        for key in chunk:
+            if key in existing:
+                by_delta[deltas[key]].append(key)
+        for delta, present in by_delta.items():
+            model.objects.filter(**shared, **{f'{key_field}__in': present}).update(**{field: F(field) + delta})
+        missing = [key for key in chunk if key not in existing]
+        if not missing:
+            continue
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([model(**shared, **{key_field: key, field: deltas[key]}) for key in missing])
+        except IntegrityError:
+            for key in missing:  # Another writer created some of the rows first
+                increment(model, {**shared, key_field: key}, {field: deltas[key]})
+
+
+def key_for(source, club_id, topic_id, created_at, label):
+    # Rollup key for one comment
+    return (club_id, topic_id or 0, source, timezone.localdate(created_at), label)
+
+
+def apply(deltas):
+    # Apply a Counter of {(club_id, topic_key, source, day, label): delta} to the rollups
+    grouped = defaultdict(lambda: defaultdict(int))
+    for (club_id, topic_key, source, day, label), delta in deltas.items():
+        field = SENTIMENT_FIELDS.get(label)
+        if field and delta:
+            grouped[(club_id, topic_key, source, day)][field] += delta
+    for (club_id, topic_key, source, day), fields in grouped.items():
+        fields = {field: delta for field, delta in fields.items() if delta}
+        if fields:
+            increment(SentimentRollup, {'club_id': club_id, 'topic_key': topic_key, 'source': source, 'day': day}, fields)
+
+
+def record(source, club_id, topic_id, created_at, label, delta=1):
+    # Count one written (or removed, with delta=-1) comment
+    apply(Counter({key_for(source, club_id, topic_id, created_at, label): delta}))
+
+
+def grouped_counts(source, queryset):
+    # Rollup counts for a comment queryset, computed with one grouped query
+    club_field = SOURCE_CLUB_FIELDS[source]
+    fields = [club_field, 'sentiment'] + (['topic_id'] if source == 'comment' else [])
+    rows = queryset.filter(sentiment__in=SENTIMENT_FIELDS).annotate(day=TruncDate('created_at')) \
+        .values(*fields, 'day').annotate(n=Count('id')).order_by()
+    counts = Counter()
+    for row in rows.iterator():
+        counts[(row[club_field], row.get('topic_id') or 0, source, row['day'], row['sentiment'])] += row['n']
+    return counts
+
+
+def remove(source, queryset):
+    # Subtract comments that are about to be deleted
+    apply(Counter({key: -n for key, n in grouped_counts(source, queryset).items()}))
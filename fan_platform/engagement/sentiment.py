@@ -0,0 +1,103 @@
+import gc
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+# Import logging, threading and settings for the lazy analyzer
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_THRESHOLD = 0.05
+# Compound score at or above which a comment is Positive
+NEGATIVE_THRESHOLD = -0.05
+# Compound score at or below which a comment is Negative
+MAX_BATCH_SIZE = 5000
+# Largest batch accepted by the bulk endpoint
+NLTK_LEXICON_RESOURCE = 'sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt'
+# Installed NLTK data used when no bundled lexicon file exists
+
+_analyzer = None
+_load_lock = threading.Lock()
+# Analyzer is built once per process, on first use
+load_stats = {'loaded': False, 'load_seconds': None, 'source': None, 'lexicon_size': 0, 'lexicon_version': None}
+# Load report for the shared analyzer
+
+
+def label_for(compound):
+    # Map a VADER compound score to a sentiment label
+    if compound >= POSITIVE_THRESHOLD:
+        return 'Positive'
+    if compound <= NEGATIVE_THRESHOLD:
+        return 'Negative'
+    return 'Neutral'
+
+
+def read_lexicon():
+    # Read the bundled lexicon, or the locally installed NLTK copy; never downloads
+    path = getattr(settings, 'SENTIMENT_LEXICON_PATH', None)
+    if path and Path(path).is_file():
+        return Path(path).read_text(encoding='utf-8'), str(path)
+    import nltk.data
+    try:
+        return nltk.data.load(NLTK_LEXICON_RESOURCE, format='text'), NLTK_LEXICON_RESOURCE
+    except LookupError:
+        raise LookupError(
+            f"VADER lexicon not found at {path} or in local NLTK data. "
+            "Run 'python manage.py bundle_vader_lexicon' where the lexicon is installed."
+        )
+
+
+def get_analyzer():
+    # Return the shared analyzer, loading the lexicon on first use
+    global _analyzer
+    if _analyzer is None:
+        with _load_lock:
+            if _analyzer is None:
+                started = time.perf_counter()
+                from .vader import BatchSentimentAnalyzer
+                lexicon_text, source = read_lexicon()
+                analyzer = BatchSentimentAnalyzer(lexicon_text)
+                load_stats.update(
+                    loaded=True,
+                    load_seconds=round(time.perf_counter() - started, 4),
+                    source=source,
+                    lexicon_size=len(analyzer.lexicon),
+                    lexicon_version=hashlib.sha256(lexicon_text.encode('utf-8')).hexdigest()[:16]
+                )
+                logger.info(f"Loaded VADER lexicon from {source}: {load_stats['lexicon_size']} entries in {load_stats['load_seconds']}s")
+                _analyzer = analyzer
+    return _analyzer
+
+
+def preload():
+    # Load the analyzer in the parent process so forked workers share it copy-on-write
+    get_analyzer()
+    gc.freeze()
+    # Keep the collector from touching (and copying) the preloaded objects in children
+    return load_stats
+
+
+def cache_version():
+    # Version of cached results: changes with the lexicon contents or the thresholds
+    get_analyzer()
+    return hashlib.sha256(
+        f"{load_stats['lexicon_version']}:{POSITIVE_THRESHOLD}:{NEGATIVE_THRESHOLD}".encode('utf-8')
+    ).hexdigest()[:16]
+
+
+def score_uncached(texts):
+    # Compound scores straight from VADER, bypassing the result cache
+    return [scores['compound'] for scores in get_analyzer().polarity_scores_batch(texts)]
+
+
+def classify(text):
+    # Return the sentiment label for one text
+    return classify_batch([text])[0][0]
+
+
+def classify_batch(texts, scorer=score_uncached):
+    # Return (label, compound) pairs for a list of texts, in input order, through the result cache
+    from .sentiment_cache import result_cache
+    return result_cache.classify(texts, cache_version(), scorer, label_for)
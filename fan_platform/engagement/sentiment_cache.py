@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from django.conf import settings
+from django.db import DatabaseError
+# Import hashing, threading and Django utilities
+from .models import SentimentCacheEntry
+# Import persistent cache table
+
+logger = logging.getLogger(__name__)
+
+DB_CHUNK_SIZE = 500
+# Keys per IN (...) lookup and per bulk insert, well under SQLite's variable limit
+
+
+def normalize(text):
+    # Collapse whitespace; VADER splits on whitespace, so scores are unchanged
+    return ' '.join(text.split())
+
+
+class SentimentResultCache:
+    # In-process LRU in front of the SentimentCacheEntry table.
+    # Keys hash the cache version together with the normalized text, so a new
+    # lexicon or new thresholds simply stop matching old entries.
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key_for(self, version, text):
+        # Hash of cache version and normalized text
+        return hashlib.sha256(f'{version}\0{normalize(text)}'.encode('utf-8')).hexdigest()
+
+    def remember(self, found):
+        # Add results to the LRU, evicting the least recently used entries
+        with self.lock:
+            for key, result in found.items():
+                self.entries[key] = result
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def load_from_db(self, keys):
+        # Fetch persisted results for keys; a missing table only disables this tier
+        found = {}
+        try:
+            for i in range(0, len(keys), DB_CHUNK_SIZE):
+                rows = SentimentCacheEntry.objects.filter(key__in=keys[i:i + DB_CHUNK_SIZE]).values_list('key', 'sentiment', 'compound')
+                found.update((key, (label, compound)) for key, label, compound in rows)
+        except DatabaseError as e:
+            logger.warning(f"Sentiment cache lookup failed: {e}")
+        return found
+
+    def save_to_db(self, version, found):
+        # Persist newly scored results
+        try:
+            SentimentCacheEntry.objects.bulk_create(
+                [SentimentCacheEntry(key=key, version=version, sentiment=label, compound=compound) for key, (label, compound) in found.items()],
+                batch_size=DB_CHUNK_SIZE,
+                ignore_conflicts=True
+            )
+        except DatabaseError as e:
+            logger.warning(f"Sentiment cache write failed: {e}")
+
+    def classify(self, texts, version, scorer, label_for):
+        # Return (label, compound) per text, scoring only texts missing from both tiers
+        texts = [text if isinstance(text, str) else str(text) for text in texts]
+        keys = [self.key_for(version, text) for text in texts]
+        counts = Counter(keys)
+        results = {}
+        with self.lock:
+            for key in counts:
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    results[key] = self.entries[key]
+            self.memory_hits += sum(counts[key] for key in results)
+
+        missing = [key for key in counts if key not in results]
+        from_db = self.load_from_db(missing) if missing else {}
+        with self.lock:
+            self.db_hits += sum(counts[key] for key in from_db)
+        results.update(from_db)
+
+        text_for = {}
+        for key, text in zip(keys, texts):
+            if key not in results:
+                text_for.setdefault(key, normalize(text))
+        scored = {}
+        if text_for:
+            compounds = scorer(list(text_for.values()))
+            scored = {key: (label_for(compound), compound) for key, compound in zip(text_for, compounds)}
+            with self.lock:
+                self.misses += sum(counts[key] for key in scored)
+            self.save_to_db(version, scored)
+            results.update(scored)
+
+        self.remember({**from_db, **scored})
+        return [results[key] for key in keys]
+
+    def stats(self):
+        # Hit and miss counters for this process
+        with self.lock:
+            memory_hits, db_hits, misses, entries, evictions = self.memory_hits, self.db_hits, self.misses, len(self.entries), self.evictions
+        lookups = memory_hits + db_hits + misses
+        return {
+            'memory_hits': memory_hits,
+            'db_hits': db_hits,
+            'misses': misses,
+            'hit_rate': round((memory_hits + db_hits) / lookups, 4) if lookups else None,
+            'memory_entries': entries,
+            'memory_capacity': self.max_entries,
+            'evictions': evictions
+        }
+
+
+result_cache = SentimentResultCache(settings.SENTIMENT_CACHE_SIZE)
+# Shared per-process result cache
+
+
+def prune_stale(version):
+    # Delete persisted results computed with another lexicon or thresholds
+    deleted, _ = SentimentCacheEntry.objects.exclude(version=version).delete()
+    return deleted
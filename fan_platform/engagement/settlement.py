@@ -0,0 +1,102 @@
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Sign
+from django.db.models.lookups import Exact
+from django.utils import timezone
+# Import settings and Django DB utilities
+from .models import Fixture, Prediction, UserProfile, parse_score
+from .rollups import IN_CHUNK
+from . import challenge_rules, progress
+# Import predictions, fans, challenge engine and challenge progress
+
+
+def grouped(predictions, month_start):
+    # {(user_profile_id, club_id): (predictions, predictions verified since month_start)} in one grouped query
+    return {
+        (row['user_profile_id'], row['club_id']): (row['n'], row['month'])
+        for row in predictions.values('user_profile_id', 'club_id').annotate(
+            n=Count('id'), month=Count('id', filter=Q(verified_at__date__gte=month_start)),
+        ).order_by()
+    }
+
+
+def bump_correct(totals):
+    # Add {user_profile_id: delta} to UserProfile.correct_predictions; fans with the same delta share one UPDATE
+    by_delta = defaultdict(list)
+    for user_profile_id, delta in totals.items():
+        if delta:
+            by_delta[delta].append(user_profile_id)
+    for delta, user_profile_ids in by_delta.items():
+        for start in range(0, len(user_profile_ids), IN_CHUNK):
+            UserProfile.objects.filter(pk__in=user_profile_ids[start:start + IN_CHUNK]).update(correct_predictions=F('correct_predictions') + delta)
+
+
+def check_challenges(user_profile_ids):
+    # Evaluate challenges for fans whose correct predictions went up, in batches after settlement commits
+    user_profile_ids = list(user_profile_ids)
+    for start in range(0, len(user_profile_ids), challenge_rules.CHECK_CHUNK):
+        challenge_rules.check_many(UserProfile.objects.filter(
+            pk__in=user_profile_ids[start:start + challenge_rules.CHECK_CHUNK]
+        ).values_list('pk', 'active_club_id'))
+
+
+def tiers(home_goals, away_goals):
+    # SQL conditions for each scoring tier against a final score, best tier first
+    return {
+        'exact': Q(home_goals=home_goals, away_goals=away_goals),
+        'difference': Exact(F('home_goals') - F('away_goals'), home_goals - away_goals),
+        'outcome': Exact(Sign(F('home_goals') - F('away_goals')), (home_goals > away_goals) - (home_goals < away_goals)),
+    }
+
+
+def scoring(home_goals, away_goals):
+    # Points expression for a prediction under PREDICTION_SCORING
+    names = ['exact'] if settings.PREDICTION_SCORING == 'exact' else ['exact', 'difference', 'outcome']
+    conditions = tiers(home_goals, away_goals)
+    return Case(*[When(conditions[name], then=Value(settings.PREDICTION_POINTS[name])) for name in names], default=Value(0))
+
+
+def accuracy(fixture_id):
+    # How a fixture's predictions did against its final score, from one aggregate query
+    fixture = Fixture.objects.only('home_goals', 'away_goals').get(pk=fixture_id)
+    predictions = Prediction.objects.filter(fixture_id=fixture_id, home_goals__isnull=False)
+    stats = {'predictions': Count('id'), 'points': Sum('points', default=0),
+             'average_home_goals': Avg('home_goals'), 'average_away_goals': Avg('away_goals')}
+    if fixture.home_goals is not None:
+        stats.update({name: Count('id', filter=condition) for name, condition in tiers(fixture.home_goals, fixture.away_goals).items()})
+    return predictions.aggregate(**stats)
+
+
+def settle(fixture_id, result):
+    # Mark every prediction for a fixture right or wrong against its final result and score it;
+    # returns (newly correct, newly wrong). Correct predictions carry verified_at, which marks them
+    # as counted in the fan's totals.
+    home_goals, away_goals = parse_score(result)
+    now = timezone.now()
+    month_start = progress.period_start('month_correct_predictions', timezone.localdate(now))
+    predictions = Prediction.objects.filter(fixture_id=fixture_id)
+    gaining = predictions.filter(home_goals=home_goals, away_goals=away_goals, is_correct=False)
+    losing = predictions.filter(is_correct=True).exclude(home_goals=home_goals, away_goals=away_goals)
+    with transaction.atomic():
+        predictions.filter(home_goals__isnull=False).update(points=scoring(home_goals, away_goals))  # Every prediction scored in one statement
+        gained = grouped(gaining, month_start)
+        lost = grouped(losing, month_start)
+        if gained:
+            gaining.update(is_correct=True, verified_at=now)
+        if lost:
+            losing.update(is_correct=False, verified_at=None)
+        deltas = defaultdict(lambda: defaultdict(int))
+        totals = defaultdict(int)
+        for pairs, sign in ((gained, 1), (lost, -1)):
+            for (user_profile_id, club_id), (n, month) in pairs.items():
+                deltas[(user_profile_id, club_id)]['correct_predictions'] += sign * n
+                deltas[(user_profile_id, club_id)]['month_correct_predictions'] += sign * (n if sign > 0 else month)
+                totals[user_profile_id] += sign * n
+        bump_correct(totals)
+        progress.record_many(deltas)
+        winners = {user_profile_id for user_profile_id, club_id in gained}
+        if winners:
+            transaction.on_commit(lambda: check_challenges(winners))  # Award challenge points once the settlement is saved
+    return sum(n for n, month in gained.values()), sum(n for n, month in lost.values())
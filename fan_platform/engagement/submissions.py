@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+# Import settings and Django DB utilities
+from .models import Fixture, Prediction, parse_score
+from .crowd import board as crowd_board
+# Import predictions and the crowd prediction histograms
+
+MESSAGES = {
+    'submitted': 'Prediction submitted!',
+    'updated': 'Prediction updated!',
+    'empty': 'Prediction cannot be empty.',
+    'invalid': 'Invalid score format. Use x-y (e.g., 2-1).',
+    'not_found': 'Fixture not found.',
+    'locked': 'Predictions are locked once the match has kicked off.',
+    'finalized': 'Prediction finalized—no further changes allowed.',
+}
+# Response message per submission outcome
+
+
+def locked(fixture):
+    # Live matches and matches with a result take no more predictions
+    return fixture.is_live or bool(fixture.final_result)
+
+
+def result(outcome, **state):
+    return {'status': 'success' if outcome in ('submitted', 'updated') else 'error', 'outcome': outcome, 'message': MESSAGES[outcome], **state}
+
+
+def submit(user_profile, fixture_id, text):
+    # Record a fan's predicted score for a fixture. The limit and the kickoff lock are enforced by one
+    # conditional UPDATE that only succeeds from the submission count this call read, so concurrent
+    # submissions cannot both pass; returns the outcome and the prediction's new state.
+    try:
+        home_goals, away_goals = parse_score(text)
+    except (ValidationError, TypeError):
+        return result('invalid')
+    if home_goals is None:
+        return result('empty')
+    predictions = Prediction.objects.filter(user_profile=user_profile, fixture_id=fixture_id)
+    while True:
+        state = predictions.values_list('pk', 'submission_count', 'home_goals', 'away_goals').first()
+        if state is None:
+            fixture = Fixture.objects.filter(pk=fixture_id).only('club_id', 'is_live', 'final_result').first()
+            if fixture is None:
+                return result('not_found')
+            if locked(fixture):
+                return result('locked')
+            try:
+                with transaction.atomic():
+                    Prediction.objects.bulk_create([Prediction(
+                        user_profile=user_profile, fixture_id=fixture_id, club_id=user_profile.active_club_id or fixture.club_id,
+                        text='', submission_count=0
+                    )])
+            except IntegrityError:
+                pass  # Another request created it first
+            continue
+        pk, count, old_home, old_away = state
+        if count >= settings.PREDICTION_SUBMISSION_LIMIT:
+            return result('finalized', submission_count=count)
+        now = timezone.now()
+        with transaction.atomic():
+            updated = Prediction.objects.filter(
+                pk=pk, submission_count=count, fixture__is_live=False, fixture__final_result=''
+            ).update(text=f'{home_goals}-{away_goals}', home_goals=home_goals, away_goals=away_goals, created_at=now, submission_count=count + 1)
+            if updated:
+                crowd_board.record(fixture_id, (old_home, old_away), (home_goals, away_goals))  # Same transaction, one commit
+        if updated:
+            return result('updated' if count else 'submitted', prediction_text=f'{home_goals}-{away_goals}',
+                          created_at=now.isoformat(), submission_count=count + 1)
+        if locked(Fixture.objects.only('is_live', 'final_result').get(pk=fixture_id)):
+            return result('locked')
+        # Another submission for this prediction won the race; re-read and try again
@@ -0,0 +1,70 @@
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+# Import Django cache and query utilities
+from .models import Comment
+from .leaderboards import POINTS_PER_POSITIVE_COMMENT
+# Import comment model and the points a positive comment earns
+
+
+def version_key(user_profile_id):
+    return f'points-timeline-version:{user_profile_id}'
+
+
+def invalidate(user_profile_id):
+    # Drop a fan's cached timelines after their positive comments change
+    try:
+        cache.incr(version_key(user_profile_id))
+    except ValueError:
+        cache.set(version_key(user_profile_id), 1, None)
+
+
+def downsample(series, size):
+    # Keep size evenly spaced points of a cumulative series, always including the first and last
+    if len(series) <= size:
+        return series
+    step = (len(series) - 1) / (size - 1)
+    return [series[round(i * step)] for i in range(size)]
+
+
+def build(user_profile_id, club_id):
+    # Cumulative club and global series from one grouped query over the fan's positive comments
+    rows = Comment.objects.filter(user_profile_id=user_profile_id, sentiment='Positive') \
+        .annotate(day=TruncDate('created_at')).values('day', 'club_id', 'topic_id') \
+        .annotate(n=Count('id')).order_by('day')
+    per_day = defaultdict(lambda: {'global': 0, 'club': 0, 'topics': defaultdict(int)})
+    for row in rows:
+        day = per_day[row['day']]
+        day['global'] += row['n']
+        if row['club_id'] == club_id:
+            day['club'] += row['n']
+            day['topics'][row['topic_id'] or 0] += row['n']
+
+    club_series, global_series = [], []
+    club_total = global_total = 0
+    topic_totals = defaultdict(int)
+    for day in sorted(per_day, key=lambda day: (day is None, day)):
+        counts = per_day[day]
+        label = day.strftime('%Y-%m-%d') if day else 'Unknown'
+        global_total += counts['global'] * POINTS_PER_POSITIVE_COMMENT
+        global_series.append({'date': label, 'points': global_total})
+        if counts['club']:
+            club_total += counts['club'] * POINTS_PER_POSITIVE_COMMENT
+            for topic_id, n in counts['topics'].items():
+                topic_totals[topic_id] += n * POINTS_PER_POSITIVE_COMMENT
+            club_series.append({'date': label, 'points': club_total, 'topics': dict(topic_totals)})
+    size = settings.LEADERBOARD_TIMELINE_POINTS
+    return {'club': downsample(club_series, size), 'global': downsample(global_series, size)}
+
+
+def points_timeline(user_profile_id, club_id):
+    # Cached per fan and club until their positive comments change or the TTL runs out
+    version = cache.get(version_key(user_profile_id), 0)
+    key = f'points-timeline:{user_profile_id}:{club_id}:{version}'
+    data = cache.get(key)
+    if data is None:
+        data = build(user_profile_id, club_id)
+        cache.set(key, data, settings.LEADERBOARD_TIMELINE_CACHE_SECONDS)
+    return data
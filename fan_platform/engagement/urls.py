@@ -12,9 +12,13 @@ urlpatterns = [ # Map root to various views
     path('fixtures/', views.fixtures, name='fixtures'),
     path('switch-club/', views.switch_club, name='switch_club'),
     path('api/analyze-sentiment/', views.analyze_sentiment, name='analyze_sentiment'),
+    path('api/analyze-sentiment/bulk/', views.analyze_sentiment_bulk, name='analyze_sentiment_bulk'),
+    path('api/comment-status/<int:comment_id>/', views.comment_status, name='comment_status'),
+    path('api/sentiment-cache-stats/', views.sentiment_cache_stats, name='sentiment_cache_stats'),
     path('api/update-stats/', views.update_stats, name='update_stats'),
     path('api/get-badges/', views.get_badges, name='get_badges'),
     path('api/get-leaderboard-data/', views.get_leaderboard_data, name='get_leaderboard_data'),
+    path('api/leaderboard-rank/', views.leaderboard_rank, name='leaderboard_rank'),
     path('reset-stats/', views.reset_stats, name='reset_stats'),
     path('register/', views.register, name='register'),
     path('login/', views.login_view, name='login'),
@@ -24,6 +28,9 @@ urlpatterns = [ # Map root to various views
     path('challenges/predict/<int:fixture_id>/', views.challenges_predict, name='challenges_predict'),
     path('update_predictions/', views.update_predictions, name='update_predictions'),
     path('live-match/', views.live_match, name='live_match'),
+    path('api/live-mood/<int:fixture_id>/', views.live_mood, name='live_mood'),
+    path('api/prediction-crowd/<int:fixture_id>/', views.prediction_crowd, name='prediction_crowd'),
+    path('api/sentiment-dashboard/', views.sentiment_dashboard, name='sentiment_dashboard'),
     path('polls/', views.polls, name='polls'),
     path('api/get-comments/', views.get_comments, name='get_comments'),
 ]
\ No newline at end of file
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+# Import NLTK VADER rules
+
+
+class BatchSentimentAnalyzer(SentimentIntensityAnalyzer):
+    # VADER analyzer that scores a list of texts together.
+    # SentiText rebuilds a punctuation/word cross product for every text; here the
+    # same tokens come from a per-token memo shared by the whole batch, and
+    # identical texts in a batch are only scored once.
+
+    def __init__(self, lexicon_text):
+        # Build from lexicon text already in memory instead of nltk.data.load
+        self.lexicon_file = lexicon_text.rstrip('\r\n')
+        self.lexicon = self.make_lex_dict()
+        self.constants = VaderConstants()
+        self.punctuation = frozenset(self.constants.PUNC_LIST)
+        # Punctuation VADER strips from either end of a token
+
+    def strip_token(self, token):
+        # Drop one leading or trailing punctuation run, exactly as SentiText does
+        word = self.constants.REGEX_REMOVE_PUNCTUATION.sub('', token)
+        if len(word) > 1:
+            if token.endswith(word) and token[:-len(word)] in self.punctuation:
+                return word
+            if token.startswith(word) and token[len(word):] in self.punctuation:
+                return word
+        return token
+
+    def tokenize(self, text, token_memo):
+        # Split text into VADER words and emoticons, reusing stripped tokens
+        tokens = []
+        for token in text.split():
+            if len(token) <= 1:
+                continue
+            stripped = token_memo.get(token)
+            if stripped is None:
+                stripped = token_memo[token] = self.strip_token(token)
+            tokens.append(stripped)
+        return tokens
+
+    def score_tokens(self, text, tokens, lower_memo):
+        # Score pre-tokenized text with the stock VADER valence rules
+        allcaps = sum(1 for token in tokens if token.isupper())
+        sentitext = SimpleNamespace(
+            text=text,
+            words_and_emoticons=tokens,
+            is_cap_diff=0 < len(tokens) - allcaps < len(tokens)
+        )
+        first_index = {}
+        for idx, token in enumerate(tokens):
+            first_index.setdefault(token, idx)
+        sentiments = []
+        for item in tokens:
+            i = first_index[item]
+            lowered = lower_memo.get(item)
+            if lowered is None:
+                lowered = lower_memo[item] = item.lower()
+            if (i < len(tokens) - 1 and lowered == 'kind' and tokens[i + 1].lower() == 'of') \
+                    or lowered in self.constants.BOOSTER_DICT:
+                sentiments.append(0)
+                continue
+            sentiments = self.sentiment_valence(0, sentitext, item, i, sentiments)
+        sentiments = self._but_check(tokens, sentiments)
+        return self.score_valence(sentiments, text)
+
+    def polarity_scores(self, text):
+        # Score a single text
+        return self.polarity_scores_batch([text])[0]
+
+    def polarity_scores_batch(self, texts):
+        # Score many texts, sharing tokenization and lookups across the batch
+        token_memo, lower_memo, by_text = {}, {}, {}
+        results = []
+        for text in texts:
+            text = text if isinstance(text, str) else str(text)
+            scores = by_text.get(text)
+            if scores is None:
+                scores = by_text[text] = self.score_tokens(text, self.tokenize(text, token_memo), lower_memo)
+            results.append(scores)
+        return results
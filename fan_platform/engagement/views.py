@@ -1,7 +1,4 @@
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-# Import NLTK for sentiment analysis
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponseNotModified, Http404
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout
@@ -10,30 +7,35 @@ from django.contrib.auth.decorators import login_required
 import json
 from django.shortcuts import redirect
 # Import JSON and redirect
-from .models import UserProfile, Comment, Prediction, Club, ClubStats, Topic, NewsArticle, NewsComment, Fixture, MatchComment, Poll, Vote
+from .models import UserProfile, Comment, Prediction, Club, ClubStats, Topic, NewsArticle, NewsComment, Fixture, MatchComment, Poll, Vote, SentimentRollup, parse_score
 # Import app models
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.db.models import Sum, Count
 from django.db.models import Q
 # Import Django messages and query utilities
 import logging
 from datetime import datetime, timedelta
 import random
+import uuid
+from django.db import transaction
 from django.utils import timezone
 # Import logging and datetime utilities
 from .forms import CommentForm
 # Import custom comment form
+from . import sentiment, classification, rollups, leaderboards, ledger, timeline, badges, progress, challenge_rules, settlement, submissions
+# Import batched sentiment engine and background classifier
+from .live_mood import board as mood_board
+from .crowd import board as crowd_board
+from .ranked_index import index as ranked_index
+from .leaderboard_cache import cache as leaderboard_cache, etag_for, matches as leaderboard_etag_matches
+# Import live match mood aggregates and crowd prediction histograms
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 # Configure debug logging
 
-# Download VADER lexicon (runs once)
-nltk.download('vader_lexicon')
-sia = SentimentIntensityAnalyzer()
-# Initialize VADER for sentiment analysis
-
 def get_or_create_user_profile(request):
     # Get or create user profile with default clubs
     if request.user.is_authenticated:
@@ -41,10 +43,12 @@ def get_or_create_user_profile(request):
         if not user_profile.supported_clubs.exists():
             user_profile.supported_clubs.set(Club.objects.all()[:2])
             user_profile.active_club = user_profile.supported_clubs.first()
-            user_profile.save()
+            user_profile.save(update_fields=['active_club'])
         elif not user_profile.active_club:
             user_profile.active_club = user_profile.supported_clubs.first()
-            user_profile.save()
+            user_profile.save(update_fields=['active_club'])
+        if request.session.get('active_club_id') != user_profile.active_club_id:
+            request.session['active_club_id'] = user_profile.active_club_id  # Lets cached leaderboard polls skip the profile query
         return user_profile
     return None
 
@@ -55,8 +59,8 @@ def home(request):
     club_stats = user_profile.club_stats.filter(club=user_profile.active_club).first()
     club_comment_count = user_profile.comment_set.filter(club=user_profile.active_club).count() if user_profile and user_profile.active_club else 0
     club_points = club_stats.points if club_stats else 0
-    club_badges = club_stats.badges if club_stats else 'None'
-    badges_count = len(club_badges.split(', ') if club_badges != 'None' else []) if club_badges else 0
+    club_badges = badges.display(club_stats.badge_mask) if club_stats else ''
+    badges_count = badges.count(club_stats.badge_mask) if club_stats else 0
     topics = Topic.objects.filter(club=user_profile.active_club) if user_profile and user_profile.active_club else []
     if user_profile and user_profile.active_club and not topics.exists():
         topics = [Topic.objects.create(club=user_profile.active_club, name='Match Reviews'),
@@ -89,35 +93,13 @@ def leaderboard(request):  # Render leaderboard with points data
                   Topic.objects.create(club=user_profile.active_club, name='Player Discussions'),
                   Topic.objects.create(club=user_profile.active_club, name='Fan Predictions')]
     
-    club_points_data = []  # Initialize club points data
-    if user_profile and user_profile.active_club:  # Check active club
-        comments = user_profile.comment_set.filter(club=user_profile.active_club, sentiment='Positive').order_by('created_at')  # Get positive comments
-        total_points = 0  # Track points
-        for comment in comments:  # Process comments
-            total_points += 10  # Add points
-            club_points_data.append({
-                'date': comment.created_at.strftime('%Y-%m-%d') if comment.created_at else 'Unknown',  # Handle null date
-                'points': total_points,  # Set points
-                'topic_id': comment.topic.id if comment.topic else 0  # Use 0 for null topic
-            })
-    
-    global_points_data = []  # Initialize global points data
-    if user_profile:  # Check user profile
-        comments = user_profile.comment_set.filter(sentiment='Positive').order_by('created_at')  # Get positive comments
-        total_points = 0  # Track points
-        for comment in comments:  # Process comments
-            total_points += 10  # Add points
-            global_points_data.append({
-                'date': comment.created_at.strftime('%Y-%m-%d') if comment.created_at else 'Unknown',  # Handle null date
-                'points': total_points,  # Set points
-                'topic_id': comment.topic.id if comment.topic else 0  # Use 0 for null topic
-            })
+    points_data = timeline.points_timeline(user_profile.id, user_profile.active_club_id) if user_profile else {'club': [], 'global': []}  # Downsampled cumulative points, cached per fan
     
     return render(request, 'engagement/leaderboard.html', {
         'user_profile': user_profile,
         'topics': topics,
-        'club_points_data': club_points_data,
-        'global_points_data': global_points_data
+        'club_points_data': json.dumps(points_data['club'] if user_profile and user_profile.active_club_id else []),
+        'global_points_data': json.dumps(points_data['global'])
     })  # Render template
 
 @login_required
@@ -141,20 +123,18 @@ def news_detail(request, article_id):
         if 'comment' in request.POST:
             text = request.POST.get('comment')
             if text:
-                scores = sia.polarity_scores(text)
-                sentiment = 'Neutral'
-                if scores['compound'] >= 0.05:
-                    sentiment = 'Positive'
-                elif scores['compound'] <= -0.05:
-                    sentiment = 'Negative'
+                sentiment_label = sentiment.classify(text)
+                if sentiment_label == 'Negative':
                     messages.warning(request, 'Your comment was detected as negative. Let’s keep it positive!')
                 
-                NewsComment.objects.create(
+                comment = NewsComment.objects.create(
                     user_profile=user_profile,
                     news_article=article,
                     text=text,
-                    sentiment=sentiment
+                    sentiment=sentiment_label
                 )
+                rollups.record('newscomment', article.club_id, None, comment.created_at, sentiment_label)  # Count in sentiment rollups
+                progress.record(user_profile.id, article.club_id, news_comments=1)  # Challenge progress
                 return JsonResponse({'status': 'success', 'message': 'Comment added!'})
             else:
                 return JsonResponse({'status': 'error', 'message': 'Comment cannot be empty.'}, status=400)
@@ -174,6 +154,8 @@ def news_detail(request, article_id):
                 elif action == 'dislike':
                     comment.dislikes += 1
                 comment.save()
+                progress.record(comment.user_profile_id, article.club_id,
+                                reactions=comment.likes + comment.dislikes - current_likes - current_dislikes)  # Reactions the author received
                 return JsonResponse({'likes': comment.likes, 'dislikes': comment.dislikes})
             return JsonResponse({'status': 'error', 'message': 'Invalid action'}, status=400)
 
@@ -189,99 +171,44 @@ def challenges(request):
     # Render challenges with user progress
     user_profile = get_or_create_user_profile(request)
     club_stats = user_profile.club_stats.filter(club=user_profile.active_club).first() if user_profile else None
-    total_comments = user_profile.comment_set.count() if user_profile else 0
-    club_comments = user_profile.comment_set.filter(club=user_profile.active_club).count() if user_profile and user_profile.active_club else 0
-    positive_comments = user_profile.comment_set.filter(sentiment='Positive').count() if user_profile else 0
-    news_comments = user_profile.newscomment_set.count() if user_profile else 0
-    # Sum likes and dislikes for engagement
-    likes_dislikes = (user_profile.newscomment_set.aggregate(total_likes=Sum('likes'), total_dislikes=Sum('dislikes'))['total_likes'] or 0) + \
-                     (user_profile.newscomment_set.aggregate(total_likes=Sum('likes'), total_dislikes=Sum('dislikes'))['total_dislikes'] or 0) if user_profile else 0
-    predictions = user_profile.prediction_set.filter(created_at__gte=datetime.now() - timedelta(days=30)).count() if user_profile else 0
-    correct_predictions = user_profile.prediction_set.filter(is_correct=True).count() if user_profile else 0
-
-    logger.debug(f"User: {user_profile.user.username}, Predictions: {predictions}, Correct Predictions: {correct_predictions}, Likes/Dislikes: {likes_dislikes}")
-
-    challenges = [
-        {
-            'name': 'Comment King',
-            'description': 'Post 5 comments.',
-            'target': 5,
-            'progress': total_comments,
-            'points': 10,
-            'badge': 'Comment King',
-            'completed': total_comments >= 5
-        },
-        {
-            'name': 'Positive Vibes',
-            'description': 'Post 3 positive comments.',
-            'target': 3,
-            'progress': positive_comments,
-            'points': 15,
-            'badge': 'Positive Fan',
-            'completed': positive_comments >= 3
-        },
-        {
-            'name': 'Loyal Supporter',
-            'description': 'Comment 10 times on your active club’s content.',
-            'target': 10,
-            'progress': club_comments,
-            'points': 15,
-            'badge': 'Loyal Supporters',
-            'completed': club_comments >= 10
-        },
-        {
-            'name': 'Prophet of the Pitch',
-            'description': 'Submit 3 correct predictions.',
-            'target': 3,
-            'progress': correct_predictions,
-            'points': 20,
-            'badge': 'Seer',
-            'completed': correct_predictions >= 3
-        },
-        {
-            'name': 'Match Day Commentator',
-            'description': 'Comment on 3 different match-related news articles.',
-            'target': 3,
-            'progress': news_comments,
-            'points': 10,
-            'badge': 'Commentator',
-            'completed': news_comments >= 3
-        },
-        {
-            'name': 'Engagement Booster',
-            'description': 'Like or dislike 10 comments from other users.',
-            'target': 10,
-            'progress': likes_dislikes,
-            'points': 5,
-            'badge': 'Engaged Fan',
-            'completed': likes_dislikes >= 10
-        }
-    ]
+    challenges = challenge_rules.evaluate(user_profile.id, user_profile.active_club_id)  # Every rule from one progress read
 
     if club_stats:
-        for challenge in challenges:
-            if challenge['completed'] and challenge['badge'] not in club_stats.badges.split(', ') and club_stats.badges != 'None':
-                club_stats.points += challenge['points']
-                badges = club_stats.badges.split(', ') if club_stats.badges != 'None' else []
-                badges.append(challenge['badge'])
-                club_stats.badges = ', '.join(badges) if badges else 'None'
-                club_stats.save()
+        challenge_rules.award_badges(club_stats, challenges)
         # Award global points
-        points_awarded = user_profile.check_challenge_completion()
+        points_awarded = challenge_rules.award_points(user_profile.id, challenges)
         if points_awarded > 0:
+            user_profile.refresh_from_db(fields=['points'])
             logger.debug(f"Awarded {points_awarded} points to {user_profile.user.username}")
 
     return render(request, 'engagement/challenges.html', {
         'user_profile': user_profile,
         'challenges': challenges,
-        'club_stats': club_stats
+        'club_stats': club_stats,
+        'club_badges': badges.display(club_stats.badge_mask) if club_stats else ''
     })
 
+SUBMISSION_STATUS = {'empty': 400, 'invalid': 400, 'not_found': 404, 'locked': 400, 'finalized': 400}
+# HTTP status per failed prediction submission
+
 @login_required
 def challenges_predict(request, fixture_id=None):
     # Handle score predictions
     user_profile = get_or_create_user_profile(request)
 
+    if request.method == 'POST':
+        try:
+            if request.content_type == 'application/json':
+                data = json.loads(request.body)
+                prediction_text = data.get('prediction')
+            else:
+                prediction_text = request.POST.get('prediction')
+        except (json.JSONDecodeError, KeyError, AttributeError) as e:
+            logger.error(f"Parse error: {e}, Body: {request.body.decode('utf-8')}, POST: {dict(request.POST)}")
+            return JsonResponse({'status': 'error', 'message': 'Invalid data'}, status=400)
+        submission = submissions.submit(user_profile, fixture_id, prediction_text)  # One conditional UPDATE enforces limit and lock
+        return JsonResponse(submission, status=SUBMISSION_STATUS.get(submission['outcome'], 200))
+
     # Fetch specific fixture
     fixture = None
     is_live_match = False
@@ -316,41 +243,11 @@ def challenges_predict(request, fixture_id=None):
     # Get or create prediction
     existing_prediction, created = Prediction.objects.get_or_create(
         user_profile=user_profile,
-        fixture_id=fixture.id if fixture else 0,
+        fixture=fixture,
         defaults={'text': '', 'club': user_profile.active_club, 'created_at': timezone.now(), 'submission_count': 0}
     )
     submission_count = existing_prediction.submission_count
 
-    if request.method == 'POST':
-        logger.debug(f"Request body: {request.body.decode('utf-8')}")
-        logger.debug(f"Content-Type: {request.content_type}")
-        logger.debug(f"POST data: {dict(request.POST)}")
-        try:
-            if request.content_type == 'application/json':
-                data = json.loads(request.body)
-                prediction_text = data.get('prediction')
-            else:
-                prediction_text = request.POST.get('prediction')
-            logger.debug(f"Parsed prediction_text: {prediction_text}")
-            if prediction_text:
-                if submission_count >= 2:
-                    return JsonResponse({'status': 'error', 'message': 'Prediction finalized—no further changes allowed.'}, status=400)
-                existing_prediction.text = prediction_text
-                existing_prediction.created_at = timezone.now()
-                existing_prediction.submission_count = submission_count + 1
-                existing_prediction.save()
-                return JsonResponse({
-                    'status': 'success',
-                    'message': 'Prediction updated!' if submission_count > 0 else 'Prediction submitted!',
-                    'prediction_text': prediction_text,
-                    'created_at': existing_prediction.created_at.isoformat(),
-                    'submission_count': existing_prediction.submission_count
-                })
-            return JsonResponse({'status': 'error', 'message': 'Prediction cannot be empty.'}, status=400)
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Parse error: {e}, Body: {request.body.decode('utf-8')}, POST: {dict(request.POST)}")
-            return JsonResponse({'status': 'error', 'message': 'Invalid data'}, status=400)
-
     return render(request, 'engagement/challenges_predict.html', {
         'user_profile': user_profile,
         'fixture': adjusted_fixture,
@@ -402,75 +299,124 @@ def fixtures(request):
 
 @login_required
 def get_leaderboard_data(request):  # Fetch leaderboard data
-    user_profile = get_or_create_user_profile(request)  # Get user profile
-    data = {}  # Initialize response data
-    
+    active_club_id = request.session.get('active_club_id')  # Remembered by get_or_create_user_profile
+    if active_club_id is None:
+        user_profile = get_or_create_user_profile(request)  # Get user profile
+        active_club_id = user_profile.active_club_id if user_profile else None
     try:
-        data['global'] = [
-            {
-                'username': user['user__username'],  # Use username
-                'total_points': user['total_points'] or 0,  # Handle None points
-                'badges': ClubStats.objects.filter(user_profile__user__username=user['user__username']).first().badges.split(', ') if ClubStats.objects.filter(user_profile__user__username=user['user__username']).first() and ClubStats.objects.filter(user_profile__user__username=user['user__username']).first().badges else []  # Handle None badges
-            }
-            for user in UserProfile.objects.annotate(
-                total_points=Sum('club_stats__points', default=0)
-            ).values('user__username', 'total_points').order_by('-total_points')[:10]
+        topic_id = int(request.GET['topic_id']) if request.GET.get('topic_id') else None  # Get topic ID
+    except ValueError:
+        return JsonResponse({'error': 'topic_id must be an integer.'}, status=400)
+    window = request.GET.get('window', 'all')  # all, week, month or season
+    if window != 'all' and window not in leaderboards.WINDOWS:
+        return JsonResponse({'error': f"window must be one of: all, {', '.join(leaderboards.WINDOWS)}"}, status=400)
+    global_scope = leaderboards.scope_name(leaderboards.GLOBAL, window)
+    club_scope = leaderboards.scope_name(leaderboards.CLUB, window)
+
+    def section(points_key, scope, scope_id):
+        # Build one section from the materialized leaderboard
+        return [
+            {'username': row['username'], points_key: row['points'], 'rank': row['rank'], 'badges': row['badges']}
+            for row in leaderboards.top(scope, scope_id)
         ]
-        logger.debug(f"Global leaderboard data: {data['global']}")  # Log global data
 
-        if user_profile and user_profile.active_club:  # Check active club
-            data['club'] = [
-                {
-                    'username': user['user__username'],  # Use username
-                    'club_points': user['club_points'] or 0,  # Handle None points
-                    'badges': ClubStats.objects.filter(user_profile__user__username=user['user__username'], club=user_profile.active_club).first().badges.split(', ') if ClubStats.objects.filter(user_profile__user__username=user['user__username'], club=user_profile.active_club).first() and ClubStats.objects.filter(user_profile__user__username=user['user__username'], club=user_profile.active_club).first().badges else []  # Handle None badges
-                }
-                for user in UserProfile.objects.annotate(
-                    club_points=Sum('club_stats__points', filter=Q(club_stats__club=user_profile.active_club), default=0)
-                ).values('user__username', 'club_points').order_by('-club_points')[:10]
-            ]
+    def topic_section():
+        topic = get_object_or_404(Topic, id=topic_id, club_id=active_club_id)  # Get topic
+        return section('topic_points', leaderboards.TOPIC, topic.id)
+
+    try:
+        data, etags = {'window': window}, []
+        data['global'], etag = leaderboard_cache.section((global_scope,), global_scope, 0, lambda: section('total_points', global_scope, 0))
+        etags.append(etag)
+        if active_club_id:  # Check active club
+            data['club'], etag = leaderboard_cache.section((club_scope, active_club_id), club_scope, active_club_id,
+                                                           lambda: section('club_points', club_scope, active_club_id))
+            etags.append(etag)
         else:
             data['club'] = []  # Empty club leaderboard
-        logger.debug(f"Club-specific leaderboard data: {data['club']}")  # Log club data
-
-        topic_id = request.GET.get('topic_id')  # Get topic ID
-        if user_profile and user_profile.active_club and topic_id:  # Check topic
-            try:
-                topic = get_object_or_404(Topic, id=topic_id, club=user_profile.active_club)  # Get topic
-                data['topic'] = [
-                    {
-                        'username': user['user__username'],  # Use username
-                        'topic_points': user['topic_points'] or 0,  # Handle None points
-                        'badges': ClubStats.objects.filter(user_profile__user__username=user['user__username'], club=user_profile.active_club).first().badges.split(', ') if ClubStats.objects.filter(user_profile__user__username=user['user__username'], club=user_profile.active_club).first() and ClubStats.objects.filter(user_profile__user__username=user['user__username'], club=user_profile.active_club).first().badges else []  # Handle None badges
-                    }
-                    for user in UserProfile.objects.annotate(
-                        topic_points=Count('comment', filter=Q(comment__club=user_profile.active_club, comment__topic=topic, comment__sentiment='Positive'), distinct=True) * 10  # Filter positive comments
-                    ).values('user__username', 'topic_points').order_by('-topic_points')[:10]
-                ]
-                logger.debug(f"Topic-specific leaderboard data for topic {topic_id}: {data['topic']}")  # Log topic data
-            except Topic.DoesNotExist:  # Handle missing topic
-                data['topic'] = []  # Empty topic leaderboard
+        if active_club_id and topic_id:  # Check topic
+            data['topic'], etag = leaderboard_cache.section(('topic', topic_id, active_club_id), leaderboards.TOPIC, topic_id, topic_section)
+            etags.append(etag)
         else:
             data['topic'] = []  # Empty topic leaderboard
-        logger.debug(f"Final leaderboard data: {data}")  # Log final data
 
-        return JsonResponse(data)  # Return JSON response
+        etag = etag_for(etags)
+        if leaderboard_etag_matches(request, etag):  # Client already has these standings
+            response = HttpResponseNotModified()
+        else:
+            response = JsonResponse(data)  # Return JSON response
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'  # Always revalidate
+        return response
 
+    except Http404:
+        return JsonResponse({'error': 'Topic not found.'}, status=404)  # Topic missing or not in the fan's club
     except Exception as e:  # Catch errors
         logger.error(f"Error in get_leaderboard_data: {str(e)}")  # Log error
         return JsonResponse({'error': str(e)}, status=500)  # Return error
 
+@login_required
+def leaderboard_rank(request):  # Answer "where am I?" from the in-process ranked index
+    user_profile = get_or_create_user_profile(request)  # Get user profile
+    scope = request.GET.get('scope', leaderboards.GLOBAL)  # Get scope
+    window = request.GET.get('window', 'all')  # all, week, month or season
+    if window != 'all' and (window not in leaderboards.WINDOWS or scope == leaderboards.TOPIC):
+        return JsonResponse({'error': f"window must be one of: all, {', '.join(leaderboards.WINDOWS)} (topic boards are all-time only)"}, status=400)
+    try:
+        k = max(0, min(int(request.GET.get('k', 5)), 50))  # Neighbours on each side
+        n = max(0, min(int(request.GET.get('top', leaderboards.TOP_SIZE)), 100))  # Top rows
+        if scope == leaderboards.GLOBAL:
+            scope_id = 0
+        elif scope == leaderboards.CLUB:
+            scope_id = int(request.GET.get('scope_id') or user_profile.active_club_id)
+        elif scope == leaderboards.TOPIC:
+            scope_id = int(request.GET['scope_id'])
+        else:
+            return JsonResponse({'error': 'scope must be global, club or topic.'}, status=400)
+    except (KeyError, TypeError, ValueError):
+        return JsonResponse({'error': 'k, top and scope_id must be integers; topic scope needs a scope_id.'}, status=400)
+
+    scope = leaderboards.scope_name(scope, window)
+    top = ranked_index.top(scope, scope_id, n)
+    around = ranked_index.around(scope, scope_id, user_profile.id, k)
+    usernames = dict(UserProfile.objects.filter(
+        id__in={user_profile_id for rank, user_profile_id, points in top + around}
+    ).values_list('id', 'user__username'))  # One lookup for every row shown
+
+    def rows(ranked):
+        return [{'rank': rank, 'username': usernames.get(user_profile_id), 'points': points} for rank, user_profile_id, points in ranked]
+
+    mine = next((row for row in around if row[1] == user_profile.id), None)  # Fan's own row, if ranked
+    return JsonResponse({
+        'scope': scope,
+        'scope_id': scope_id,
+        'rank': mine[0] if mine else None,
+        'points': mine[2] if mine else 0,
+        'total': ranked_index.size(scope, scope_id),
+        'top': rows(top),
+        'around': rows(around),
+    })
+
 @login_required
 def reset_stats(request):
     # Reset user stats
     user_profile = get_or_create_user_profile(request)
     if user_profile:
-        Comment.objects.filter(user_profile=user_profile).delete()
+        user_comments = Comment.objects.filter(user_profile=user_profile)
+        rollups.remove('comment', user_comments)  # Keep sentiment rollups in step with the table
+        topic_ids = set(user_comments.filter(sentiment='Positive').values_list('topic_id', flat=True))
+        user_comments.delete()
+        progress.clear_comments(user_profile.id)
+        club_ids = []
         for club in user_profile.supported_clubs.all():
-            club_stats, created = ClubStats.objects.get_or_create(user_profile=user_profile, club=club)
-            club_stats.points = 0
-            club_stats.badges = 'None'
-            club_stats.save()
+            with transaction.atomic():
+                club_stats, created = ClubStats.objects.get_or_create(user_profile=user_profile, club=club)
+                club_stats = ClubStats.objects.select_for_update().get(pk=club_stats.pk)  # Hold the balance while zeroing it
+                ledger.award(user_profile.id, -(club_stats.points or 0), 'reset', f'reset:{club_stats.pk}:{uuid.uuid4().hex}',
+                             club_id=club.id, source=('clubstats', club_stats.pk))  # Also starts a new reset generation
+                badges.clear(club_stats)
+            club_ids.append(club.id)
+        leaderboards.sync({user_profile.id: (club_ids, topic_ids)})  # Drop fan down the leaderboard
         messages.success(request, 'Stats have been reset successfully.')
     return redirect('engagement:home')
 
@@ -488,7 +434,8 @@ def switch_club(request):
             logger.debug(f"Parsed data: {data}, club_id: {club_id}")
             if club_id and Club.objects.filter(id=club_id).exists() and user_profile.supported_clubs.filter(id=club_id).exists():
                 user_profile.active_club = Club.objects.get(id=club_id)
-                user_profile.save()
+                user_profile.save(update_fields=['active_club'])
+                request.session['active_club_id'] = user_profile.active_club_id  # Keep leaderboard polls on the new club
                 return JsonResponse({'status': 'success', 'club_color': user_profile.active_club.primary_color})
             return JsonResponse({'status': 'error', 'message': 'Invalid club selection'}, status=400)
         except (json.JSONDecodeError, KeyError) as e:
@@ -508,42 +455,107 @@ def analyze_sentiment(request):  # Analyze comment sentiment
               topic = Topic.objects.get(id=topic_id)  # Get topic
           else:  # Use default topic
               topic, _ = Topic.objects.get_or_create(club=user_profile.active_club, name='General')  # Create default topic
-          scores = sia.polarity_scores(comment)  # Analyze sentiment
-          sentiment = 'Neutral'  # Default sentiment
-          if scores['compound'] >= 0.05:  # Check positive
-              sentiment = 'Positive'
-          elif scores['compound'] <= -0.05:  # Check negative
-              sentiment = 'Negative'
-          
           club = user_profile.active_club  # Get active club
-          comment_obj = Comment.objects.create(  # Create comment
+          comment_obj = Comment.objects.create(  # Create comment awaiting classification
               user_profile=user_profile,
               text=comment,
-              sentiment=sentiment,
+              sentiment=classification.PENDING,
               club=club,
               topic=topic
           )
-          club_stats, created = ClubStats.objects.get_or_create(user_profile=user_profile, club=club)  # Get or create ClubStats
-          if sentiment == 'Positive':  # Update for positive sentiment
-              club_stats.points = (club_stats.points or 0) + 10  # Add points
-              badges = club_stats.badges.split(', ') if club_stats.badges and club_stats.badges != 'None' else []  # Initialize badges
-              if 'Positive Fan' not in badges:  # Add Positive Fan badge
-                  badges.append('Positive Fan')
-                  club_stats.badges = ', '.join(badges) if badges else ''  # Save badges
-              comment_count = user_profile.comment_set.filter(club=club).count()  # Count comments
-              if comment_count >= 10 and 'Dedicated Fan' not in badges:  # Add Dedicated Fan badge
-                  badges.append('Dedicated Fan')
-                  club_stats.badges = ', '.join(badges) if badges else ''  # Save badges
-              if comment_count >= 20 and 'Loyal Supporters' not in badges:  # Add Loyal Supporters badge
-                  badges.append('Loyal Supporters')
-                  club_stats.badges = ', '.join(badges) if badges else ''  # Save badges
-              if topic and user_profile.comment_set.filter(club=club, topic=topic).count() >= 10 and 'Topic Expert' not in badges:  # Add Topic Expert badge
-                  badges.append('Topic Expert')
-                  club_stats.badges = ', '.join(badges) if badges else ''  # Save badges
-              club_stats.save()  # Save ClubStats
-          return JsonResponse({'sentiment': sentiment})  # Return sentiment
+          progress.record(user_profile.id, club.id, comments=1, week_comments=1)  # Challenge progress
+          classification.notify()  # Hand off scoring, points and badges to the background classifier
+          return JsonResponse({'status': 'pending', 'comment_id': comment_obj.id, 'sentiment': comment_obj.sentiment})  # Return right away
       return JsonResponse({'error': 'Invalid request'}, status=400)  # Return error
 
+def analyze_sentiment_bulk(request):  # Analyze a batch of comments in one request
+    if request.method == 'POST':  # Check POST request
+        if not request.user.is_authenticated:  # Check authentication
+            return JsonResponse({'error': 'Please log in.'}, status=401)  # Return error
+        try:
+            data = json.loads(request.body)  # Parse JSON data
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid JSON data'}, status=400)  # Return error
+        comments = data.get('comments') if isinstance(data, dict) else None  # Get comment texts
+        if not isinstance(comments, list) or not all(isinstance(text, str) for text in comments):  # Validate batch
+            return JsonResponse({'error': 'comments must be a list of strings.'}, status=400)
+        if len(comments) > sentiment.MAX_BATCH_SIZE:  # Enforce batch limit
+            return JsonResponse({'error': f'At most {sentiment.MAX_BATCH_SIZE} comments per request.'}, status=400)
+        results = [
+            {'comment': text, 'sentiment': label, 'compound': compound}
+            for text, (label, compound) in zip(comments, sentiment.classify_batch(comments))
+        ]  # Score the whole batch together
+        return JsonResponse({'results': results})  # Return sentiments in input order
+    return JsonResponse({'error': 'Invalid request'}, status=400)  # Return error
+
+def comment_status(request, comment_id):  # Report the sentiment of a queued comment
+    if request.user.is_authenticated:  # Check authentication
+        user_profile = get_or_create_user_profile(request)  # Get user profile
+        comment = get_object_or_404(Comment.objects.only('sentiment'), id=comment_id, user_profile=user_profile)  # Get own comment
+        return JsonResponse({
+            'comment_id': comment.id,
+            'sentiment': comment.sentiment,
+            'pending': comment.sentiment == classification.PENDING
+        })
+    return JsonResponse({'error': 'Please log in.'}, status=401)  # Return error
+
+def sentiment_cache_stats(request):  # Report sentiment cache hit rates for admins
+    if request.user.is_authenticated and request.user.is_superuser:  # Check admin
+        from .sentiment_cache import result_cache  # Import shared result cache
+        return JsonResponse({
+            'cache': result_cache.stats(),
+            'version': sentiment.cache_version(),
+            'analyzer': sentiment.load_stats
+        })
+    return JsonResponse({'error': 'Admin access required.'}, status=403)  # Return error
+
+@login_required
+def sentiment_dashboard(request):
+    # Serve club sentiment trends from the rollup table only
+    user_profile = get_or_create_user_profile(request)
+    try:
+        club_id = int(request.GET.get('club_id') or user_profile.active_club_id)
+        days = max(1, min(int(request.GET.get('days', 30)), 366))
+        topic_id = int(request.GET['topic_id']) if request.GET.get('topic_id') else None
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'club_id, topic_id and days must be integers.'}, status=400)
+    source = request.GET.get('source')
+    if source and source not in rollups.SOURCE_CLUB_FIELDS:
+        return JsonResponse({'error': f"source must be one of: {', '.join(rollups.SOURCE_CLUB_FIELDS)}"}, status=400)
+
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = SentimentRollup.objects.filter(club_id=club_id, day__gte=since)
+    if topic_id is not None:
+        rows = rows.filter(topic_key=topic_id)
+    if source:
+        rows = rows.filter(source=source)
+    sums = {'positive': Sum('positive'), 'neutral': Sum('neutral'), 'negative': Sum('negative')}
+
+    def counts(row):
+        positive, neutral, negative = row['positive'] or 0, row['neutral'] or 0, row['negative'] or 0
+        total = positive + neutral + negative
+        return {
+            'positive': positive,
+            'neutral': neutral,
+            'negative': negative,
+            'total': total,
+            'positive_share': round(positive / total, 3) if total else 0.0,
+        }
+
+    by_topic = list(rows.values('topic_key').annotate(**sums).order_by('topic_key'))
+    topic_names = dict(Topic.objects.filter(id__in=[row['topic_key'] for row in by_topic]).values_list('id', 'name'))
+    return JsonResponse({
+        'club_id': club_id,
+        'since': since.isoformat(),
+        'totals': counts(rows.aggregate(**sums)),
+        'daily': [{'day': row['day'].isoformat(), **counts(row)} for row in rows.values('day').annotate(**sums).order_by('day')],
+        'by_source': {row['source']: counts(row) for row in rows.values('source').annotate(**sums).order_by('source')},
+        'by_topic': [
+            {'topic_id': row['topic_key'] or None, 'topic': topic_names.get(row['topic_key']), **counts(row)}
+            for row in by_topic
+        ],
+    })
+
 def update_stats(request):  # Update user stats via AJAX
     if request.user.is_authenticated:  # Check authentication
         user_profile = get_or_create_user_profile(request)  # Get user profile
@@ -551,8 +563,7 @@ def update_stats(request):  # Update user stats via AJAX
             club_stats = user_profile.club_stats.filter(club=user_profile.active_club).first()  # Get club stats
             comment_count = user_profile.comment_set.filter(club=user_profile.active_club).count()  # Count comments
             points = club_stats.points if club_stats and club_stats.points is not None else 0  # Handle None points
-            badges = club_stats.badges.split(', ') if club_stats and club_stats.badges and club_stats.badges != 'None' else []  # Handle None badges
-            badges_count = len(badges)  # Count badges
+            badges_count = badges.count(club_stats.badge_mask) if club_stats else 0  # Count badges
         else:
             comment_count = 0  # Default comment count
             points = 0  # Default points
@@ -570,10 +581,10 @@ def get_badges(request):
         user_profile = get_or_create_user_profile(request)
         if user_profile and user_profile.active_club:
             club_stats = user_profile.club_stats.filter(club=user_profile.active_club).first()
-            badges = club_stats.badges if club_stats and club_stats.badges != 'None' else ''
+            club_badges = badges.display(club_stats.badge_mask) if club_stats else ''
         else:
-            badges = ''
-        return JsonResponse({'badges': badges})
+            club_badges = ''
+        return JsonResponse({'badges': club_badges})
     return JsonResponse({'error': 'Please log in.'}, status=401)
 
 def get_comments(request):
@@ -643,11 +654,21 @@ def update_predictions(request):
         fixture_id = request.POST.get('fixture_id')
         result = request.POST.get('result')
         if fixture_id and result:
-            FixtureResult.objects.update_or_create(fixture_id=fixture_id, defaults={'result': result})
-            predictions = Prediction.objects.filter(fixture_id=fixture_id)
-            for pred in predictions:
-                pred.is_correct = (pred.text == result)
-                pred.save()
+            try:
+                fixture_id = int(fixture_id)
+            except ValueError:
+                return JsonResponse({'status': 'error', 'message': 'fixture_id must be an integer.'}, status=400)
+            if not Fixture.objects.filter(pk=fixture_id).exists():
+                return JsonResponse({'status': 'error', 'message': 'Fixture not found.'}, status=404)
+            try:
+                home_goals, away_goals = parse_score(result)
+            except ValidationError:
+                home_goals = None
+            if home_goals is None:
+                return JsonResponse({'status': 'error', 'message': 'Invalid result format. Use x-y (e.g., 2-1).'}, status=400)
+            result = f'{home_goals}-{away_goals}'  # Normalised score, as Fixture.save stores it
+            Fixture.objects.filter(pk=fixture_id).update(final_result=result, home_goals=home_goals, away_goals=away_goals)
+            settlement.settle(fixture_id, result)  # Set-based: every prediction for the fixture at once
             return JsonResponse({'status': 'success', 'message': 'Predictions updated!'})
         return JsonResponse({'status': 'error', 'message': 'Invalid input.'}, status=400)
     return render(request, 'engagement/update_predictions.html')
@@ -693,8 +714,11 @@ def live_match(request):
                 user_profile=user_profile,
                 fixture=live_fixture,
                 text=comment_text,
+                sentiment=sentiment.classify(comment_text),
                 created_at=timezone.now()
             )
+            mood_board.record(live_fixture.id, comment.sentiment, comment.created_at)  # Fold into live mood
+            rollups.record('matchcomment', live_fixture.club_id, None, comment.created_at, comment.sentiment)  # Count in sentiment rollups
             return JsonResponse({
                 'status': 'success',
                 'message': '✅ Comment added!',
@@ -709,40 +733,32 @@ def live_match(request):
         comment_form = CommentForm(request.POST)
         if comment_form.is_valid():
             comment_text = comment_form.cleaned_data['content'].strip()
-            MatchComment.objects.create(
+            comment = MatchComment.objects.create(
                 user_profile=user_profile,
                 fixture=live_fixture,
-                text=comment_text
+                text=comment_text,
+                sentiment=sentiment.classify(comment_text)
             )
+            mood_board.record(live_fixture.id, comment.sentiment, comment.created_at)  # Fold into live mood
+            rollups.record('matchcomment', live_fixture.club_id, None, comment.created_at, comment.sentiment)  # Count in sentiment rollups
             messages.success(request, "✅ Comment added!")
         else:
             messages.error(request, "⚠️ Comment cannot be empty.")
         return redirect('engagement:live_match')
 
-    # Update prediction after simulation
-    if live_fixture.final_result and existing_prediction and not existing_prediction.is_correct:
-        try:
-            home_score, away_score = map(int, existing_prediction.text.split('-'))
-            predicted_score = f"{home_score}-{away_score}"
-            is_correct = predicted_score == live_fixture.final_result
-            if is_correct != existing_prediction.is_correct:
-                existing_prediction.is_correct = is_correct
-                existing_prediction.verified_at = timezone.now()
-                existing_prediction.save()
-                if is_correct:
-                    user_profile.correct_predictions += 1
-                    points_awarded = user_profile.check_challenge_completion()
-                    if points_awarded > 0:
-                        messages.success(request, f"Awarded {points_awarded} points for a correct prediction!")
-                user_profile.save()
-                match_data['prediction_correct'] = is_correct
-        except ValueError:
-            pass
+    # Show whether the viewer's prediction matches the result; everyone is settled at the final whistle
+    if live_fixture.final_result and existing_prediction:
+        match_data['prediction_correct'] = existing_prediction.check_correctness()
 
     # Stop simulation
     if 'simulation_ended' in request.GET:
+        if live_fixture.final_result:
+            settlement.settle(live_fixture.id, live_fixture.final_result)  # Settle every prediction at the final whistle
         live_fixture.is_live = False
-        MatchComment.objects.filter(fixture=live_fixture).delete()
+        match_comments = MatchComment.objects.filter(fixture=live_fixture)
+        rollups.remove('matchcomment', match_comments)  # Keep sentiment rollups in step with the table
+        match_comments.delete()
+        mood_board.reset(live_fixture.id)  # Clear live mood
         live_fixture.save()
         messages.info(request, "🏁 Simulation has ended.")
         return redirect('engagement:live_match')
@@ -759,6 +775,16 @@ def live_match(request):
         'user_profile': user_profile,
     })
 
+@login_required
+def live_mood(request, fixture_id):
+    # Serve rolling crowd mood for a fixture from the mood rollups
+    return JsonResponse({'fixture_id': fixture_id, **mood_board.snapshot(fixture_id)})
+
+@login_required
+def prediction_crowd(request, fixture_id):
+    # Serve the crowd's predicted scores and outcomes for a fixture from the prediction tallies
+    return JsonResponse({'fixture_id': fixture_id, **crowd_board.snapshot(fixture_id)})
+
 @login_required
 def polls(request):
     # Handle polls and voting
@@ -9,8 +9,21 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fan_platform.settings')
 
 application = get_asgi_application()
+
+if settings.LEADERBOARD_INDEX_PRELOAD:
+    # Build ranked leaderboards once, before workers fork
+    from django.db import connections
+    from engagement.ranked_index import index
+    index.preload()
+    connections.close_all()
+
+if settings.SENTIMENT_PRELOAD:
+    # Parse the sentiment lexicon once, before workers fork
+    from engagement import sentiment
+    sentiment.preload()
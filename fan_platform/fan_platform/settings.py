@@ -76,6 +76,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL', # Readers never wait for the writer; sync the log at checkpoints
+            'transaction_mode': 'IMMEDIATE', # Take the write lock when a transaction starts, so concurrent writers queue instead of failing
+            'timeout': 20, # Seconds a writer waits for the lock
+        },
     }
 }
 
@@ -126,4 +131,32 @@ LOGOUT_REDIRECT_URL = '/' # Set logout redirect
 
 # Media settings for image uploads
 MEDIA_URL = '/media/' # Set Media URL
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Sentiment analysis
+SENTIMENT_LEXICON_PATH = BASE_DIR / 'engagement' / 'data' / 'vader_lexicon.txt' # Bundled VADER lexicon, read without network access
+SENTIMENT_PRELOAD = False # Load the lexicon when wsgi/asgi is imported; enable with a preforking server (e.g. gunicorn --preload)
+SENTIMENT_WORKERS = 2 # Processes in the background comment classification pool
+SENTIMENT_BATCH_SIZE = 200 # Pending comments scored per classification batch
+SENTIMENT_POLL_SECONDS = 30 # How often the classifier re-checks for leftover pending comments
+SENTIMENT_CACHE_SIZE = 50000 # Sentiment results kept in each process's in-memory LRU
+
+# Live match mood
+LIVE_MOOD_BUCKET_SECONDS = 10 # Width of the rolling mood buckets
+LIVE_MOOD_REFRESH_SECONDS = 2 # How stale a process's in-memory mood may get before re-reading the rollup
+
+# Leaderboards
+LEADERBOARD_INDEX_REFRESH_SECONDS = 15 # How often a process's ranked index pulls points changes made by other processes
+LEADERBOARD_INDEX_PRELOAD = False # Build the ranked index when wsgi/asgi is imported (before a preforking server starts workers)
+LEADERBOARD_CACHE_TTL = {'global': 60, 'club': 30, 'topic': 30} # Seconds a cached leaderboard section may be served, per scope
+LEADERBOARD_CACHE_MAX_ENTRIES = 2000 # Leaderboard sections kept per process before least recently used ones are evicted
+LEADERBOARD_SEASON_START = (8, 1) # (month, day) the season board restarts; run rebuild_leaderboard --windows daily to roll windows
+LEADERBOARD_TIMELINE_POINTS = 60 # Points drawn on the leaderboard's points-over-time chart; longer histories are downsampled
+LEADERBOARD_TIMELINE_CACHE_SECONDS = 300 # Seconds a fan's cached points timeline may be served before it is rebuilt
+
+# Predictions
+PREDICTION_SCORING = 'tiered' # 'exact' scores only exact results; 'tiered' also scores the right goal difference or outcome
+PREDICTION_SUBMISSION_LIMIT = 2 # Times a fan may submit (or change) a prediction for one fixture
+PREDICTION_POINTS = {'exact': 3, 'difference': 2, 'outcome': 1} # Points per prediction for each tier when a fixture is settled
+PREDICTION_CROWD_REFRESH_SECONDS = 5 # How stale a process's in-memory crowd prediction histogram may get before re-reading the tallies
+PREDICTION_CROWD_TOP_SCORES = 8 # Most-predicted scores listed on the prediction page
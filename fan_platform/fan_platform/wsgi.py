@@ -6,8 +6,19 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
 
 import os  # Import os for env settings
+from django.conf import settings  # Import settings for sentiment preload
 from django.core.wsgi import get_wsgi_application  # Import WSGI app creator
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fan_platform.settings')  # Set settings module
 
-application = get_wsgi_application()  # Create WSGI application
\ No newline at end of file
+application = get_wsgi_application()  # Create WSGI application
+
+if settings.LEADERBOARD_INDEX_PRELOAD:  # Build ranked leaderboards before workers fork
+    from django.db import connections  # Import connections to close before forking
+    from engagement.ranked_index import index  # Import ranked index
+    index.preload()  # Read every leaderboard scope once in the master process
+    connections.close_all()  # Workers must not share the master's connection
+
+if settings.SENTIMENT_PRELOAD:  # Load sentiment lexicon before workers fork
+    from engagement import sentiment  # Import sentiment provider
+    sentiment.preload()  # Parse lexicon once in the master process
@@ -0,0 +1,249 @@
+import argparse  # Import argparse for options
+import json  # Import json for payloads and report
+import math  # Import math for percentile ranks
+import random  # Import random for the traffic mix
+import re  # Import re for scraping ids from pages
+import threading  # Import threading for concurrent fans
+import time  # Import time for latency measurement
+from collections import defaultdict  # Import defaultdict for per-endpoint stats
+from pathlib import Path  # Import Path for the comment corpus
+import requests  # Import requests for HTTP
+
+# Match-day load generator: many concurrent simulated fans, each with its own
+# session and CSRF token, replaying a weighted mix of API traffic against a
+# local server. Prints (or writes) a JSON report with throughput, latency
+# percentiles and error rates per endpoint so runs can be compared.
+#
+# Example: python loadtest.py --fans 50 --duration 60 --output run.json
+
+DEFAULT_MIX = {
+    'analyze-sentiment': 30,
+    'get-comments': 25,
+    'update-stats': 20,
+    'get-leaderboard-data': 15,
+    'prediction': 6,
+    'poll': 4,
+}  # Relative weight of each endpoint on a match day
+COMMENTS_FILE = Path(__file__).resolve().parent / 'loadtest_comments.txt'  # Fan comment corpus
+
+
+def parse_mix(text):
+    # Parse "name=weight,name=weight" into a mix dict
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown endpoint '{name.strip()}'. Choose from: {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    # Thread-safe latency and status collector
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, started, status=None, error=False):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.latencies[endpoint].append(elapsed_ms)
+            self.statuses[endpoint][str(status) if status else 'exception'] += 1
+            if error:
+                self.errors[endpoint] += 1
+
+    def report(self, duration, config):
+        # Build the JSON report
+        endpoints = {}
+        total = errors = 0
+        for endpoint, values in sorted(self.latencies.items()):
+            values.sort()
+            total += len(values)
+            errors += self.errors[endpoint]
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'throughput_rps': round(len(values) / duration, 2),
+                'p50_ms': round(percentile(values, 50), 2),
+                'p95_ms': round(percentile(values, 95), 2),
+                'p99_ms': round(percentile(values, 99), 2),
+                'mean_ms': round(sum(values) / len(values), 2),
+                'max_ms': round(values[-1], 2),
+                'errors': self.errors[endpoint],
+                'error_rate': round(self.errors[endpoint] / len(values), 4),
+                'status_codes': dict(self.statuses[endpoint]),
+            }
+        return {
+            'config': config,
+            'duration_s': round(duration, 2),
+            'total': {
+                'requests': total,
+                'throughput_rps': round(total / duration, 2) if duration else 0,
+                'errors': errors,
+                'error_rate': round(errors / total, 4) if total else 0,
+            },
+            'endpoints': endpoints,
+        }
+
+
+class Fan:
+    # One simulated fan with its own session and CSRF token
+
+    def __init__(self, base_url, username, password, recorder, comments, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.recorder = recorder
+        self.comments = comments
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.fixture_ids = []
+        self.polls = []
+
+    def url(self, path):
+        return f'{self.base_url}/engagement/{path}'
+
+    def csrf(self):
+        return self.session.cookies.get('csrftoken', '')
+
+    def form_headers(self, referer):
+        return {'X-CSRFToken': self.csrf(), 'Referer': referer}
+
+    def log_in(self, club_ids):
+        # Log in, registering the fan first if the account does not exist
+        login_url = self.url('login/')
+        self.session.get(login_url, timeout=self.timeout)  # Sets csrftoken cookie
+        response = self.session.post(login_url, data={
+            'username': self.username, 'password': self.password, 'csrfmiddlewaretoken': self.csrf()
+        }, headers=self.form_headers(login_url), timeout=self.timeout)
+        if 'login' in response.url:  # Still on login page: register instead
+            register_url = self.url('register/')
+            self.session.get(register_url, timeout=self.timeout)
+            response = self.session.post(register_url, data={
+                'username': self.username, 'password': self.password,
+                'clubs': club_ids, 'csrfmiddlewaretoken': self.csrf()
+            }, headers=self.form_headers(register_url), timeout=self.timeout)
+        if 'sessionid' not in self.session.cookies:
+            raise RuntimeError(f'{self.username} could not log in ({response.status_code})')
+
+    def discover(self):
+        # Scrape fixture ids and open polls this fan can act on
+        page = self.session.get(self.url('fixtures/'), timeout=self.timeout).text
+        self.fixture_ids = sorted({int(fixture_id) for fixture_id in re.findall(r'/challenges/predict/(\d+)/', page)})
+        page = self.session.get(self.url('polls/'), timeout=self.timeout).text
+        for form in re.findall(r'<form.*?</form>', page, re.S):
+            poll_id = re.search(r'name="poll_id" value="(\d+)"', form)
+            options = re.findall(r'name="vote" value="([^"]+)"', form)
+            if poll_id and options:
+                self.polls.append((poll_id.group(1), options))
+
+    def call(self, endpoint, method, path, **kwargs):
+        # Send one request and record its latency and outcome
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url(path), timeout=self.timeout, allow_redirects=False, **kwargs)
+        except requests.RequestException:
+            self.recorder.record(endpoint, started, error=True)
+            return
+        self.recorder.record(endpoint, started, response.status_code, error=response.status_code >= 500)
+
+    def json_headers(self):
+        return {'Content-Type': 'application/json', 'X-CSRFToken': self.csrf(), 'Referer': self.url('')}
+
+    def hit(self, endpoint):
+        # Perform one request of the given kind
+        if endpoint == 'analyze-sentiment':
+            self.call(endpoint, 'POST', 'api/analyze-sentiment/', headers=self.json_headers(),
+                      data=json.dumps({'comment': random.choice(self.comments)}))
+        elif endpoint == 'get-comments':
+            self.call(endpoint, 'GET', 'api/get-comments/')
+        elif endpoint == 'update-stats':
+            self.call(endpoint, 'GET', 'api/update-stats/')
+        elif endpoint == 'get-leaderboard-data':
+            self.call(endpoint, 'GET', 'api/get-leaderboard-data/')
+        elif endpoint == 'prediction' and self.fixture_ids:
+            self.call(endpoint, 'POST', f'challenges/predict/{random.choice(self.fixture_ids)}/', headers=self.json_headers(),
+                      data=json.dumps({'prediction': f'{random.randint(0, 4)}-{random.randint(0, 4)}'}))
+        elif endpoint == 'poll' and self.polls:
+            poll_id, options = random.choice(self.polls)
+            self.call(endpoint, 'POST', 'polls/', headers=self.form_headers(self.url('polls/')),
+                      data={'poll_id': poll_id, 'vote': random.choice(options), 'csrfmiddlewaretoken': self.csrf()})
+
+
+def run_fan(fan, club_ids, endpoints, weights, deadline, think_time, start_delay, failures):
+    # Thread body: log in, then replay the mix until the deadline
+    time.sleep(start_delay)
+    try:
+        fan.log_in(club_ids)
+        fan.discover()
+    except (requests.RequestException, RuntimeError) as e:
+        failures.append(str(e))
+        return
+    while time.monotonic() < deadline:
+        fan.hit(random.choices(endpoints, weights)[0])
+        if think_time:
+            time.sleep(random.uniform(0, 2 * think_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Match-day load test for the fan engagement platform')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to load')
+    parser.add_argument('--fans', type=int, default=20, help='Concurrent simulated fans')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of traffic after ramp-up starts')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Seconds over which fans start')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Mean pause between a fan\'s requests, in seconds')
+    parser.add_argument('--mix', help='Endpoint weights, e.g. "analyze-sentiment=50,get-leaderboard-data=50"')
+    parser.add_argument('--user-prefix', default='loadfan', help='Username prefix for simulated fans')
+    parser.add_argument('--password', default='loadtest-pass-123', help='Password for simulated fans')
+    parser.add_argument('--clubs', default='1,2', help='Club ids new fans register with')
+    parser.add_argument('--timeout', type=float, default=10, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, help='Random seed for a repeatable mix')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    endpoints, weights = list(mix), list(mix.values())
+    comments = [line for line in COMMENTS_FILE.read_text(encoding='utf-8').splitlines() if line.strip()]
+    club_ids = [club_id for club_id in args.clubs.split(',') if club_id]
+    recorder = Recorder()
+    failures = []
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = []
+    for i in range(args.fans):
+        fan = Fan(args.base_url, f'{args.user_prefix}{i}', args.password, recorder, comments, args.timeout)
+        delay = args.ramp_up * i / args.fans if args.fans else 0
+        thread = threading.Thread(target=run_fan, args=(fan, club_ids, endpoints, weights, deadline, args.think_time, delay, failures), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    duration = time.monotonic() - started
+
+    config = {key: value for key, value in vars(args).items() if key not in ('password', 'output')}
+    config['mix'] = mix
+    report = recorder.report(duration, config)
+    report['login_failures'] = failures
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+        print(f"Report written to {args.output}: {report['total']['requests']} requests, {report['total']['throughput_rps']} req/s")
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()